@@ -3,6 +3,7 @@
 
 import argparse
 from importlib import metadata
+import os
 import random
 import sys
 import time
@@ -13,6 +14,7 @@ import numpy
 import scenic
 from scenic.core.distributions import RejectionException
 import scenic.core.errors as errors
+import scenic.core.geometry_cache as geometry_cache
 from scenic.core.simulators import SimulationCreationError
 import scenic.syntax.translator as translator
 
@@ -137,6 +139,12 @@ debugOpts.add_argument(
     "--dump-python", help="dump Python equivalent of final AST", action="store_true"
 )
 debugOpts.add_argument("--no-pruning", help="disable pruning", action="store_true")
+debugOpts.add_argument(
+    "--geometry-cache",
+    metavar="DIR",
+    help="cache view regions and other derived geometry in DIR, for reuse by"
+    " later runs and parallel workers",
+)
 debugOpts.add_argument(
     "--gather-stats",
     type=int,
@@ -144,6 +152,25 @@ debugOpts.add_argument(
     help="collect timing statistics over this many scenes"
     " (or iterations, if negative)",
 )
+debugOpts.add_argument(
+    "--workers",
+    type=int,
+    default=1,
+    metavar="N",
+    help="with --gather-stats, sample scenes in parallel using N processes",
+)
+debugOpts.add_argument(
+    "--checker-stats",
+    metavar="FILE",
+    help="load requirement-checking statistics from FILE if it exists,"
+    " and save them there when finished",
+)
+debugOpts.add_argument(
+    "--sampling-stats",
+    metavar="FILE",
+    help="save per-requirement rejection counts and sampling times to FILE"
+    " when finished (as CSV if FILE ends in .csv, otherwise as JSON)",
+)
 
 parser.add_argument(
     "-h", "--help", action="help", default=argparse.SUPPRESS, help=argparse.SUPPRESS
@@ -156,6 +183,8 @@ parser.add_argument("scenicFile", help="a Scenic file to run", metavar="FILE")
 args = parser.parse_args()
 delay = args.delay
 mode2D = getattr(args, "2d")
+if args.workers > 1 and (args.gather_stats is None or args.gather_stats < 0):
+    parser.error("--workers requires --gather-stats with a number of scenes")
 maxIterations = 2000
 if args.replay is True:
     args.count = 0
@@ -190,6 +219,8 @@ translator.dumpScenicAST = args.dump_scenic_ast
 translator.dumpFinalAST = args.dump_ast
 translator.dumpASTPython = args.dump_python
 translator.usePruning = not args.no_pruning
+if args.geometry_cache:
+    geometry_cache.configure(directory=args.geometry_cache)
 if args.seed is not None:
     if args.verbosity >= 1:
         print(f"Using random seed = {args.seed}")
@@ -214,6 +245,11 @@ totalTime = time.time() - startTime
 if args.verbosity >= 1:
     print(f"Scenario constructed in {totalTime:.2f} seconds.")
 
+if args.checker_stats and os.path.exists(args.checker_stats):
+    loaded = scenario.loadCheckerStatistics(args.checker_stats)
+    if args.verbosity >= 1 and not loaded:
+        print("Ignoring requirement-checking statistics for a different scenario.")
+
 if args.simulate:
     simulator = errors.callBeginningScenicTrace(scenario.getSimulator)
 
@@ -317,6 +353,20 @@ try:
                 return maxIterations > 0
 
         startTime = time.time()
+        if args.workers > 1:
+            scenes, totalIterations = errors.callBeginningScenicTrace(
+                lambda: scenario.generateBatch(
+                    args.gather_stats,
+                    maxIterations=maxIterations * args.gather_stats,
+                    verbosity=args.verbosity,
+                    workers=args.workers,
+                )
+            )
+            its = [None] * len(scenes)
+            if args.verbosity >= 1 and args.show_params:
+                for scene in scenes:
+                    for param, value in scene.params.items():
+                        print(f'    Parameter "{param}": {value}')
         while keepGoing():
             try:
                 scene, iterations = generateScene(maxIterations=maxIterations)
@@ -334,11 +384,21 @@ try:
         print(f"Average iterations/scene: {totalIterations/count}")
         print(f"Average time/iteration: {totalTime/totalIterations:.2g} seconds.")
         print(f"Average time/scene: {totalTime/count:.2f} seconds.")
+        times = scenario.samplingStatistics()["time"]
+        print(
+            f"Time sampling/checking/constructing scenes: {times['sampling']:.2f}"
+            f"/{times['checking']:.2f}/{times['constructing']:.2f} seconds"
+            + (" (summed over workers)." if args.workers > 1 else ".")
+        )
 
 except KeyboardInterrupt:
     pass
 
 finally:
+    if args.checker_stats:
+        scenario.saveCheckerStatistics(args.checker_stats)
+    if args.sampling_stats:
+        scenario.saveSamplingStatistics(args.sampling_stats)
     if args.simulate:
         simulator.destroy()
 
@@ -6,6 +6,7 @@ import itertools
 import math
 import numbers
 import random
+import time
 import typing
 import warnings
 
@@ -117,6 +118,9 @@ class Samplable(LazilyEvaluable):
             set by the initializer and subsequently immutable.
     """
 
+    #: Number of calls to `conditionTo` so far, used to invalidate `SamplingPlan`\ s.
+    _conditioningEpoch = 0
+
     def __init__(self, dependencies):
         deps = []
         props = set()
@@ -133,6 +137,8 @@ class Samplable(LazilyEvaluable):
 
         Reproducibility note: the order in which the quantities are given can affect the
         order in which calls to random are made, affecting the final result.
+
+        To sample the same quantities many times, use a `SamplingPlan` instead.
         """
         subsamples = DefaultIdentityDict()
         for q in quantities:
@@ -174,6 +180,7 @@ class Samplable(LazilyEvaluable):
         """Condition this value to another value with the same conditional distribution."""
         assert isinstance(value, Samplable)
         self._conditioned = value
+        Samplable._conditioningEpoch += 1
 
     def evaluateIn(self, context):
         """See `LazilyEvaluable.evaluateIn`."""
@@ -183,6 +190,221 @@ class Samplable(LazilyEvaluable):
         return value
 
 
+class SamplingPlan:
+    """Precomputed order for repeatedly sampling some Samplables.
+
+    `Samplable.sampleAll` walks the dependency graph of the quantities recursively,
+    checking at every node whether it has already been sampled. A plan does this walk
+    only once, recording the sequence of `Samplable.sampleGiven` calls it makes; each
+    call to `sample` then runs through this flat list. The calls are made in exactly
+    the same order as by `Samplable.sampleAll`, so both consume the same random numbers
+    and return the same values.
+
+    If a **batchSize** is given, the plan instead samples in batches every
+    `Distribution` which supports it (see `Distribution.supportsBatchSampling`) and
+    depends only on other such distributions: primitive distributions over numbers
+    like `Range`, and arithmetic on them. Each call to `sample` then uses the next
+    candidate from the current batch for these distributions, sampling the rest of
+    the quantities as usual. Candidates are filtered in bulk before being used: each
+    of the **filters** is called with a `DefaultIdentityDict` mapping the distributions
+    sampled in batches to arrays of values, and the size of the batch, and may return
+    a boolean array indicating which candidates to keep (or `None` if it does not
+    apply). Filters should only discard candidates which would be rejected anyway.
+    Batches are drawn from `numpy.random`, so the values sampled are different from
+    those of `Samplable.sampleAll`.
+
+    If **checks** are given, the plan checks them while sampling, so that a sample
+    can be rejected before all the quantities have been sampled. The checks are
+    requirements with **dependencies** and **falsifiedBy** attributes like those of
+    `SamplingRequirement`: each check is made as soon as all its dependencies have
+    been sampled, and if it is active and falsified, `sample` raises a
+    `RejectionException`. To check them as early as possible, the dependencies of
+    each check are sampled before those of the following checks, and only then the
+    rest of the quantities, so the values sampled are different from those of
+    `Samplable.sampleAll`. Checks whose dependencies are unknown or not among the
+    quantities are ignored. The number of times each check was made and rejected the
+    sample, and the number of sampling steps this skipped, are counted in
+    **checkCounts**, **rejectionCounts**, and **skippedSteps**; the total time spent
+    making each check (in seconds) is accumulated in **checkTimes**.
+
+    The plan is recomputed automatically if any Samplable is conditioned (see
+    `Samplable.conditionTo`) after it was computed.
+
+    Args:
+        quantities: sequence of values to sample, as for `Samplable.sampleAll`.
+        batchSize (int): number of candidates per batch, or `None` to not use batches.
+        filters: sequence of functions to filter batches of candidates, as above.
+        checks: sequence of requirements to check while sampling, as above.
+    """
+
+    def __init__(self, quantities, batchSize=None, filters=(), checks=()):
+        self.quantities = tuple(quantities)
+        self.batchSize = batchSize
+        self.filters = tuple(filters)
+        self.checks = tuple(checks)
+        self.checkCounts = collections.Counter()
+        self.rejectionCounts = collections.Counter()
+        self.skippedSteps = collections.Counter()
+        self.checkTimes = collections.Counter()
+        self._segments = None
+        self._epoch = None
+        self._discarded = 0
+
+    def sample(self):
+        """Sample all the quantities, returning a `DefaultIdentityDict` of values.
+
+        Raises:
+            `RejectionException`: if sampling failed, including if all candidates of a
+                new batch were discarded by the filters.
+        """
+        if self._epoch != Samplable._conditioningEpoch:
+            self._compile()
+        subsamples = DefaultIdentityDict()
+        values = subsamples.storage
+        if self._batchSteps:
+            if self._nextCandidate >= len(self._candidates):
+                self._sampleBatch()
+            candidate = self._candidates[self._nextCandidate]
+            self._nextCandidate += 1
+            values.update(zip(self._batchKeys, candidate))
+        for steps, checks, remaining in self._segments:
+            for key, thing, sampler in steps:
+                values[key] = thing if sampler is None else sampler(subsamples)
+            for check in checks:
+                if check.active:
+                    self._check(check, subsamples, remaining)
+        return subsamples
+
+    def _check(self, check, subsamples, remaining):
+        self.checkCounts[check] += 1
+        start = time.perf_counter()
+        try:
+            falsified = check.falsifiedBy(subsamples)
+        except RejectionException:
+            falsified = True
+        self.checkTimes[check] += time.perf_counter() - start
+        if falsified:
+            self.rejectionCounts[check] += 1
+            self.skippedSteps[check] += remaining
+            raise RejectionException(check.violationMsg)
+
+    def takeDiscarded(self):
+        """Number of candidates discarded by filters since the last call.
+
+        When a call to `sample` fails because an entire batch was discarded, that call
+        itself accounts for one of the candidates.
+        """
+        discarded, self._discarded = self._discarded, 0
+        return discarded
+
+    def _sampleBatch(self):
+        size = self.batchSize
+        batch = DefaultIdentityDict()
+        for node, dist in self._batchSteps:
+            batch[node] = numpy.broadcast_to(dist.sampleBatchGiven(batch, size), (size,))
+        keep = numpy.ones(size, dtype=bool)
+        for check in self.filters:
+            accepted = check(batch, size)
+            if accepted is not None:
+                keep &= accepted
+        survivors = numpy.flatnonzero(keep)
+        # Convert to Python numbers, so that values have the same types as when not
+        # sampling in batches
+        columns = [batch[node][survivors].tolist() for node, _ in self._batchSteps]
+        self._candidates = list(zip(*columns))
+        self._nextCandidate = 0
+        if not self._candidates:
+            self._discarded += size - 1
+            raise RejectionException(f"filtered out all {size} candidates in batch")
+        self._discarded += size - len(self._candidates)
+
+    def _compile(self):
+        # Emulate the recursion of sampleAll with an explicit stack, recording each
+        # call to sampleGiven in the order it would be made.
+        steps = []
+        done = set()
+        for q in self.quantities:
+            if id(q) in done:
+                continue
+            if not needsSampling(q):
+                steps.append((id(q), q, None))
+                done.add(id(q))
+                continue
+            stack = [(q, iter(q._conditioned._dependencies))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if id(child) not in done:
+                        stack.append((child, iter(child._conditioned._dependencies)))
+                        break
+                else:
+                    stack.pop()
+                    steps.append((id(node), node, node._conditioned.sampleGiven))
+                    done.add(id(node))
+
+        # Split off the distributions which can be sampled in batches
+        batchSteps = []
+        if self.batchSize is not None:
+            batched = set()
+            for key, node, sampler in steps:
+                dist = node._conditioned
+                if (
+                    sampler is not None
+                    and isinstance(dist, Distribution)
+                    and dist.supportsBatchSampling()
+                    and all(id(dep) in batched for dep in dist._dependencies)
+                ):
+                    batchSteps.append((node, dist))
+                    batched.add(key)
+            steps = [step for step in steps if step[0] not in batched]
+        self._segments = self._scheduleChecks(steps, batchSteps)
+        self._batchSteps = tuple(batchSteps)
+        self._batchKeys = tuple(id(node) for node, _ in batchSteps)
+        self._candidates = ()
+        self._nextCandidate = 0
+        self._epoch = Samplable._conditioningEpoch
+
+    def _scheduleChecks(self, steps, batchSteps):
+        # Split the steps into segments, each followed by the checks whose
+        # dependencies have all been sampled by the end of the segment.
+        sampled = {id(node) for node, _ in batchSteps}
+        unsampled = {key: node for key, node, _ in steps}
+        segments = []
+        for check in self.checks:
+            if check.dependencies is None:
+                continue
+            closure = set()
+            stack = [dep for dep in check.dependencies if needsSampling(dep)]
+            while stack:
+                node = stack.pop()
+                if id(node) in closure or id(node) in sampled:
+                    continue
+                if id(node) not in unsampled:
+                    break  # dependency not sampled by this plan
+                closure.add(id(node))
+                stack.extend(node._conditioned._dependencies)
+            else:
+                if closure or not segments:
+                    # Keep the original order of the steps, which is topological
+                    segment = [step for step in steps if step[0] in closure]
+                    steps = [step for step in steps if step[0] not in closure]
+                    segments.append((segment, []))
+                    sampled.update(closure)
+                segments[-1][1].append(check)
+        segments.append((steps, []))
+        remaining = sum(len(segment) for segment, _ in segments)
+        result = []
+        for segment, checks in segments:
+            remaining -= len(segment)
+            result.append((tuple(segment), tuple(checks), remaining))
+        return tuple(result)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_segments=None, _epoch=None, _batchSteps=None, _candidates=None)
+        return state
+
+
 class ConstantSamplable(Samplable):
     """A samplable which always evaluates to a constant value.
 
@@ -325,6 +547,26 @@ class Distribution(Samplable):
         """
         return None, None
 
+    def supportsBatchSampling(self):
+        """Whether this Distribution implements `sampleBatchGiven`.
+
+        Only distributions over numbers can be sampled in batches. Subclasses
+        implementing `sampleBatchGiven` override this method, checking in particular
+        that any constant parameters are numbers.
+        """
+        return False
+
+    def sampleBatchGiven(self, value, size):
+        """Sample **size** values at once, given batches of values of the dependencies.
+
+        Used by `SamplingPlan` when sampling in batches. Like `sampleGiven`, except that
+        the sampled values of dependencies are NumPy arrays of length **size** (or
+        numbers, for dependencies which were not sampled in batches), and the result
+        is an array of length **size** (or a number). Random numbers are drawn from
+        `numpy.random` rather than `random`.
+        """
+        raise NotImplementedError
+
     def __getattr__(self, name):
         if name.startswith("__") and name.endswith("__"):  # ignore special attributes
             return object.__getattribute__(self, name)
@@ -815,6 +1057,34 @@ class OperatorDistribution(Distribution):
             )
         return result
 
+    def supportsBatchSampling(self):
+        return (
+            self.operator in batchOperators
+            and not self.kwoperands
+            and all(
+                isLazy(arg) or isinstance(arg, numbers.Real)
+                for arg in (self.object, *self.operands)
+            )
+        )
+
+    def sampleBatchGiven(self, value, size):
+        if self.operator in divisionOperators:
+            # NumPy does not raise on division by zero, so check for zero divisors
+            if self.operator in reverseDivisionOperators:
+                divisor = value[self.object]
+            else:
+                divisor = value[self.operands[0]]
+            zeros = numpy.flatnonzero(numpy.broadcast_to(divisor == 0, (size,)))
+            if len(zeros) > 0:
+                # Raise the same error as when sampling the candidate individually
+                scalars = DefaultIdentityDict()
+                for arg in (self.object, *self.operands):
+                    scalars[arg] = numpy.broadcast_to(value[arg], (size,))[zeros[0]].item()
+                self.sampleGiven(scalars)
+        # NumPy arrays implement the same arithmetic operators as numbers
+        with numpy.errstate(all="ignore"):
+            return self.sampleGiven(value)
+
     def evaluateInner(self, context):
         obj = valueInContext(self.object, context)
         operands = tuple(valueInContext(arg, context) for arg in self.operands)
@@ -917,6 +1187,37 @@ allowedReversibleOperators = {
     "__rpow__": "**",
 }
 
+# Operators which OperatorDistribution can apply to batches of numbers, with the same
+# results as for individual numbers. Exponentiation is excluded since NumPy does not
+# handle negative bases and exponents like Python does. Division by zero does not
+# raise an exception in NumPy, so OperatorDistribution checks for it itself.
+batchOperators = {
+    "__neg__",
+    "__pos__",
+    "__abs__",
+    "__add__",
+    "__radd__",
+    "__sub__",
+    "__rsub__",
+    "__mul__",
+    "__rmul__",
+    "__truediv__",
+    "__rtruediv__",
+    "__floordiv__",
+    "__rfloordiv__",
+    "__mod__",
+    "__rmod__",
+}
+divisionOperators = {
+    "__truediv__",
+    "__rtruediv__",
+    "__floordiv__",
+    "__rfloordiv__",
+    "__mod__",
+    "__rmod__",
+}
+reverseDivisionOperators = {"__rtruediv__", "__rfloordiv__", "__rmod__"}
+
 
 def makeOperatorHandler(op, ty):
     # Various special cases to simplify the expression forest by removing some
@@ -993,6 +1294,15 @@ class MultiplexerDistribution(Distribution):
         assert 0 <= idx < len(self.options), (idx, len(self.options))
         return value[self.options[idx]]
 
+    def supportsBatchSampling(self):
+        # Only options which are all numbers of the same type, so that batches of
+        # values have the same types as individual values
+        types = {type(opt) for opt in self.options}
+        return len(types) == 1 and types.pop() in (int, float)
+
+    def sampleBatchGiven(self, value, size):
+        return numpy.asarray(self.options)[value[self.index]]
+
     def serializeValue(self, values, serializer):
         # We override this method to save space: we don't need to serialize all
         # of our options, only the one we're selecting.
@@ -1049,6 +1359,12 @@ class Range(Distribution):
     def sampleGiven(self, value):
         return random.uniform(value[self.low], value[self.high])
 
+    def supportsBatchSampling(self):
+        return True
+
+    def sampleBatchGiven(self, value, size):
+        return numpy.random.uniform(value[self.low], value[self.high], size)
+
     def evaluateInner(self, context):
         low = valueInContext(self.low, context)
         high = valueInContext(self.high, context)
@@ -1127,6 +1443,12 @@ class Normal(Distribution):
     def sampleGiven(self, value):
         return random.gauss(value[self.mean], value[self.stddev])
 
+    def supportsBatchSampling(self):
+        return True
+
+    def sampleBatchGiven(self, value, size):
+        return numpy.random.normal(value[self.mean], value[self.stddev], size)
+
     def evaluateInner(self, context):
         mean = valueInContext(self.mean, context)
         stddev = valueInContext(self.stddev, context)
@@ -1205,6 +1527,18 @@ class TruncatedNormal(Normal):
         p = alpha_cdf + unif * (beta_cdf - alpha_cdf)
         return mean + (stddev * Normal.cdfinv(0, 1, p))
 
+    def sampleBatchGiven(self, value, size):
+        import scipy.special
+
+        mean, stddev = value[self.mean], value[self.stddev]
+        alpha_cdf = scipy.special.ndtr((self.low - mean) / stddev)
+        beta_cdf = scipy.special.ndtr((self.high - mean) / stddev)
+        if numpy.any(beta_cdf - alpha_cdf < 1e-15):
+            warnings.warn("low precision when sampling TruncatedNormal")
+        unif = numpy.random.random_sample(size)
+        p = alpha_cdf + unif * (beta_cdf - alpha_cdf)
+        return mean + (stddev * scipy.special.ndtri(p))
+
     def evaluateInner(self, context):
         mean = valueInContext(self.mean, context)
         stddev = valueInContext(self.stddev, context)
@@ -1264,6 +1598,19 @@ class DiscreteRange(Distribution):
             raise RejectionException(self.emptyMessage)
         return random.randint(left, right)
 
+    def supportsBatchSampling(self):
+        if self.weights:
+            return True
+        # Constant endpoints only, so that emptiness does not vary within a batch
+        low, high = self.low, self.high
+        return not isLazy(low) and not isLazy(high) and math.ceil(low) <= math.floor(high)
+
+    def sampleBatchGiven(self, value, size):
+        if self.weights:
+            probs = numpy.asarray(self.weights, dtype=float)
+            return numpy.random.choice(self.options, size, p=probs / probs.sum())
+        return numpy.random.randint(math.ceil(self.low), math.floor(self.high) + 1, size)
+
     def supportInterval(self):
         ll, lh = supportInterval(self.low)
         hl, hh = supportInterval(self.high)
@@ -222,10 +222,16 @@ class DynamicScenario(Invocable):
         super()._step()
 
         # Check temporal requirements
+        violated = []
         for m in self._requirementMonitors:
-            result = m.value()
-            if result == rv_ltl.B4.FALSE:
-                raise RejectSimulationException(str(m))
+            if m.value() == rv_ltl.B4.FALSE:
+                self._violateRequirement(m)
+                violated.append(m)
+        if violated:
+            # Stop monitoring requirements whose violations have been recorded
+            self._requirementMonitors = [
+                m for m in self._requirementMonitors if m not in violated
+            ]
 
         # Check if we have reached the time limit, if any
         if (
@@ -305,11 +311,25 @@ class DynamicScenario(Invocable):
         if not quiet:
             for req in self._requirementMonitors:
                 if req.lastValue.is_falsy:
-                    raise RejectSimulationException(str(req))
+                    self._violateRequirement(req)
         self._requirementMonitors = None
 
         return reason
 
+    def _violateRequirement(self, req):
+        """Handle the violation of a temporal requirement.
+
+        The simulation is rejected unless it was started with
+        ``continueAfterViolations``, in which case we record the time step of the
+        violation and keep going.
+        """
+        import scenic.syntax.veneer as veneer
+
+        simulation = veneer.currentSimulation
+        if not simulation.continueAfterViolations:
+            raise RejectSimulationException(str(req))
+        simulation.requirementViolations.setdefault(str(req), simulation.currentTime)
+
     def _invokeInner(self, agent, subs):
         for sub in subs:
             if not isinstance(sub, DynamicScenario):
@@ -372,6 +392,25 @@ class DynamicScenario(Invocable):
             self._stop(endScenario)
         return terminationReason or endScenario
 
+    def _requirementVerdictsFinal(self):
+        """Whether the temporal requirements of this scenario are all decided.
+
+        This is the case if the verdicts of all their monitors are final (i.e.
+        definitely true or false), recursively for all running sub-scenarios, and no
+        new requirements can arise: there is no running compose block, which could
+        start new sub-scenarios, and no running monitor, which could still reject.
+        """
+        if self._runningIterator is not None or self._monitors:
+            return False
+        final = (rv_ltl.B4.TRUE, rv_ltl.B4.FALSE)
+        if any(m.lastValue not in final for m in self._requirementMonitors):
+            return False
+        return all(
+            sub._requirementVerdictsFinal()
+            for sub in self._subScenarios
+            if sub._isRunning
+        )
+
     def _checkSimulationTerminationConditions(self):
         for req in self._terminateSimulationConditions:
             if req.isTrue().is_truthy:
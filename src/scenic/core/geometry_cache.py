@@ -0,0 +1,206 @@
+"""Cache for expensive geometry derived from regions.
+
+Some regions are costly to build but depend only on a few parameters: for example
+the mesh of a `ViewRegion` is a boolean intersection determined by the visible
+distance and view angles, and the voxel overapproximations used for pruning depend
+only on a mesh and a couple of numbers. Such computations go through the
+`GeometryCache` `geometryCache`, keyed by canonical forms of their parameters (with
+meshes and polygons identified by digests of their contents), so that they are done
+once per process rather than once per object or per compilation.
+
+The cache is kept in memory, with least recently used entries evicted, and can
+optionally also be stored in a directory so that it persists across processes, e.g.
+the workers of a parallel evaluation or successive runs of the same scenario. The
+directory can be given to `configure`, the ``--geometry-cache`` command-line option,
+or the ``SCENIC_GEOMETRY_CACHE`` environment variable. Entries are stored as
+NumPy ``.npz`` files (without pickling), written atomically so that several processes
+can share the directory.
+"""
+
+import collections
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+import warnings
+
+import numpy
+
+# Version of the cache format; should be incremented whenever the encoding of entries
+# or the geometry they hold changes, so that stale entries are not loaded.
+_CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_DISK_SIZE = 1024**3
+
+
+def meshDigest(mesh):
+    """Digest identifying a `trimesh.Trimesh` by its vertices and faces."""
+    digest = hashlib.blake2b(digest_size=20)
+    for array in (mesh.vertices, mesh.faces):
+        array = numpy.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def geometryDigest(geometry):
+    """Digest identifying a ``shapely`` geometry by its WKB representation."""
+    return hashlib.blake2b(geometry.wkb, digest_size=20).hexdigest()
+
+
+class GeometryCache:
+    """Cache of geometry computed from canonical parameters.
+
+    Args:
+        maxEntries (int): Maximum number of entries kept in memory.
+        directory: Optional directory in which to also store entries.
+        maxDiskSize (int): Size in bytes above which the least recently used entries
+            are removed from the directory.
+
+    Attributes:
+        hits (int): Number of lookups served from memory.
+        diskHits (int): Number of lookups served from the directory.
+        misses (int): Number of lookups which required computing the value.
+    """
+
+    def __init__(
+        self,
+        maxEntries=DEFAULT_MAX_ENTRIES,
+        directory=None,
+        maxDiskSize=DEFAULT_MAX_DISK_SIZE,
+    ):
+        self.maxEntries = maxEntries
+        self.directory = None if directory is None else Path(directory)
+        self.maxDiskSize = maxDiskSize
+        self._entries = collections.OrderedDict()
+        self.hits = self.diskHits = self.misses = 0
+
+    @staticmethod
+    def key(kind, *params):
+        """Key of the entry for a kind of computation with the given parameters.
+
+        The parameters should be numbers, strings, digests, or tuples thereof; they
+        are identified by their `repr`, which is exact for floats. Numbers passed
+        directly as parameters are converted to floats, so e.g. 1 and 1.0 are the same.
+        """
+        params = tuple(
+            float(p) if isinstance(p, (int, float, numpy.number)) else p for p in params
+        )
+        text = repr((_CACHE_FORMAT_VERSION, kind, params))
+        return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+    def get(self, key, compute, encode, decode):
+        """Look up an entry, computing and storing it if necessary.
+
+        Args:
+            key: Key of the entry, as returned by `key`.
+            compute: Function with no arguments computing the value of the entry.
+            encode: Function converting a value into a dict of NumPy arrays.
+            decode: Inverse of **encode**.
+
+        Values are shared between all callers using the same key, and so must not be
+        mutated.
+        """
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+
+        value = None
+        if self.directory is not None:
+            value = self._load(key, decode)
+        if value is None:
+            self.misses += 1
+            value = compute()
+            if self.directory is not None:
+                self._save(key, encode(value))
+        else:
+            self.diskHits += 1
+
+        entries[key] = value
+        while len(entries) > self.maxEntries:
+            entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Clear the in-memory entries and statistics (but not the directory)."""
+        self._entries.clear()
+        self.hits = self.diskHits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _path(self, key):
+        return self.directory / f"{key}.npz"
+
+    def _load(self, key, decode):
+        path = self._path(key)
+        try:
+            with numpy.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            value = decode(arrays)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            warnings.warn(f"ignoring corrupted geometry cache entry {path}: {e}")
+            return None
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            pass
+        return value
+
+    def _save(self, key, arrays):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    numpy.savez(f, **arrays)
+                os.replace(tmp, self._path(key))
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            self._evict(keep=key)
+        except OSError as e:
+            warnings.warn(f"unable to store geometry in cache {self.directory}: {e}")
+
+    def _evict(self, keep):
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # removed concurrently
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxDiskSize:
+                break
+            if path.stem == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+
+#: The cache used by Scenic's built-in regions.
+geometryCache = GeometryCache(directory=os.environ.get("SCENIC_GEOMETRY_CACHE") or None)
+
+
+def configure(directory=None, maxEntries=DEFAULT_MAX_ENTRIES):
+    """Reconfigure `geometryCache`, clearing its in-memory entries.
+
+    Args:
+        directory: Optional directory in which to also store entries, allowing them
+            to be shared across processes.
+        maxEntries (int): Maximum number of entries kept in memory.
+    """
+    geometryCache.directory = None if directory is None else Path(directory)
+    geometryCache.maxEntries = maxEntries
+    geometryCache.clear()
@@ -1305,6 +1305,7 @@ class Object(OrientedPoint):
             centerMesh=False,
             _internal=True,
             _isConvex=shape.isConvex,
+            _shape=shape,
         )
 
     @property
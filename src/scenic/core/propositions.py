@@ -1,6 +1,6 @@
 """Objects representing propositions that can be used to specify conditions"""
 
-from functools import reduce
+from functools import cached_property, reduce
 import operator
 from typing import List
 
@@ -11,22 +11,119 @@ from scenic.core.lazy_eval import needsLazyEvaluation
 
 
 class PropositionMonitor:
+    """Monitor evaluating a proposition over the trace of a simulation.
+
+    The proposition is split at its top-level Boolean connectives into parts which
+    are monitored independently (see `PropositionNode.monitor_layout`). Once the
+    verdict of a part is final (`rv_ltl.B4.TRUE` or `rv_ltl.B4.FALSE`), its atomic
+    propositions are no longer evaluated; once the verdict of the whole proposition
+    is final, nothing is evaluated at all.
+    """
+
     def __init__(self, proposition: "PropositionNode") -> None:
         self._proposition = proposition
-        self._monitor = proposition.ltl_node.create_monitor()
+        self._combination, parts = proposition.monitor_layout
+        self._parts = [part_class(node) for part_class, node in parts]
+        self._value = None
+
+    def update(self):
+        if self._value in _FINAL_VALUES:
+            return self._value
+        for part in self._parts:
+            if part.value not in _FINAL_VALUES:
+                part.update()
+        self._value = _combine_verdicts(self._combination, self._parts)
+        return self._value
+
+
+_FINAL_VALUES = (rv_ltl.B4.TRUE, rv_ltl.B4.FALSE)
+
+
+def _combine_verdicts(combination, parts):
+    op, arg = combination
+    if op == "part":
+        return parts[arg].value
+    if op == "not":
+        return ~_combine_verdicts(arg, parts)
+    values = [_combine_verdicts(sub, parts) for sub in arg]
+    if op == "and":
+        return reduce(operator.and_, values, rv_ltl.B4.TRUE)
+    assert op == "or", op
+    return reduce(operator.or_, values, rv_ltl.B4.FALSE)
+
+
+def _evaluate_atomic(atomic):
+    b = atomic.closure()
+    if needsLazyEvaluation(b):
+        raise InvalidScenarioError("value undefined outside of object definition")
+    return b
+
+
+def _evaluate_state(node):
+    """Evaluate a non-temporal proposition in the current state.
+
+    Unlike `PropositionNode.evaluate`, all atomic propositions are evaluated (as the
+    `rv_ltl` monitor used to do), and the result is a `bool`.
+    """
+    if isinstance(node, Atomic):
+        return bool(_evaluate_atomic(node))
+    values = [_evaluate_state(child) for child in node.children]
+    if isinstance(node, Not):
+        return not values[0]
+    if isinstance(node, And):
+        return all(values)
+    if isinstance(node, Or):
+        return any(values)
+    assert isinstance(node, Implies), node
+    return not values[0] or values[1]
+
+
+class _MonitorPart:
+    """Part of a proposition monitored independently by a `PropositionMonitor`."""
+
+    def __init__(self, node: "PropositionNode") -> None:
+        self.node = node
+        self.value = None
 
     def update(self):
-        atomic_propositions = self._proposition.atomics()
-        state = {}
-        for ap in atomic_propositions:
-            b = ap.closure()
-            if needsLazyEvaluation(b):
-                raise InvalidScenarioError(
-                    f"value undefined outside of object definition"
-                )
-            state[str(ap.syntax_id)] = b
+        raise NotImplementedError
+
+
+class _StatePart(_MonitorPart):
+    """Non-temporal part, which only depends on the first state of the trace."""
+
+    def update(self):
+        self.value = rv_ltl.B4.from_bool(_evaluate_state(self.node))
+
+
+class _AlwaysPart(_MonitorPart):
+    """Part of the form ``always P`` for a non-temporal proposition ``P``."""
+
+    def update(self):
+        holds = _evaluate_state(self.node.req)
+        self.value = rv_ltl.B4.PRESUMABLY_TRUE if holds else rv_ltl.B4.FALSE
+
+
+class _EventuallyPart(_MonitorPart):
+    """Part of the form ``eventually P`` for a non-temporal proposition ``P``."""
+
+    def update(self):
+        holds = _evaluate_state(self.node.req)
+        self.value = rv_ltl.B4.TRUE if holds else rv_ltl.B4.PRESUMABLY_FALSE
+
+
+class _TemporalPart(_MonitorPart):
+    """Any other part, monitored by `rv_ltl`."""
+
+    def __init__(self, node: "PropositionNode") -> None:
+        super().__init__(node)
+        self._monitor = node.ltl_node.create_monitor()
+        self._atomics = node.atomics()
+
+    def update(self):
+        state = {ap.ltl_node: _evaluate_atomic(ap) for ap in self._atomics}
         self._monitor.update(state)
-        return self._monitor.evaluate()
+        self.value = self._monitor.evaluate()
 
 
 class PropositionNode:
@@ -86,6 +183,42 @@ class PropositionNode:
     def create_monitor(self) -> rv_ltl.Monitor:
         return PropositionMonitor(self)
 
+    @cached_property
+    def monitor_layout(self):
+        """How a `PropositionMonitor` splits this proposition into parts.
+
+        Returns:
+            A pair ``(combination, parts)``. Each part is a pair of a `_MonitorPart`
+            subclass and the node it monitors. The combination describes how the
+            verdict of the proposition is computed from those of the parts: it is
+            either ``("part", i)`` for the i-th part, ``("not", combination)``, or
+            ``("and", combinations)`` or ``("or", combinations)``.
+        """
+        parts = []
+
+        def split(node):
+            if not node.has_temporal_operator:
+                part = (_StatePart, node)
+            elif isinstance(node, Not):
+                return ("not", split(node.req))
+            elif isinstance(node, And):
+                return ("and", [split(req) for req in node.reqs])
+            elif isinstance(node, Or):
+                return ("or", [split(req) for req in node.reqs])
+            elif isinstance(node, Implies):
+                return ("or", [("not", split(node.lhs)), split(node.rhs)])
+            elif isinstance(node, Always) and not node.req.has_temporal_operator:
+                part = (_AlwaysPart, node)
+            elif isinstance(node, Eventually) and not node.req.has_temporal_operator:
+                part = (_EventuallyPart, node)
+            else:
+                part = (_TemporalPart, node)
+            parts.append(part)
+            return ("part", len(parts) - 1)
+
+        combination = split(self)
+        return combination, parts
+
     def evaluate(self):
         raise RuntimeError(
             "This proposition contains temporal operators and can only be evaluated using monitor"
@@ -8,11 +8,12 @@ Manipulations of meshes is done using the
 """
 
 from abc import ABC, abstractmethod
-import itertools
+import functools
 import math
 import random
 import warnings
 
+import fcl
 import numpy
 import scipy
 import shapely
@@ -54,9 +55,16 @@ from scenic.core.geometry import (
     sin,
     triangulatePolygon,
 )
+from scenic.core.geometry_cache import geometryCache, geometryDigest, meshDigest
 from scenic.core.lazy_eval import isLazy, valueInContext
 from scenic.core.type_support import toOrientation, toScalar, toVector
-from scenic.core.utils import cached, cached_method, cached_property, unifyMesh
+from scenic.core.utils import (
+    AliasTable,
+    cached,
+    cached_method,
+    cached_property,
+    unifyMesh,
+)
 from scenic.core.vectors import (
     Orientation,
     OrientedVector,
@@ -184,6 +192,52 @@ class Region(Samplable, ABC):
     def sampleGiven(self, value):
         return self
 
+    def uniformPoints(self, count):
+        """Sample a batch of points uniformly from this `Region`.
+
+        The :term:`preferred orientation` of the region, if any, is ignored.
+
+        Returns:
+            An array of shape (count, 3). By default this calls `uniformPointInner`
+            repeatedly, but subclasses override it with vectorized implementations.
+        """
+        points = [tuple(self.uniformPointInner()) for _ in range(count)]
+        return numpy.array(points, dtype=float).reshape((count, 3))
+
+    def containsPoints(self, points):
+        """Check which of an array of points this `Region` contains.
+
+        Args:
+            points: An array of shape (N, 3), or (N, 2) for points with z = 0.
+
+        Returns:
+            A boolean array of length N. By default this calls `containsPoint` for each
+            point, but subclasses override it with vectorized implementations.
+        """
+        points = toPointArray(points)
+        return numpy.fromiter(
+            (self.containsPoint(Vector(*point)) for point in points),
+            dtype=bool,
+            count=len(points),
+        )
+
+    def distancesTo(self, points):
+        """Distances to this `Region` from an array of points.
+
+        Args:
+            points: An array of shape (N, 3), or (N, 2) for points with z = 0.
+
+        Returns:
+            An array of length N. By default this calls `distanceTo` for each point, but
+            subclasses override it with vectorized implementations.
+        """
+        points = toPointArray(points)
+        return numpy.fromiter(
+            (self.distanceTo(Vector(*point)) for point in points),
+            dtype=float,
+            count=len(points),
+        )
+
     def _trueContainsPoint(self, point) -> bool:
         """Whether or not this region could produce point when sampled.
 
@@ -305,6 +359,9 @@ class AllRegion(Region):
     def containsPoint(self, point):
         return True
 
+    def containsPoints(self, points):
+        return numpy.ones(len(toPointArray(points)), dtype=bool)
+
     def containsObject(self, obj):
         return True
 
@@ -314,6 +371,9 @@ class AllRegion(Region):
     def distanceTo(self, point):
         return 0
 
+    def distancesTo(self, points):
+        return numpy.zeros(len(toPointArray(points)))
+
     def projectVector(self, point, onDirection):
         return point
 
@@ -357,6 +417,9 @@ class EmptyRegion(Region):
     def containsPoint(self, point):
         return False
 
+    def containsPoints(self, points):
+        return numpy.zeros(len(toPointArray(points)), dtype=bool)
+
     def containsObject(self, obj):
         return False
 
@@ -366,6 +429,9 @@ class EmptyRegion(Region):
     def distanceTo(self, point):
         return float("inf")
 
+    def distancesTo(self, points):
+        return numpy.full(len(toPointArray(points)), math.inf)
+
     def projectVector(self, point, onDirection):
         raise RejectionException("Projecting vector onto empty Region")
 
@@ -442,6 +508,13 @@ class IntersectionRegion(Region):
     def containsPoint(self, point):
         return all(region.containsPoint(point) for region in self.footprint.regions)
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        contained = numpy.ones(len(points), dtype=bool)
+        for region in self.footprint.regions:
+            contained[contained] = region.containsPoints(points[contained])
+        return contained
+
     def containsObject(self, obj):
         return all(region.containsObject(obj) for region in self.footprint.regions)
 
@@ -555,6 +628,13 @@ class UnionRegion(Region):
     def containsPoint(self, point):
         return any(region.containsPoint(point) for region in self.footprint.regions)
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        contained = numpy.zeros(len(points), dtype=bool)
+        for region in self.footprint.regions:
+            contained[~contained] = region.containsPoints(points[~contained])
+        return contained
+
     def containsObject(self, obj):
         raise NotImplementedError
 
@@ -654,6 +734,12 @@ class DifferenceRegion(Region):
             point
         ) and not self.footprint.regionB.containsPoint(point)
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        contained = self.footprint.regionA.containsPoints(points)
+        contained[contained] = ~self.footprint.regionB.containsPoints(points[contained])
+        return contained
+
     def containsObject(self, obj):
         return self.footprint.regionA.containsObject(
             obj
@@ -698,6 +784,140 @@ class DifferenceRegion(Region):
         return f"DifferenceRegion({self.regionA!r}, {self.regionB!r})"
 
 
+class _Tetrahedra:
+    """Decomposition of a mesh into tetrahedra sharing an apex, for uniform sampling.
+
+    Each face of the mesh forms a tetrahedron with the apex, whose signed volume is
+    positive if the face is oriented away from the apex. The apex is whichever of the
+    center of mass and the center of the bounding box gives the least negative volume;
+    for convex (and other star-shaped) meshes none is negative, and the tetrahedra
+    partition the volume. Decompositions are shared between all regions with the same
+    mesh through `geometryCache`.
+
+    Attributes:
+        apex: The common apex of the tetrahedra.
+        triangles: The faces forming tetrahedra with positive volume.
+        volumes: The volumes of these tetrahedra.
+        negative: The faces forming tetrahedra with negative volume.
+        table: `AliasTable` over **volumes**.
+        inverses: Inverses of the edge matrices of the positive tetrahedra, giving the
+            barycentric coordinates of a point relative to the apex.
+        negativeInverses: Likewise for the negative tetrahedra (or `None` if there
+            are none).
+    """
+
+    def __init__(self, apex, triangles, volumes, negative):
+        self.apex = apex
+        self.triangles = triangles
+        self.volumes = volumes
+        self.negative = negative
+        self.table = AliasTable(volumes)
+        self.totalVolume = numpy.sum(volumes)
+        self.inverses = self._edgeInverses(triangles)
+        self.negativeInverses = (
+            self._edgeInverses(negative) if len(negative) > 0 else None
+        )
+
+    @classmethod
+    def forMesh(cls, mesh):
+        key = geometryCache.key("tetrahedra", meshDigest(mesh))
+        compute = functools.partial(cls._compute, mesh)
+        return geometryCache.get(key, compute, cls._encode, cls._decode)
+
+    @classmethod
+    def _compute(cls, mesh):
+        triangles = mesh.triangles
+        best = None
+        for apex in (mesh.center_mass, mesh.bounding_box.centroid):
+            offsets = triangles - apex
+            volumes = (
+                numpy.einsum(
+                    "ij,ij->i",
+                    offsets[:, 0],
+                    numpy.cross(offsets[:, 1], offsets[:, 2]),
+                )
+                / 6
+            )
+            negativeVolume = -numpy.sum(volumes[volumes < 0])
+            if best is None or negativeVolume < best[0]:
+                best = (negativeVolume, apex, volumes)
+            if negativeVolume == 0:
+                break
+        _, apex, volumes = best
+        positive = volumes > 0
+        return cls(
+            numpy.asarray(apex, dtype=float),
+            triangles[positive],
+            volumes[positive],
+            triangles[volumes < 0],
+        )
+
+    def _encode(self):
+        return {
+            "apex": self.apex,
+            "triangles": self.triangles,
+            "volumes": self.volumes,
+            "negative": self.negative,
+        }
+
+    @classmethod
+    def _decode(cls, arrays):
+        return cls(**arrays)
+
+    def _edgeInverses(self, triangles):
+        return numpy.linalg.inv((triangles - self.apex).transpose(0, 2, 1))
+
+    def countContaining(self, points, negative=False):
+        """Count how many of the positive (or negative) tetrahedra contain each point."""
+        inverses = self.negativeInverses if negative else self.inverses
+        counts = numpy.zeros(len(points), dtype=int)
+        # Limit the size of the (points x tetrahedra) arrays of coordinates
+        chunk = max(1, 2**18 // len(inverses))
+        for start in range(0, len(points), chunk):
+            offsets = points[start : start + chunk] - self.apex
+            coords = numpy.einsum("tij,nj->nti", inverses, offsets)
+            inside = numpy.all(coords >= 0, axis=2) & (numpy.sum(coords, axis=2) <= 1)
+            counts[start : start + chunk] = numpy.sum(inside, axis=1)
+        return counts
+
+
+def _encodeMesh(mesh):
+    return {"vertices": mesh.vertices, "faces": mesh.faces}
+
+
+def _decodeMesh(arrays):
+    return trimesh.Trimesh(arrays["vertices"], arrays["faces"], process=False)
+
+
+def _encodeVoxels(region):
+    if isinstance(region, EmptyRegion):
+        return {}
+    grid = region.voxelGrid
+    return {"matrix": grid.encoding.dense, "transform": grid.transform}
+
+
+def _decodeVoxels(arrays):
+    if not arrays:
+        return nowhere
+    encoding = trimesh.voxel.encoding.DenseEncoding(arrays["matrix"])
+    grid = trimesh.voxel.VoxelGrid(encoding, transform=arrays["transform"])
+    return VoxelRegion(voxelGrid=grid, lazy=True)
+
+
+def toPointArray(points):
+    """Convert points to an array of shape (N, 3), with z = 0 for 2D points."""
+    points = numpy.asarray(points, dtype=float)
+    if points.ndim == 1 and len(points) == 0:
+        points = points.reshape((0, 3))
+    if points.ndim != 2 or points.shape[1] not in (2, 3):
+        raise ValueError(
+            f"expected an array of 2D or 3D points, got shape {points.shape}"
+        )
+    if points.shape[1] == 2:
+        points = numpy.column_stack((points, numpy.zeros(len(points))))
+    return points
+
+
 def toPolygon(thing):
     if needsSampling(thing):
         return None
@@ -1076,9 +1296,11 @@ class MeshVolumeRegion(MeshRegion):
         onDirection: The direction to use if an object being placed on this region doesn't specify one.
     """
 
-    def __init__(self, *args, _internal=False, _isConvex=None, **kwargs):
+    def __init__(self, *args, _internal=False, _isConvex=None, _shape=None, **kwargs):
         super().__init__(*args, **kwargs)
         self._isConvex = _isConvex
+        # Shape whose scaled mesh was transformed to get this region's mesh, if any
+        self._shape = _shape
 
         if isLazy(self):
             return
@@ -1166,16 +1388,8 @@ class MeshVolumeRegion(MeshRegion):
 
             if s_candidate_point is not None and o_candidate_point is not None:
                 # Compute the inradius of each object from its candidate point.
-                s_inradius = abs(
-                    trimesh.proximity.ProximityQuery(self.mesh).signed_distance(
-                        [s_candidate_point]
-                    )[0]
-                )
-                o_inradius = abs(
-                    trimesh.proximity.ProximityQuery(other.mesh).signed_distance(
-                        [o_candidate_point]
-                    )[0]
-                )
+                s_inradius = abs(self._signedDistances([s_candidate_point])[0])
+                o_inradius = abs(other._signedDistances([o_candidate_point])[0])
 
                 # Compute the circumradius of each object from its candidate point.
                 s_circumradius = numpy.max(
@@ -1195,20 +1409,23 @@ class MeshVolumeRegion(MeshRegion):
                     return False
 
             # PASS 3
-            # Use Trimesh's collision manager to check for intersection.
+            # Use FCL to check for intersection.
             # If the surfaces collide, that implies a collision of the volumes.
             # Cheaper than computing volumes immediately.
-            collision_manager = trimesh.collision.CollisionManager()
-
-            collision_manager.add_object("SelfRegion", self.mesh)
-            collision_manager.add_object("OtherRegion", other.mesh)
-
-            surface_collision = collision_manager.in_collision_internal()
+            surface_collision = (
+                fcl.collide(
+                    self._collisionObject(),
+                    other._collisionObject(),
+                    fcl.CollisionRequest(),
+                    fcl.CollisionResult(),
+                )
+                > 0
+            )
 
             if surface_collision:
                 return True
 
-            if self.mesh.is_convex and other.mesh.is_convex:
+            if self.isConvex and other.isConvex:
                 # For convex shapes, the manager detects containment as well as
                 # surface intersections, so we can just return the result
                 return surface_collision
@@ -1292,6 +1509,20 @@ class MeshVolumeRegion(MeshRegion):
         """Check if this region's volume contains a point."""
         return self.distanceTo(point) <= self.tolerance
 
+    def containsPoints(self, points):
+        """Check which of an array of points this region's volume contains."""
+        points = toPointArray(points)
+        # Points outside the bounding box (with tolerance) can't be contained
+        low, high = self.mesh.bounds
+        candidates = numpy.all(
+            (low - self.tolerance <= points) & (points <= high + self.tolerance), axis=1
+        )
+        contained = numpy.zeros(len(points), dtype=bool)
+        if numpy.any(candidates):
+            distances = self._signedDistances(points[candidates])
+            contained[candidates] = numpy.maximum(-distances, 0) <= self.tolerance
+        return contained
+
     @distributionFunction
     def containsObject(self, obj):
         """Check if this region's volume contains an :obj:`~scenic.core.object_types.Object`."""
@@ -1709,23 +1940,60 @@ class MeshVolumeRegion(MeshRegion):
         return super().difference(other)
 
     def uniformPointInner(self):
-        # TODO: Look into tetrahedralization, perhaps to be turned on when a heuristic
-        # is met. Currently using Trimesh's rejection sampling.
-        sample = trimesh.sample.volume_mesh(self.mesh, self.num_samples)
+        return Vector(*self.uniformPoints(1)[0])
+
+    def uniformPoints(self, count):
+        """Sample a batch of points uniformly from this region's volume.
+
+        Points are drawn from the tetrahedra of `_tetrahedra`: a tetrahedron is picked
+        with probability proportional to its volume using an alias table, and then a
+        point is drawn uniformly from it. If the mesh is star-shaped with respect to the
+        apex of the tetrahedra (e.g. if it is convex), the tetrahedra partition the mesh
+        and each point takes constant time, with no rejections.
+
+        Otherwise the tetrahedra overlap and extend outside the mesh, and sampling falls
+        back to rejection: each point is kept with probability equal to the winding
+        number of the mesh around it divided by the number of tetrahedra containing it,
+        which keeps the points exactly uniform. Each candidate point then takes time
+        linear in the number of faces of the mesh, candidates are drawn in proportion
+        to the total volume of the tetrahedra over that of the mesh, and
+        `RejectionException` is raised if not enough points are accepted in 100 rounds.
+        """
+        tetrahedra = self._tetrahedra
+        nonStarShaped = tetrahedra.negativeInverses is not None
+        points = numpy.zeros((0, 3))
+        for _ in range(100):
+            needed = count - len(points)
+            if needed <= 0:
+                return points[:count]
+            if nonStarShaped:
+                # Oversample according to the expected acceptance rate
+                needed = math.ceil(needed * tetrahedra.totalVolume / self.mesh.volume)
+            weights = numpy.random.exponential(size=(needed, 4))
+            weights /= numpy.sum(weights, axis=1)[:, numpy.newaxis]
+            chosen = tetrahedra.triangles[tetrahedra.table.sample(needed)]
+            batch = weights[:, :1] * tetrahedra.apex + numpy.einsum(
+                "ni,nij->nj", weights[:, 1:], chosen
+            )
+            if nonStarShaped:
+                covering = tetrahedra.countContaining(batch)
+                winding = covering - tetrahedra.countContaining(batch, negative=True)
+                accept = numpy.random.random_sample(needed) * covering < winding
+                batch = batch[accept]
+            points = numpy.concatenate((points, batch))
+        raise RejectionException("Rejection sampling MeshVolumeRegion failed.")
 
-        if len(sample) == 0:
-            raise RejectionException("Rejection sampling MeshVolumeRegion failed.")
-        else:
-            return Vector(*sample[0])
+    @cached_property
+    def _tetrahedra(self):
+        """The `_Tetrahedra` decomposition of the mesh, for uniform sampling."""
+        return _Tetrahedra.forMesh(self.mesh)
 
     @distributionFunction
     def distanceTo(self, point):
         """Get the minimum distance from this region to the specified point."""
         point = toVector(point, f"Could not convert {point} to vector.")
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-
-        dist = pq.signed_distance([point.coordinates])[0]
+        dist = self._signedDistances([point.coordinates])[0]
 
         # Positive distance indicates being contained in the mesh.
         if dist > 0:
@@ -1733,6 +2001,12 @@ class MeshVolumeRegion(MeshRegion):
 
         return abs(dist)
 
+    def distancesTo(self, points):
+        """Get the minimum distances from this region to an array of points."""
+        distances = self._signedDistances(toPointArray(points))
+        # Positive distances indicate being contained in the mesh.
+        return numpy.maximum(-distances, 0)
+
     @cached_property
     @distributionFunction
     def inradius(self):
@@ -1750,6 +2024,69 @@ class MeshVolumeRegion(MeshRegion):
     def isConvex(self):
         return self.mesh.is_convex if self._isConvex is None else self._isConvex
 
+    def _scaledShapeGeometry(self):
+        """The `ScaledShapeGeometry` this region's mesh was placed from, if any.
+
+        Used to share expensive data (e.g. for collision checking) between the
+        occupied spaces of all objects with the same shape and dimensions.
+        """
+        if self._shape is None:
+            return None
+        return self._shape._scaledGeometry(self.dimensions)
+
+    def _pose(self):
+        rotation = numpy.eye(3) if self.rotation is None else self.rotation.r.as_matrix()
+        position = numpy.zeros(3) if self.position is None else numpy.array(self.position)
+        return rotation, position
+
+    def _collisionObject(self):
+        """An FCL collision object for this region's mesh."""
+        geometry = self._scaledShapeGeometry()
+        if geometry is not None:
+            return geometry.collisionObject(*self._pose())
+        if self.isConvex:
+            model = trimesh.collision.mesh_to_convex(self.mesh)
+        else:
+            model = trimesh.collision.mesh_to_BVH(self.mesh)
+        return fcl.CollisionObject(model, fcl.Transform())
+
+    def _signedDistances(self, points):
+        """Signed distances from this region's mesh to some points.
+
+        As for `trimesh.proximity.ProximityQuery.signed_distance`, distances are
+        positive for points inside the mesh.
+        """
+        geometry = self._scaledShapeGeometry()
+        if geometry is not None:
+            return geometry.signedDistances(*self._pose(), points)
+        return self.mesh.nearest.signed_distance(points)
+
+    def _intersectRays(self, origins, directions):
+        """Intersect rays with this region's mesh.
+
+        Returns:
+            The locations of the hits and the indices of the corresponding rays, as
+            for `trimesh.ray.ray_triangle.RayMeshIntersector.intersects_location`.
+        """
+        geometry = self._scaledShapeGeometry()
+        if geometry is not None:
+            return geometry.intersectRays(*self._pose(), origins, directions)
+        locations, rayIndices, _ = self.mesh.ray.intersects_location(
+            ray_origins=origins, ray_directions=directions
+        )
+        return locations, rayIndices
+
+    @cached_property
+    def _boundingPolygonHull(self):
+        assert not isLazy(self)
+        geometry = self._scaledShapeGeometry()
+        if geometry is None:
+            points = self.mesh.vertices
+        else:
+            rotation, position = self._pose()
+            points = geometry.hullVertices @ rotation.T + position
+        return shapely.multipoints(points).convex_hull
+
     @property
     def dimensionality(self):
         return 3
@@ -1769,8 +2106,13 @@ class MeshVolumeRegion(MeshRegion):
 
         Erode as much as possible, but no more than maxErosion, outputting
         a VoxelRegion. Note that this can sometimes return a larger region
-        than the original mesh
+        than the original mesh. Results are cached in `geometryCache`.
         """
+        key = geometryCache.key("erode", meshDigest(self.mesh), maxErosion, pitch)
+        compute = functools.partial(self._erodeVoxels, maxErosion, pitch)
+        return geometryCache.get(key, compute, _encodeVoxels, _decodeVoxels)
+
+    def _erodeVoxels(self, maxErosion, pitch):
         # Compute a voxel overapproximation of the mesh. Technically this is not
         # an overapproximation, but one dilation with a rank 3 structuring unit
         # with connectivity 3 is. To simplify, we just erode one fewer time than
@@ -1795,7 +2137,8 @@ class MeshVolumeRegion(MeshRegion):
 
         Buffer as little as possible, but at least minBuffer. If pitch is
         less than 1, the output is a VoxelRegion. If pitch is 1, a fast
-        path is taken which returns a BoxRegion.
+        path is taken which returns a BoxRegion. Voxel results are cached in
+        `geometryCache`.
         """
         if pitch >= 1:
             # First extract the bounding box of the mesh, and then extend each dimension
@@ -1804,23 +2147,28 @@ class MeshVolumeRegion(MeshRegion):
             midpoint = numpy.mean(bounds, axis=0)
             extents = numpy.diff(bounds, axis=0)[0] + 2 * minBuffer
             return BoxRegion(position=toVector(midpoint), dimensions=list(extents))
-        else:
-            # Compute a voxel overapproximation of the mesh. Technically this is not
-            # an overapproximation, but one dilation with a rank 3 structuring unit
-            # with connectivity 3 is. To simplify, we just dilate one additional time
-            # than needed.
-            target_pitch = pitch * max(self.mesh.extents)
-            voxelized_mesh = self.voxelized(target_pitch, lazy=True)
 
-            # Dilate the voxel region. Dilation is done with a rank 3 structuring unit with
-            # connectivity 3 (a 3x3x3 cube of voxels). Each dilation pass must dilate by at
-            # least pitch. Therefore we must make at least ceil(minBuffer/pitch) passes to
-            # guarantee dilating at least minBuffer. We also add 1 iteration for the reasons above.
-            iterations = math.ceil(minBuffer / pitch) + 1
+        key = geometryCache.key("buffer", meshDigest(self.mesh), minBuffer, pitch)
+        compute = functools.partial(self._bufferVoxels, minBuffer, pitch)
+        return geometryCache.get(key, compute, _encodeVoxels, _decodeVoxels)
+
+    def _bufferVoxels(self, minBuffer, pitch):
+        # Compute a voxel overapproximation of the mesh. Technically this is not
+        # an overapproximation, but one dilation with a rank 3 structuring unit
+        # with connectivity 3 is. To simplify, we just dilate one additional time
+        # than needed.
+        target_pitch = pitch * max(self.mesh.extents)
+        voxelized_mesh = self.voxelized(target_pitch, lazy=True)
+
+        # Dilate the voxel region. Dilation is done with a rank 3 structuring unit with
+        # connectivity 3 (a 3x3x3 cube of voxels). Each dilation pass must dilate by at
+        # least pitch. Therefore we must make at least ceil(minBuffer/pitch) passes to
+        # guarantee dilating at least minBuffer. We also add 1 iteration for the reasons above.
+        iterations = math.ceil(minBuffer / pitch) + 1
 
-            dilated_mesh = voxelized_mesh.dilation(iterations=iterations)
+        dilated_mesh = voxelized_mesh.dilation(iterations=iterations)
 
-            return dilated_mesh
+        return dilated_mesh
 
     @cached_method
     def getSurfaceRegion(self):
@@ -1938,6 +2286,10 @@ class MeshSurfaceRegion(MeshRegion):
         # If the minimum distance is within tolerance of 0, the mesh contains the point.
         return min_distance < self.tolerance
 
+    def containsPoints(self, points):
+        """Check which of an array of points this region's surface contains."""
+        return self.distancesTo(points) < self.tolerance
+
     def containsObject(self, obj):
         # A surface cannot contain an object, which must have a volume.
         return False
@@ -1963,12 +2315,18 @@ class MeshSurfaceRegion(MeshRegion):
         """Get the minimum distance from this object to the specified point."""
         point = toVector(point, f"Could not convert {point} to vector.")
 
-        pq = trimesh.proximity.ProximityQuery(self.mesh)
-
-        dist = abs(pq.signed_distance([point.coordinates])[0])
+        dist = abs(self.mesh.nearest.signed_distance([point.coordinates])[0])
 
         return dist
 
+    def distancesTo(self, points):
+        """Get the minimum distances from this surface to an array of points."""
+        points = toPointArray(points)
+        if len(points) == 0:
+            return numpy.zeros(0)
+        _, distances, _ = self.mesh.nearest.on_surface(points)
+        return distances
+
     @property
     def dimensionality(self):
         return 2
@@ -2160,6 +2518,13 @@ class VoxelRegion(Region):
 
         return numpy.all(voxel_low <= point) & numpy.all(point <= voxel_high)
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        _, indices = self.kdTree.query(points)
+        closest_points = self.voxel_points[indices]
+        offsets = numpy.abs(points - closest_points)
+        return numpy.all(offsets <= self.scale / 2, axis=1)
+
     def containsObject(self, obj):
         raise NotImplementedError
 
@@ -2421,6 +2786,11 @@ class PolygonalFootprintRegion(Region):
         point = toVector(point)
         return shapely.intersects_xy(self.polygons, point.x, point.y)
 
+    def containsPoints(self, points):
+        """Checks which of an array of points are contained in the polygonal footprint."""
+        points = toPointArray(points)
+        return shapely.intersects_xy(self.polygons, points[:, 0], points[:, 1])
+
     def containsObject(self, obj):
         """Checks if an object is contained in the polygonal footprint.
 
@@ -2458,6 +2828,11 @@ class PolygonalFootprintRegion(Region):
         point = toVector(point)
         return self.polygons.distance(makeShapelyPoint(point))
 
+    def distancesTo(self, points):
+        """Minimum distances from this polygonal footprint to an array of points"""
+        points = toPointArray(points)
+        return shapely.distance(self.polygons, shapely.points(points[:, :2]))
+
     def projectVector(self, point, onDirection):
         raise NotImplementedError(
             f'{type(self).__name__} does not yet support projection using "on"'
@@ -2507,7 +2882,17 @@ class PolygonalFootprintRegion(Region):
         Args:
             centerZ: The resulting mesh will be vertically centered at this height.
             height: The resulting mesh will have this height.
+
+        Results are cached in `geometryCache`.
         """
+        key = geometryCache.key(
+            "boundFootprint", geometryDigest(self.polygons), centerZ, height
+        )
+        compute = functools.partial(self._boundFootprintMesh, centerZ, height)
+        mesh = geometryCache.get(key, compute, _encodeMesh, _decodeMesh)
+        return MeshVolumeRegion(mesh, centerMesh=False)
+
+    def _boundFootprintMesh(self, centerZ, height):
         # Fall back on progressively higher buffering and simplification to
         # get the mesh to be a valid volume
         tol_sizes = [None, 0.00001, 0.0001, 0.001, 0.01, 0.1, 1]
@@ -2551,7 +2936,7 @@ class PolygonalFootprintRegion(Region):
                 "Computing bounded footprint of polygon resulted in invalid volume"
             )
 
-        return MeshVolumeRegion(polygon_mesh, centerMesh=False)
+        return polygon_mesh
 
     def buffer(self, amount):
         buffered_polygon = self.polygons.buffer(amount)
@@ -2655,6 +3040,9 @@ class PathRegion(Region):
     def containsPoint(self, point):
         return self.distanceTo(point) < self.tolerance
 
+    def containsPoints(self, points):
+        return self.distancesTo(points) < self.tolerance
+
     def containsObject(self, obj):
         return False
 
@@ -2664,6 +3052,16 @@ class PathRegion(Region):
     def distanceTo(self, point):
         return self._segmentDistanceHelper(point).min()
 
+    def distancesTo(self, points):
+        points = toPointArray(points)
+        # Limit the size of the (points x segments) arrays of distances
+        chunk = max(1, 2**20 // len(self._edgeVectorArray))
+        distances = [
+            self._segmentDistances(points[i : i + chunk]).min(axis=1)
+            for i in range(0, len(points), chunk)
+        ]
+        return numpy.concatenate(distances) if distances else numpy.zeros(0)
+
     def nearestSegmentTo(self, point):
         nearest_segment = self._edgeVectorArray[
             self._segmentDistanceHelper(point).argmin()
@@ -2673,21 +3071,23 @@ class PathRegion(Region):
     def _segmentDistanceHelper(self, point):
         """Returns distance to point from each line segment"""
         p = numpy.asarray(toVector(point))
+        return self._segmentDistances(p[numpy.newaxis])[0]
+
+    def _segmentDistances(self, points):
+        """Returns distances to an array of points from each line segment"""
         a = self._edgeVectorArray[:, 0:3]
         b = self._edgeVectorArray[:, 3:6]
-        a_min_p = a - p
+        a_min_p = a - points[:, numpy.newaxis]
 
-        d = (b - a) / numpy.linalg.norm(b - a, axis=1).reshape(len(a), 1)
+        d = self._normalizedEdgeDirections
 
         # Parallel distances from each end point. Negative indicates on the line segment
-        a_dist = numpy.sum((a_min_p) * d, axis=1)
-        b_dist = numpy.sum((p - b) * d, axis=1)
+        a_dist = numpy.sum((a_min_p) * d, axis=2)
+        b_dist = numpy.sum((points[:, numpy.newaxis] - b) * d, axis=2)
 
         # Actual parallel distance is 0 if on the line segment.
-        parallel_dist = numpy.amax(
-            [a_dist, b_dist, numpy.zeros(len(self._edgeVectorArray))], axis=0
-        )
-        perp_dist = numpy.linalg.norm(numpy.cross(a_min_p, d), axis=1)
+        parallel_dist = numpy.maximum(numpy.maximum(a_dist, b_dist), 0)
+        perp_dist = numpy.linalg.norm(numpy.cross(a_min_p, d), axis=2)
 
         return numpy.hypot(parallel_dist, perp_dist)
 
@@ -2827,6 +3227,9 @@ class PolygonalRegion(Region):
     def containsPoint(self, point):
         return self.footprint.containsPoint(point)
 
+    def containsPoints(self, points):
+        return self.footprint.containsPoints(points)
+
     @distributionFunction
     def _trueContainsPoint(self, point):
         return point.z == self.z and self.containsPoint(point)
@@ -2841,21 +3244,34 @@ class PolygonalRegion(Region):
         for polygon in self.polygons.geoms:
             triangles.extend(triangulatePolygon(polygon))
         assert len(triangles) > 0, self.polygons
-        shapely.prepare(triangles)
-        trianglesAndBounds = tuple((tri, tri.bounds) for tri in triangles)
-        areas = (triangle.area for triangle in triangles)
-        cumulativeTriangleAreas = tuple(itertools.accumulate(areas))
-        return trianglesAndBounds, cumulativeTriangleAreas
+        vertices = numpy.array([triangle.exterior.coords[:3] for triangle in triangles])
+        # Vertices relative to the first vertex of each triangle
+        origins = vertices[:, 0]
+        edges = vertices[:, 1:] - origins[:, numpy.newaxis]
+        areas = numpy.abs(numpy.cross(edges[:, 0], edges[:, 1]))
+        return origins, edges, AliasTable(areas)
 
     def uniformPointInner(self):
-        trisAndBounds, cumulativeAreas = self._samplingData
-        triangle, bounds = random.choices(trisAndBounds, cum_weights=cumulativeAreas)[0]
-        minx, miny, maxx, maxy = bounds
-        # TODO improve?
-        while True:
-            x, y = random.uniform(minx, maxx), random.uniform(miny, maxy)
-            if shapely.intersects_xy(triangle, x, y):
-                return self.orient(Vector(x, y, self.z))
+        origins, edges, table = self._samplingData
+        index = table.draw()
+        (ox, oy), ((ux, uy), (vx, vy)) = origins[index].tolist(), edges[index].tolist()
+        s, t = random.random(), random.random()
+        if s + t > 1:
+            s, t = 1 - s, 1 - t
+        x, y = ox + s * ux + t * vx, oy + s * uy + t * vy
+        return self.orient(Vector(x, y, self.z))
+
+    def uniformPoints(self, count):
+        origins, edges, table = self._samplingData
+        indices = table.sample(count)
+        weights = numpy.random.random_sample((count, 2))
+        flip = weights.sum(axis=1) > 1
+        weights[flip] = 1 - weights[flip]
+        points = numpy.full((count, 3), float(self.z))
+        points[:, :2] = origins[indices] + numpy.einsum(
+            "ni,nij->nj", weights, edges[indices]
+        )
+        return points
 
     @distributionFunction
     def intersects(self, other, triedReversed=False):
@@ -2993,6 +3409,11 @@ class PolygonalRegion(Region):
         dist2D = shapely.distance(self.polygons, makeShapelyPoint(point))
         return math.hypot(dist2D, point[2] - self.z)
 
+    def distancesTo(self, points):
+        points = toPointArray(points)
+        dist2D = shapely.distance(self.polygons, shapely.points(points[:, :2]))
+        return numpy.hypot(dist2D, points[:, 2] - self.z)
+
     @cached_property
     @distributionFunction
     def inradius(self):
@@ -3121,6 +3542,11 @@ class CircularRegion(PolygonalRegion):
 
         return point.distanceTo(self.center) <= self.radius
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        centerDistances = numpy.linalg.norm(points - numpy.array(self.center), axis=1)
+        return (points[:, 2] == self.z) & (centerDistances <= self.radius)
+
     def distanceTo(self, point):
         point = toVector(point)
 
@@ -3129,6 +3555,16 @@ class CircularRegion(PolygonalRegion):
 
         return super().distanceTo(point)
 
+    def distancesTo(self, points):
+        points = toPointArray(points)
+        distances = super().distancesTo(points)
+        flat = points[:, 2] == 0
+        centerDistances = numpy.linalg.norm(
+            points[flat] - numpy.array(self.center), axis=1
+        )
+        distances[flat] = numpy.maximum(0, centerDistances - self.radius)
+        return distances
+
     def uniformPointInner(self):
         x, y, z = self.center
         r = random.triangular(0, self.radius, self.radius)
@@ -3234,6 +3670,19 @@ class SectorRegion(PolygonalRegion):
 
         return point.distanceTo(self.center) <= self.radius
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        offsets = points - numpy.array(self.center)
+        viewAngles = numpy.arctan2(offsets[:, 1], offsets[:, 0]) - (
+            self.heading + (math.pi / 2.0)
+        )
+        viewAngles = numpy.mod(viewAngles + math.pi, math.tau) - math.pi
+        return (
+            (points[:, 2] == self.z)
+            & (numpy.abs(viewAngles) <= self.angle / 2.0)
+            & (numpy.linalg.norm(offsets, axis=1) <= self.radius)
+        )
+
     def uniformPointInner(self):
         x, y, z = self.center
         heading, angle, maxDist = self.heading, self.angle, self.radius
@@ -3568,6 +4017,12 @@ class PolylineRegion(Region):
             return False
         return shapely.intersects_xy(self.lineString, point.x, point.y)
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        return (points[:, 2] == 0) & shapely.intersects_xy(
+            self.lineString, points[:, 0], points[:, 1]
+        )
+
     def containsObject(self, obj):
         return False
 
@@ -3577,6 +4032,11 @@ class PolylineRegion(Region):
         dist2D = self.lineString.distance(makeShapelyPoint(point))
         return math.hypot(dist2D, point.z)
 
+    def distancesTo(self, points):
+        points = toPointArray(points)
+        dist2D = shapely.distance(self.lineString, shapely.points(points[:, :2]))
+        return numpy.hypot(dist2D, points[:, 2])
+
     def projectVector(self, point, onDirection):
         raise TypeError('PolylineRegion does not support projection using "on"')
 
@@ -3740,7 +4200,7 @@ class PointSetRegion(Region):
         return self.orient(Vector(*self.points[i]))
 
     def intersects(self, other, triedReversed=False):
-        return any(other.containsPoint(pt) for pt in self.points)
+        return bool(numpy.any(other.containsPoints(self.points)))
 
     def intersect(self, other, triedReversed=False):
         def sampler(intRegion):
@@ -3763,6 +4223,9 @@ class PointSetRegion(Region):
         distance, location = self.kdTree.query(point)
         return distance <= self.tolerance
 
+    def containsPoints(self, points):
+        return self.distancesTo(points) <= self.tolerance
+
     def containsObject(self, obj):
         return False
 
@@ -3788,6 +4251,10 @@ class PointSetRegion(Region):
         distance, _ = self.kdTree.query(point)
         return distance
 
+    def distancesTo(self, points):
+        distances, _ = self.kdTree.query(toPointArray(points))
+        return distances
+
     def projectVector(self, point, onDirection):
         raise TypeError('PointSetRegion does not support projection using "on"')
 
@@ -3887,6 +4354,15 @@ class GridRegion(PointSetRegion):
         x, y = gp
         return self.grid[y, x] == 0
 
+    def containsPoints(self, points):
+        points = toPointArray(points)
+        x = numpy.round((points[:, 0] - self.Bx) / self.Ax)
+        y = numpy.round((points[:, 1] - self.By) / self.Ay)
+        inGrid = (0 <= x) & (x < self.sizeX) & (0 <= y) & (y < self.sizeY)
+        contained = numpy.zeros(len(points), dtype=bool)
+        contained[inGrid] = self.grid[y[inGrid].astype(int), x[inGrid].astype(int)] == 0
+        return contained
+
     def containsObject(self, obj):
         # TODO improve this procedure!
         # Fast check
@@ -3964,6 +4440,27 @@ class ViewRegion(MeshVolumeRegion):
         if math.pi - angleCutoff <= viewAngles[1]:
             viewAngles = (viewAngles[0], math.pi)
 
+        key = geometryCache.key(
+            "ViewRegion", visibleDistance, tuple(map(float, viewAngles)), angleCutoff
+        )
+        compute = functools.partial(
+            self._viewMesh, visibleDistance, viewAngles, angleCutoff
+        )
+        mesh = geometryCache.get(key, compute, _encodeMesh, _decodeMesh)
+
+        # Initialize volume region
+        super().__init__(
+            mesh=mesh,
+            name=name,
+            position=position,
+            rotation=rotation,
+            tolerance=tolerance,
+            centerMesh=False,
+        )
+
+    @staticmethod
+    def _viewMesh(visibleDistance, viewAngles, angleCutoff):
+        """Compute the mesh of a view region at the origin, for `geometryCache`."""
         view_region = None
         diameter = 2 * visibleDistance
         base_sphere = SpheroidRegion(dimensions=(diameter, diameter, diameter))
@@ -3988,15 +4485,7 @@ class ViewRegion(MeshVolumeRegion):
         assert isinstance(view_region, MeshVolumeRegion)
         assert view_region.containsPoint(Vector(0, 0, 0))
 
-        # Initialize volume region
-        super().__init__(
-            mesh=view_region.mesh,
-            name=name,
-            position=position,
-            rotation=rotation,
-            tolerance=tolerance,
-            centerMesh=False,
-        )
+        return view_region.mesh
 
 
 class ViewSectionRegion(MeshVolumeRegion):
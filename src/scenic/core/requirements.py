@@ -6,13 +6,22 @@ from functools import reduce
 import inspect
 import itertools
 
+import fcl
+import numpy
 import rv_ltl
-import trimesh
 
 from scenic.core.distributions import Samplable, needsSampling, toDistribution
 from scenic.core.errors import InvalidScenarioError
 from scenic.core.lazy_eval import needsLazyEvaluation
-from scenic.core.propositions import Atomic, PropositionNode
+from scenic.core.propositions import (
+    Always,
+    And,
+    Atomic,
+    Implies,
+    Not,
+    Or,
+    PropositionNode,
+)
 import scenic.syntax.relations as relations
 
 
@@ -101,11 +110,13 @@ class PendingRequirement:
             deps.add(ego)
 
         # Construct closure
+        firstAtomic = condition.atomics()[0]
+
         def closure(values, monitor=None):
             # rebind any names referring to sampled objects
             # note: need to extract namespace here rather than close over value
             # from above because of https://github.com/uqfoundation/dill/issues/532
-            namespace = condition.atomics()[0].closure.__globals__
+            namespace = firstAtomic.closure.__globals__
             for name, value in bindings.items():
                 if value in values:
                     namespace[name] = values[value]
@@ -132,6 +143,42 @@ class PendingRequirement:
         return CompiledRequirement(self, closure, deps, condition)
 
 
+def evaluateBatch(proposition, size):
+    """Evaluate a proposition whose atomic propositions yield arrays of booleans.
+
+    Raises:
+        TypeError: if some atomic proposition does not yield a boolean array of length
+            **size**, or the proposition has temporal operators other than a top-level
+            ``always`` (which only needs to hold in the initial state when sampling).
+    """
+    if isinstance(proposition, Always):
+        proposition = proposition.req
+
+    def evaluate(node):
+        if isinstance(node, Atomic):
+            result = node.closure()
+            if (
+                not isinstance(result, numpy.ndarray)
+                or result.dtype != bool
+                or result.shape != (size,)
+            ):
+                raise TypeError(f"{node} does not depend on the batch")
+            return result
+        elif isinstance(node, Not):
+            return numpy.logical_not(evaluate(node.req))
+        elif isinstance(node, And):
+            return numpy.logical_and.reduce([evaluate(req) for req in node.reqs])
+        elif isinstance(node, Or):
+            return numpy.logical_or.reduce([evaluate(req) for req in node.reqs])
+        elif isinstance(node, Implies):
+            return numpy.logical_or(
+                numpy.logical_not(evaluate(node.lhs)), evaluate(node.rhs)
+            )
+        raise TypeError(f"cannot evaluate {node} on a batch")
+
+    return evaluate(proposition)
+
+
 def getAllGlobals(req, restrictTo=None):
     """Find all names the given lambda depends on, along with their current bindings."""
     namespace = req.__globals__
@@ -270,8 +317,14 @@ class SamplingRequirement(ABC):
             can be checked, and if ``False`` imply that the
             sample is invalid, but do not need to be checked
             if all non-optional requirements are satisfied.
+
+    Attributes:
+        dependencies: The sampled values this requirement depends on, or `None` if
+            they are not known (in which case it may depend on any value).
     """
 
+    dependencies = None
+
     def __init__(self, optional):
         self.optional = optional
         self.active = True
@@ -296,6 +349,7 @@ class IntersectionRequirement(SamplingRequirement):
         super().__init__(optional=optional)
         self.objA = objA
         self.objB = objB
+        self.dependencies = (objA, objB)
 
     def falsifiedByInner(self, sample):
         objA = sample[self.objA]
@@ -313,20 +367,25 @@ class BlanketCollisionRequirement(SamplingRequirement):
     def __init__(self, objects, optional=True):
         super().__init__(optional=optional)
         self.objects = objects
+        self.dependencies = tuple(objects)
         self._collidingObjects = None
 
     def falsifiedByInner(self, sample):
         objects = tuple(sample[obj] for obj in self.objects)
-        cm = trimesh.collision.CollisionManager()
-        for i, obj in enumerate(objects):
-            if not obj.allowCollisions:
-                cm.add_object(str(i), obj.occupiedSpace.mesh)
-        collision, names = cm.in_collision_internal(return_names=True)
-
-        if collision:
-            self._collidingObjects = tuple(sorted(names))
-
-        return collision
+        indices = [i for i, obj in enumerate(objects) if not obj.allowCollisions]
+        for i, j in _candidateCollisions([objects[i] for i in indices]):
+            objA, objB = objects[indices[i]], objects[indices[j]]
+            if objA._isPlanarBox and objB._isPlanarBox:
+                collision = objA.intersects(objB)
+            else:
+                request, result = fcl.CollisionRequest(), fcl.CollisionResult()
+                collision = fcl.collide(
+                    _collisionObject(objA), _collisionObject(objB), request, result
+                )
+            if collision:
+                self._collidingObjects = ((indices[i], indices[j]),)
+                return True
+        return False
 
     @property
     def violationMsg(self):
@@ -336,11 +395,56 @@ class BlanketCollisionRequirement(SamplingRequirement):
         return f"Intersection violation: {objA} intersects {objB}"
 
 
+def _candidateCollisions(objects):
+    """Find the pairs of objects which may intersect, using their bounding boxes.
+
+    Each object is contained in the box of its dimensions placed at its position and
+    orientation. The axis-aligned bounding boxes of these boxes are swept along the
+    X axis to find the pairs whose boxes overlap, which are then filtered using the
+    bounding spheres of the objects.
+
+    Returns:
+        An iterator over pairs of indices into **objects**.
+    """
+    if len(objects) < 2:
+        return
+    positions = numpy.array([obj.position for obj in objects], dtype=float)
+    halfDims = 0.5 * numpy.array(
+        [(obj.width, obj.length, obj.height) for obj in objects], dtype=float
+    )
+    rotations = numpy.array([obj.orientation.r.as_matrix() for obj in objects])
+    halfExtents = numpy.einsum("nij,nj->ni", numpy.abs(rotations), halfDims)
+    radii = numpy.linalg.norm(halfDims, axis=1)
+    lower, upper = positions - halfExtents, positions + halfExtents
+
+    order = numpy.argsort(lower[:, 0], kind="stable")
+    ends = numpy.searchsorted(lower[order, 0], upper[order, 0], side="right")
+    for a, i in enumerate(order):
+        others = order[a + 1 : ends[a]]
+        if len(others) == 0:
+            continue
+        overlaps = numpy.all(
+            (lower[others, 1:] <= upper[i, 1:]) & (lower[i, 1:] <= upper[others, 1:]),
+            axis=1,
+        )
+        others = others[overlaps]
+        distances = numpy.linalg.norm(positions[others] - positions[i], axis=1)
+        for j in others[distances <= radii[others] + radii[i]]:
+            yield (i, j) if i < j else (j, i)
+
+
+def _collisionObject(obj):
+    """An FCL collision object for the occupied space of a Scenic object."""
+    geometry = obj.shape._scaledGeometry((obj.width, obj.length, obj.height))
+    return geometry.collisionObject(obj.orientation.r.as_matrix(), obj.position)
+
+
 class ContainmentRequirement(SamplingRequirement):
     def __init__(self, obj, container, optional=False):
         super().__init__(optional=optional)
         self.obj = obj
         self.container = container
+        self.dependencies = (obj, container)
 
     def falsifiedByInner(self, sample):
         obj = sample[self.obj]
@@ -360,6 +464,7 @@ class VisibilityRequirement(SamplingRequirement):
         self.potential_occluders = tuple(
             obj for obj in objects if obj is not self.source and obj is not self.target
         )
+        self.dependencies = (source, target) + self.potential_occluders
 
     def falsifiedByInner(self, sample):
         source = sample[self.source]
@@ -392,6 +497,8 @@ class CompiledRequirement(SamplingRequirement):
         self.prob = pendingReq.prob
         self.dependencies = dependencies
         self.proposition = proposition
+        self.bindings = pendingReq.bindings
+        self._batchable = True
 
     @property
     def constrainsSampling(self):
@@ -401,6 +508,45 @@ class CompiledRequirement(SamplingRequirement):
         one_time_monitor = self.proposition.create_monitor()
         return self.closure(sample, one_time_monitor) == rv_ltl.B4.FALSE
 
+    def checkBatch(self, values, size):
+        """Check this requirement on a batch of candidate samples, if possible.
+
+        Used as a filter for `SamplingPlan`. The requirement is evaluated once with
+        each of the sampled values it refers to bound to a NumPy array of candidate
+        values, relying on arrays implementing the same arithmetic and comparison
+        operators as numbers.
+
+        Returns:
+            A boolean array indicating which candidates satisfy the requirement, or
+            `None` if the requirement refers to values not sampled in the batch or
+            cannot be evaluated on arrays (e.g. because it calls `math` functions).
+        """
+        if not self._batchable:
+            return None
+        arrays = {}
+        for name, value in self.bindings.items():
+            if needsSampling(value):
+                if value not in values:
+                    return None
+                arrays[name] = values[value]
+        namespace = self.proposition.atomics()[0].closure.__globals__
+        missing = object()
+        saved = {name: namespace.get(name, missing) for name in arrays}
+        namespace.update(arrays)
+        try:
+            with numpy.errstate(all="ignore"):
+                return evaluateBatch(self.proposition, size)
+        except Exception:
+            # The requirement cannot be checked on batches; don't try again
+            self._batchable = False
+            return None
+        finally:
+            for name, value in saved.items():
+                if value is missing:
+                    del namespace[name]
+                else:
+                    namespace[name] = value
+
     def __str__(self):
         if self.name:
             return self.name
@@ -1,7 +1,7 @@
 """The SampleChecker class and it's implementations."""
 
 from abc import ABC, abstractmethod
-from collections import deque
+from collections import Counter, deque
 import time
 
 from scenic.core.distributions import RejectionException
@@ -9,8 +9,22 @@ from scenic.core.requirements import BlanketCollisionRequirement, IntersectionRe
 
 
 class SampleChecker(ABC):
+    """Abstract class for checking the requirements of samples.
+
+    Attributes:
+        lastViolation: The requirement which caused the last sample checked to be
+            rejected, if known (otherwise `None`).
+        checkCounts: `Counter` giving the number of times each requirement was checked.
+        rejectionCounts: `Counter` giving the number of samples each requirement
+            rejected.
+        checkTimes: `Counter` giving the total time spent checking each requirement,
+            in seconds.
+    """
+
     def __init__(self):
         self.requirements = None
+        self.lastViolation = None
+        self.resetRequirementStatistics()
 
     def setRequirements(self, requirements):
         assert self.requirements is None
@@ -22,11 +36,86 @@ class SampleChecker(ABC):
 
     def checkRequirements(self, sample):
         assert self.requirements is not None
+        self.lastViolation = None
         try:
             return self.checkRequirementsInner(sample)
         except RejectionException as e:
             return e
 
+    def checkRequirement(self, req, sample):
+        """Check whether a requirement is falsified by a sample.
+
+        Implementations of `checkRequirementsInner` should use this method rather than
+        calling `SamplingRequirement.falsifiedBy` directly, so that the requirement's
+        statistics are recorded.
+
+        Returns:
+            A pair consisting of whether the requirement was falsified and the time
+            taken to check it, in seconds.
+        """
+        start = time.perf_counter()
+        try:
+            falsified = req.falsifiedBy(sample)
+        except RejectionException:
+            self.rejectionCounts[req] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.checkCounts[req] += 1
+            self.checkTimes[req] += elapsed
+        if falsified:
+            self.rejectionCounts[req] += 1
+        return falsified, elapsed
+
+    def resetRequirementStatistics(self):
+        """Reset the counts and times recorded by `checkRequirement`."""
+        self.checkCounts = Counter()
+        self.rejectionCounts = Counter()
+        self.checkTimes = Counter()
+
+    def requirementKeys(self):
+        """Return a dict mapping each requirement to a key identifying it.
+
+        User requirements are identified by their line number, and built-in
+        requirements by their type; requirements which would have the same key are
+        numbered in order. The keys are therefore the same each time the same scenario
+        is compiled, and can be used to save statistics about the requirements.
+        """
+        keys, counts = {}, Counter()
+        for req in self.requirements:
+            line = getattr(req, "line", None)
+            key = type(req).__name__ if line is None else f"line {line}"
+            counts[key] += 1
+            keys[req] = key if counts[key] == 1 else f"{key} #{counts[key]}"
+        return keys
+
+    def exportStatistics(self, recent=False):
+        """Export the statistics this checker has learned about its requirements.
+
+        Args:
+            recent: Whether to only export what was learned since
+                `resetRequirementStatistics` was last called.
+
+        Returns:
+            A JSON-serializable dict which can be passed to `importStatistics` or
+            `mergeStatistics`, for a checker of the same scenario; empty if the checker
+            does not learn from the samples it checks.
+        """
+        return {}
+
+    def importStatistics(self, statistics):
+        """Import statistics saved with `exportStatistics`."""
+        pass
+
+    def mergeStatistics(self, statistics):
+        """Learn from statistics exported by another checker for the same scenario.
+
+        This is used to gather what was learned by the checkers of worker processes
+        (e.g. when using `Scenario.generateBatch` with workers), which should export
+        their statistics with **recent** set, so that nothing is merged twice.
+        """
+        pass
+
 
 class BasicChecker(SampleChecker):
     """Basic requirement checker.
@@ -57,7 +146,8 @@ class BasicChecker(SampleChecker):
 
     def checkRequirementsInner(self, sample):
         for req in self.requirements:
-            if req.active and req.falsifiedBy(sample):
+            if req.active and self.checkRequirement(req, sample)[0]:
+                self.lastViolation = req
                 return req.violationMsg
 
         return None
@@ -68,16 +158,30 @@ class WeightedAcceptanceChecker(SampleChecker):
 
     Incentivizes exploration by initializing all buffer values to 0.
 
+    The statistics in the buffers can be saved with `exportStatistics` and loaded
+    into the checker of a later run with `importStatistics`, which then starts with
+    the best order found so far instead of exploring again.
+
     Args:
         bufferSize: Max samples to use when calculating time-weighted
             rejection chance.
+        sortBy: How to order the requirements: ``"product"`` (the default) to check
+            first those with the lowest product of acceptance chance and time, or
+            ``"costPerRejection"`` to check first those with the lowest expected time
+            spent per rejected sample (their time divided by their rejection chance).
     """
 
-    def __init__(self, bufferSize=10):
+    def __init__(self, bufferSize=10, sortBy="product"):
         super().__init__()
         self.bufferSize = bufferSize
         self.buffers = None
         self.bufferSums = None
+        if sortBy == "product":
+            self.sortKey = self.getWeightedAcceptanceProb
+        elif sortBy == "costPerRejection":
+            self.sortKey = self.getExpectedCostPerRejection
+        else:
+            raise ValueError(f"unknown requirement ordering {sortBy!r}")
 
     def setRequirements(self, requirements):
         super().setRequirements(requirements)
@@ -90,14 +194,14 @@ class WeightedAcceptanceChecker(SampleChecker):
     def checkRequirementsInner(self, sample):
         for req in self.sortedRequirements():
             # Evaluate the requirement with timing info.
-            start = time.perf_counter()
-            rejected = req.falsifiedBy(sample)
+            rejected, elapsed = self.checkRequirement(req, sample)
             # Create metrics (Accepted, Time Taken)
-            metrics = (int(not rejected), time.perf_counter() - start)
+            metrics = (int(not rejected), elapsed)
 
             self.updateMetrics(req, metrics)
 
             if rejected:
+                self.lastViolation = req
                 return req.violationMsg
 
         return None
@@ -106,7 +210,7 @@ class WeightedAcceptanceChecker(SampleChecker):
         """Return the list of requirements in sorted order"""
         # Extract and sort active requirements
         reqs = [req for req in self.requirements if req.active]
-        reqs.sort(key=self.getWeightedAcceptanceProb)
+        reqs.sort(key=self.sortKey)
 
         # Remove any optional requirements at the end of the list, since they're useless
         while reqs and reqs[-1].optional:
@@ -130,7 +234,44 @@ class WeightedAcceptanceChecker(SampleChecker):
         sum_acc += new_acc - old_acc
         sum_time += new_time - old_time
         self.bufferSums[req] = (sum_acc, sum_time)
+        self.newMetrics[req] += 1
 
     def getWeightedAcceptanceProb(self, req):
         sum_acc, sum_time = self.bufferSums[req]
         return (sum_acc / self.bufferSize) * (sum_time / self.bufferSize)
+
+    def getExpectedCostPerRejection(self, req):
+        sum_acc, sum_time = self.bufferSums[req]
+        rejections = self.bufferSize - sum_acc
+        return sum_time / rejections if rejections > 0 else float("inf")
+
+    def resetRequirementStatistics(self):
+        super().resetRequirementStatistics()
+        self.newMetrics = Counter()
+
+    def exportStatistics(self, recent=False):
+        keys = self.requirementKeys()
+        statistics = {}
+        for req, buf in self.buffers.items():
+            metrics = list(buf)
+            if recent:
+                metrics = metrics[len(metrics) - min(self.newMetrics[req], len(buf)) :]
+            statistics[keys[req]] = [list(m) for m in metrics]
+        return statistics
+
+    def importStatistics(self, statistics):
+        for req, key in self.requirementKeys().items():
+            if key not in statistics:
+                continue
+            metrics = [tuple(m) for m in statistics[key][-self.bufferSize :]]
+            padding = [(0, 0)] * (self.bufferSize - len(metrics))
+            self.buffers[req] = deque(padding + metrics)
+            self.bufferSums[req] = (
+                sum(acc for acc, _ in metrics),
+                sum(t for _, t in metrics),
+            )
+
+    def mergeStatistics(self, statistics):
+        for req, key in self.requirementKeys().items():
+            for metrics in statistics.get(key, ()):
+                self.updateMetrics(req, tuple(metrics))
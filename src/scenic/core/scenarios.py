@@ -1,8 +1,14 @@
 """Scenario and scene objects."""
 
+import asyncio
+import collections
+from concurrent.futures import ProcessPoolExecutor
+import csv
 import dataclasses
 import io
 import itertools
+import json
+import multiprocessing
 import random
 import sys
 import time
@@ -15,6 +21,7 @@ from scenic.core.distributions import (
     ConstantSamplable,
     RejectionException,
     Samplable,
+    SamplingPlan,
     distributionFunction,
     needsSampling,
 )
@@ -38,6 +45,7 @@ from scenic.core.requirements import (
 )
 from scenic.core.sample_checking import BasicChecker, WeightedAcceptanceChecker
 from scenic.core.serialization import Serializer, dumpAsScenicCode
+from scenic.core.utils import DefaultIdentityDict
 from scenic.core.vectors import Vector
 
 # Global params
@@ -117,6 +125,245 @@ class _Deactivator:
         self.deactivate()
 
 
+# Parallel scene generation
+
+
+class _IterationBudget:
+    """Maximum number of iterations shared by the workers of `Scenario.generateBatch`.
+
+    The budget can also be stopped, so that workers give up on the scenes they are
+    sampling when the stream of scenes is closed.
+    """
+
+    def __init__(self, limit, context):
+        self.limit = limit
+        self.used = context.Value("d", 0, lock=True)
+        self.stopped = context.Value("b", 0, lock=False)
+
+    def take(self):
+        """Use up one iteration, returning False if the budget is exhausted or stopped."""
+        if self.stopped.value:
+            return False
+        with self.used.get_lock():
+            if self.used.value >= self.limit:
+                return False
+            self.used.value += 1
+            return True
+
+    def stop(self):
+        self.stopped.value = 1
+
+
+class _ParallelSceneStream:
+    """Scenes of `Scenario.iterScenes` being sampled by a pool of worker processes."""
+
+    def __init__(self, scenario, numScenes, maxIterations, verbosity, workers, prefetch):
+        if scenario.externalSampler is not None:
+            raise RuntimeError(
+                "cannot sample scenes in parallel with an external sampler"
+            )
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            raise RuntimeError(
+                "parallel scene generation requires the 'fork' start method"
+            ) from None
+        if numScenes is not None:
+            workers = min(workers, numScenes)
+        self.scenario = scenario
+        self.maxIterations = maxIterations
+        self.prefetch = 2 * workers if prefetch is None else max(prefetch, 1)
+        self.remaining = (
+            itertools.count() if numScenes is None else iter(range(numScenes))
+        )
+        self.seeds = numpy.random.SeedSequence(random.getrandbits(128))
+        self.budget = _IterationBudget(maxIterations, context)
+        self.pool = ProcessPoolExecutor(
+            workers,
+            mp_context=context,
+            initializer=_initBatchWorker,
+            initargs=(scenario, self.budget, verbosity),
+        )
+        self.pending = collections.deque()
+
+    def fill(self):
+        """Submit scenes up to the prefetch limit; return whether any are pending."""
+        while (
+            len(self.pending) < self.prefetch and next(self.remaining, None) is not None
+        ):
+            (seed,) = self.seeds.spawn(1)
+            self.pending.append(self.pool.submit(_generateSeededScene, seed))
+        return bool(self.pending)
+
+    def finish(self, getResult):
+        """Decode a scene returned by a worker, merging the worker's statistics."""
+        try:
+            data, iterations, statistics = getResult()
+        except RejectionException:
+            raise RejectionException(
+                f"failed to generate scenario in {self.maxIterations} iterations"
+            ) from None
+        self.scenario._mergeWorkerStatistics(statistics)
+        return self.scenario.sceneFromBytes(data), iterations
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # Don't wait for scenes being sampled, which could take arbitrarily long
+        self.budget.stop()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+_batchWorkerState = None
+
+
+def _initBatchWorker(scenario, budget, verbosity):
+    global _batchWorkerState
+    _batchWorkerState = (scenario, budget, verbosity)
+
+
+def _generateSeededScene(seedSequence):
+    scenario, budget, verbosity = _batchWorkerState
+    random.seed(int.from_bytes(seedSequence.generate_state(4).tobytes(), "little"))
+    numpy.random.seed(seedSequence.generate_state(4))
+    # Only send back the statistics for this scene, since the worker may be reused
+    scenario.resetSamplingStatistics()
+    scene, iterations = scenario._generateInner(
+        float("inf"), verbosity, feedback=None, budget=budget
+    )
+    return scenario.sceneToBytes(scene), iterations, scenario._exportWorkerStatistics()
+
+
+# Partial resampling
+
+
+class _PartialResampler:
+    """Sampler resampling only the groups of values involved in violated requirements.
+
+    See `Scenario.setPartialResampling`. The groups are the connected components of the
+    graph whose vertices are the scenario's random values, with edges from each value to
+    its dependencies and between all the dependencies of each mandatory requirement.
+    """
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self._epoch = None
+        self._sample = None
+        self._pending = ()
+
+    def _compile(self):
+        scenario = self.scenario
+        parent = {}
+
+        def find(node):
+            root = node
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            while node != root:
+                node, parent[node] = parent[node], root
+            return root
+
+        def union(nodes):
+            roots = {find(id(node)) for node in nodes}
+            first = roots.pop() if roots else None
+            for root in roots:
+                parent[root] = first
+            return first
+
+        # Values sharing a dependency must be resampled together
+        quantities = [q for q in scenario.dependencies if needsSampling(q)]
+        seen = set()
+        stack = list(quantities)
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            children = node._conditioned._dependencies
+            union((node, *children))
+            stack.extend(children)
+
+        # As must values constrained by the same requirement
+        self._requirements = {}
+        self._mandatory = []
+        requirements = scenario.defaultRequirements + scenario.userRequirements
+        for req in requirements:
+            if req.optional:
+                continue
+            self._mandatory.append(req)
+            if req.dependencies is None:
+                root = union(quantities)
+            else:
+                root = union(dep for dep in req.dependencies if needsSampling(dep))
+            self._requirements[req] = root
+
+        components = {}
+        for q in quantities:
+            components.setdefault(find(id(q)), []).append(q)
+        self._roots = {req: find(root) for req, root in self._requirements.items()}
+        plan = scenario._samplingPlan
+        self._plans = {}
+        for root, qs in components.items():
+            checks = [check for check in plan.checks if self._roots.get(check) == root]
+            self._plans[root] = SamplingPlan(qs, plan.batchSize, plan.filters, checks)
+        self._epoch = Samplable._conditioningEpoch
+
+    def plans(self):
+        """The plans used to sample each group."""
+        return self._plans.values() if self._epoch is not None else ()
+
+    def start(self):
+        """Begin sampling a new scene, resampling every group."""
+        if self._epoch != Samplable._conditioningEpoch:
+            self._compile()
+        self._sample = DefaultIdentityDict()
+        self._pending = list(self._plans)
+        self._discarded = 0
+
+    def sample(self):
+        """Resample the pending groups, returning the updated sample."""
+        failed = []
+        for root in self._pending:
+            plan = self._plans[root]
+            try:
+                values = plan.sample()
+            except RejectionException:
+                failed.append(root)
+                continue
+            finally:
+                self._discarded += plan.takeDiscarded()
+            self._sample.storage.update(values.storage)
+        self._pending = failed
+        if failed:
+            raise RejectionException("failed to resample some components")
+        return self._sample
+
+    def reject(self, sample, violation):
+        """Mark the groups involved in the violated requirements for resampling."""
+        if violation is not None and not violation.optional:
+            roots = {self._roots[violation]}
+        else:
+            # The violated requirement is optional or unknown: find which mandatory
+            # requirements are violated
+            roots = set()
+            for req in self._mandatory:
+                if req.active and self._roots[req] not in roots:
+                    try:
+                        if req.falsifiedBy(sample):
+                            roots.add(self._roots[req])
+                    except RejectionException:
+                        roots.add(self._roots[req])
+        if None in roots or not roots:
+            # Requirement independent of the random values, or failure not understood
+            roots = self._plans
+        self._pending = list(roots)
+
+    def takeDiscarded(self):
+        discarded, self._discarded = self._discarded, 0
+        return discarded
+
+
 # Scenes and scenarios
 
 
@@ -315,6 +562,11 @@ class Scenario(_ScenarioPickleMixin):
         self.dependencies = (
             self._instances + paramDeps + tuple(requirementDeps) + tuple(behaviorDeps)
         )
+        self._samplingBatchSize = None
+        self._earlyRejection = False
+        self._samplingPlan = SamplingPlan(self.dependencies)
+        self._partialResampler = None
+        self._generationStatistics = collections.Counter()
 
         # Setup the default checker
         self.defaultRequirements = self.generateDefaultRequirements()
@@ -324,6 +576,299 @@ class Scenario(_ScenarioPickleMixin):
         self.checker = checker
         self.checker.setRequirements(self.defaultRequirements + self.userRequirements)
 
+    def saveCheckerStatistics(self, path):
+        """Save the statistics learned by the sample checker to a JSON file.
+
+        The statistics can be loaded in a later run with `loadCheckerStatistics`, so
+        that the checker (by default a `WeightedAcceptanceChecker`) starts with the
+        best order of requirements found so far. What the checkers of worker
+        processes learned (e.g. when using `generateBatch` with workers) is included.
+        """
+        data = {
+            "astHash": self.astHash.hex(),
+            "requirements": self.checker.exportStatistics(),
+        }
+        with open(path, "w") as outFile:
+            json.dump(data, outFile)
+
+    def loadCheckerStatistics(self, path):
+        """Load statistics saved with `saveCheckerStatistics` into the sample checker.
+
+        Statistics saved for a different version of the scenario (i.e. if the code of
+        the scenario was changed since they were saved) are ignored.
+
+        Returns:
+            Whether the statistics were loaded.
+        """
+        with open(path) as inFile:
+            data = json.load(inFile)
+        if data.get("astHash") != self.astHash.hex():
+            return False
+        self.checker.importStatistics(data["requirements"])
+        return True
+
+    def setSamplingBatchSize(self, batchSize):
+        """Enable or disable sampling primitive distributions in batches.
+
+        When enabled, each rejection sampling iteration takes the values of primitive
+        distributions over numbers like `Range` (and of arithmetic on them) from a batch
+        of candidates drawn at once with NumPy. Hard requirements which only depend on
+        such values, e.g. :scenic:`require x + y < 10`, are checked on entire batches
+        to discard candidates in bulk, which can greatly speed up sampling scenarios
+        where such requirements reject most samples. Candidates discarded in bulk count
+        towards the number of iterations used, although **maxIterations** may be
+        exceeded by up to one batch. All requirements are still checked as usual on the
+        remaining candidates.
+
+        Since values are then drawn from `numpy.random` rather than `random`, the
+        scenes generated differ from those generated without batches.
+
+        Args:
+            batchSize (int): Number of candidates per batch, or `None` to disable
+                batches (the default).
+        """
+        if batchSize is not None and batchSize < 1:
+            raise ValueError("batch size must be a positive integer")
+        self._samplingBatchSize = batchSize
+        self._updateSamplingPlan()
+
+    def setEarlyRejection(self, enabled=True):
+        """Enable or disable checking requirements while sampling.
+
+        By default, all objects and other random values of the scenario are sampled
+        before any requirement is checked. With early rejection, each hard requirement
+        is checked as soon as the values it depends on have been sampled, and the
+        values needed by earlier requirements are sampled first (user requirements
+        before built-in ones). A sample violating a requirement is thereby rejected
+        without sampling the rest of the scenario, e.g. constructing objects which the
+        requirement does not refer to.
+
+        Since values are sampled in a different order, the scenes generated differ
+        from those generated without early rejection. The number of times each
+        requirement rejected a sample early can be obtained with
+        `earlyRejectionStatistics`.
+        """
+        self._earlyRejection = enabled
+        self._updateSamplingPlan()
+
+    def earlyRejectionStatistics(self):
+        """Statistics on requirements checked early (see `setEarlyRejection`).
+
+        Returns:
+            A dict mapping each requirement checked early to a dict giving the number
+            of times it was ``checked``, the number of samples it ``rejected``, and the
+            number of sampling steps (samples of individual random values) which were
+            ``skipped`` because of these rejections, as well as the total time spent
+            checking it, in ``seconds``.
+        """
+        plans = [self._samplingPlan]
+        if self._partialResampler:
+            plans.extend(self._partialResampler.plans())
+        stats = {}
+        for plan in plans:
+            for req, count in plan.checkCounts.items():
+                reqStats = stats.setdefault(
+                    req, dict(checked=0, rejected=0, skipped=0, seconds=0)
+                )
+                reqStats["checked"] += count
+                reqStats["rejected"] += plan.rejectionCounts[req]
+                reqStats["skipped"] += plan.skippedSteps[req]
+                reqStats["seconds"] += plan.checkTimes[req]
+        return stats
+
+    def samplingStatistics(self):
+        """Statistics on the time spent generating scenes from this scenario.
+
+        Statistics are gathered for all scenes generated since the scenario was
+        compiled or `resetSamplingStatistics` was called, including scenes generated
+        by worker processes (e.g. with `generateBatch`), whose times are summed over
+        all workers. Iterations of workers which failed to generate a scene are not
+        included.
+
+        Returns:
+            A JSON-serializable dict with the following entries:
+
+            * ``scenes``: the number of scenes generated;
+            * ``iterations``: the number of rejection sampling iterations, including
+              those of failed calls to `generate`;
+            * ``samplingRejections``: the number of iterations rejected while
+              sampling, e.g. by requirements checked early (see `setEarlyRejection`);
+            * ``time``: the total time in seconds spent ``sampling`` random values,
+              ``checking`` requirements on complete samples, and ``constructing``
+              scenes from accepted samples;
+            * ``requirements``: a dict mapping a key identifying each requirement (see
+              `SampleChecker.requirementKeys`) to a dict giving its ``name`` (if
+              any), the number of times it was ``checked`` by the sample checker,
+              the number of samples it ``rejected``, and the total time in
+              ``seconds`` spent checking it; requirements checked early also have
+              the ``earlyChecked``, ``earlyRejected``, ``earlySeconds``, and
+              ``skippedSteps`` entries of `earlyRejectionStatistics`.
+        """
+        stats = self._generationStatistics
+        checker = self.checker
+        keys = checker.requirementKeys()
+        requirements = {}
+        for req in checker.requirements:
+            requirements[keys[req]] = dict(
+                name=getattr(req, "name", None),
+                checked=checker.checkCounts[req],
+                rejected=checker.rejectionCounts[req],
+                seconds=checker.checkTimes[req],
+            )
+        for req, early in self.earlyRejectionStatistics().items():
+            key = keys.get(req, type(req).__name__)
+            reqStats = requirements.setdefault(
+                key,
+                dict(name=getattr(req, "name", None), checked=0, rejected=0, seconds=0),
+            )
+            reqStats.update(
+                earlyChecked=early["checked"],
+                earlyRejected=early["rejected"],
+                earlySeconds=early["seconds"],
+                skippedSteps=early["skipped"],
+            )
+        return {
+            "scenes": stats["scenes"],
+            "iterations": stats["iterations"],
+            "samplingRejections": stats["samplingRejections"],
+            "time": {
+                "sampling": stats["samplingTime"],
+                "checking": stats["checkingTime"],
+                "constructing": stats["constructingTime"],
+            },
+            "requirements": requirements,
+        }
+
+    def resetSamplingStatistics(self):
+        """Reset the statistics returned by `samplingStatistics`.
+
+        This also resets the statistics returned by `earlyRejectionStatistics`.
+        """
+        self._generationStatistics.clear()
+        self.checker.resetRequirementStatistics()
+        plans = [self._samplingPlan]
+        if self._partialResampler:
+            plans.extend(self._partialResampler.plans())
+        for plan in plans:
+            for counter in (
+                plan.checkCounts,
+                plan.rejectionCounts,
+                plan.skippedSteps,
+                plan.checkTimes,
+            ):
+                counter.clear()
+
+    def _exportWorkerStatistics(self):
+        """Export the statistics of this process for `_mergeWorkerStatistics`."""
+        checker = self.checker
+        keys = checker.requirementKeys()
+        requirements = {
+            keys[req]: (
+                checker.checkCounts[req],
+                checker.rejectionCounts[req],
+                checker.checkTimes[req],
+            )
+            for req in checker.requirements
+        }
+        early = {
+            keys[req]: reqStats
+            for req, reqStats in self.earlyRejectionStatistics().items()
+            if req in keys
+        }
+        return {
+            "generation": dict(self._generationStatistics),
+            "requirements": requirements,
+            "early": early,
+            "checker": checker.exportStatistics(recent=True),
+        }
+
+    def _mergeWorkerStatistics(self, statistics):
+        """Add statistics exported by a worker process to those of this process."""
+        self._generationStatistics.update(statistics["generation"])
+        checker = self.checker
+        reqs = {key: req for req, key in checker.requirementKeys().items()}
+        for key, (checked, rejected, seconds) in statistics["requirements"].items():
+            req = reqs[key]
+            checker.checkCounts[req] += checked
+            checker.rejectionCounts[req] += rejected
+            checker.checkTimes[req] += seconds
+        plan = self._samplingPlan
+        for key, early in statistics["early"].items():
+            req = reqs[key]
+            plan.checkCounts[req] += early["checked"]
+            plan.rejectionCounts[req] += early["rejected"]
+            plan.skippedSteps[req] += early["skipped"]
+            plan.checkTimes[req] += early["seconds"]
+        checker.mergeStatistics(statistics["checker"])
+
+    def saveSamplingStatistics(self, path):
+        """Save the statistics returned by `samplingStatistics` to a file.
+
+        If the name of the file ends in ``.csv``, the per-requirement statistics are
+        written as CSV, with one row per requirement; otherwise, all statistics are
+        written as JSON.
+        """
+        stats = self.samplingStatistics()
+        if str(path).lower().endswith(".csv"):
+            fields = [
+                "requirement",
+                "name",
+                "checked",
+                "rejected",
+                "seconds",
+                "earlyChecked",
+                "earlyRejected",
+                "earlySeconds",
+                "skippedSteps",
+            ]
+            with open(path, "w", newline="") as outFile:
+                writer = csv.DictWriter(outFile, fieldnames=fields)
+                writer.writeheader()
+                for key, reqStats in stats["requirements"].items():
+                    writer.writerow(dict(reqStats, requirement=key))
+        else:
+            with open(path, "w") as outFile:
+                json.dump(stats, outFile, indent=2)
+
+    def _updateSamplingPlan(self):
+        batchSize = self._samplingBatchSize
+        filters = checks = ()
+        if batchSize is not None:
+            filters = [req.checkBatch for req in self.userRequirements if req.prob == 1]
+        if self._earlyRejection:
+            checks = [
+                req
+                for req in self.userRequirements + self.defaultRequirements
+                if not req.optional
+            ]
+        self._samplingPlan = SamplingPlan(self.dependencies, batchSize, filters, checks)
+        if self._partialResampler:
+            self._partialResampler = _PartialResampler(self)
+
+    def setPartialResampling(self, enabled=True):
+        """Enable or disable resampling only the parts of a sample which were rejected.
+
+        By default, when a sample violates a requirement, all of the scenario is
+        resampled. With partial resampling, the scenario's random values are split into
+        groups which are independent of each other: values which depend on a common
+        random value, or which are constrained by a common requirement, are in the same
+        group. After a rejection, only the groups involved in the violated requirements
+        are resampled, keeping the values of all other groups. Each group is thereby
+        resampled until it satisfies its own requirements, which gives the same
+        distribution of scenes as resampling everything, but can take far fewer
+        iterations for scenarios with many independent parts.
+
+        Note that the built-in requirement that objects do not intersect puts all
+        objects which do not allow collisions in the same group, and that since the
+        ego object can be referred to implicitly, every requirement is in the group
+        of the random values the ego depends on. Partial resampling assumes that the
+        requirements of the scenario only depend on the random values which they refer
+        to by name (and the ego object). It cannot be used with external samplers.
+        """
+        if enabled and self.externalSampler is not None:
+            raise RuntimeError("cannot use partial resampling with an external sampler")
+        self._partialResampler = _PartialResampler(self) if enabled else None
+
     def containerOfObject(self, obj):
         if hasattr(obj, "regionContainedIn") and obj.regionContainedIn is not None:
             return obj.regionContainedIn
@@ -404,7 +949,12 @@ class Scenario(_ScenarioPickleMixin):
         return scenes[0], iterations
 
     def generateBatch(
-        self, numScenes, maxIterations=float("inf"), verbosity=0, feedback=None
+        self,
+        numScenes,
+        maxIterations=float("inf"),
+        verbosity=0,
+        feedback=None,
+        workers=None,
     ):
         """Sample several `Scene` objects from this scenario.
 
@@ -416,6 +966,8 @@ class Scenario(_ScenarioPickleMixin):
             verbosity (int): Verbosity level.
             feedback (float): Feedback to pass to external samplers doing active sampling.
                 See :mod:`scenic.core.external_params`.
+            workers (int): If greater than 1, sample the scenes in parallel using this
+                many worker processes (see below).
 
         Returns:
             A pair with a list of the sampled `Scene` objects and the total number
@@ -423,24 +975,124 @@ class Scenario(_ScenarioPickleMixin):
 
         Raises:
             `RejectionException`: if not enough valid samples are found in **maxIterations** iterations.
+
+        When sampling in parallel, each scene is sampled with its own random seed, derived
+        from a master seed drawn from the `random` module. The scenes returned therefore
+        depend only on the state of the random number generator when calling this
+        method, and not on the number of workers or the order in which they finish
+        (but they differ from the scenes which would be sampled sequentially).
+        The **maxIterations** budget is shared by all workers. Parallel sampling requires
+        the ``fork`` start method of `multiprocessing`, and is not supported for
+        scenarios using external samplers. Sampled scenes are sent back from the workers
+        using `sceneToBytes`.
         """
-        totalIterations = 0
-        scenes = []
+        scenes, totalIterations = [], 0
+        for scene, iterations in self.iterScenes(
+            numScenes, maxIterations, verbosity, feedback, workers=workers
+        ):
+            scenes.append(scene)
+            totalIterations += iterations
+        return scenes, totalIterations
+
+    def iterScenes(
+        self,
+        numScenes=None,
+        maxIterations=float("inf"),
+        verbosity=0,
+        feedback=None,
+        workers=None,
+        prefetch=None,
+    ):
+        """Iterate over scenes sampled from this scenario.
+
+        This is a streaming version of `generateBatch`: each scene is yielded as soon as
+        it is accepted, so that for example simulating a scene can start while later
+        scenes are still being sampled.
 
-        for _ in range(numScenes):
+        Args:
+            numScenes (int): Number of scenes to generate, or `None` (the default) to
+                generate scenes indefinitely.
+            maxIterations (int): Maximum number of rejection sampling iterations (over all scenes).
+            verbosity (int): Verbosity level.
+            feedback (float): Feedback to pass to external samplers doing active sampling.
+                See :mod:`scenic.core.external_params`.
+            workers (int): If greater than 1, sample scenes in the background using this
+                many worker processes, as described in `generateBatch`.
+            prefetch (int): When using workers, the maximum number of scenes sampled
+                ahead of the consumer (default: twice the number of workers). No new
+                scenes are sampled while this many are waiting to be consumed.
+
+        Yields:
+            Pairs with a sampled `Scene` and the number of iterations used to sample it.
+            Scenes are yielded in a deterministic order, even when using workers.
+
+        Raises:
+            `RejectionException`: if not enough valid samples are found in **maxIterations** iterations.
+
+        When using workers, closing the iterator (e.g. by breaking out of a loop over
+        it) returns immediately: the workers give up on the scenes they are sampling
+        at their next iteration, and scenes not yet started are never sampled.
+        Without workers, each scene is sampled when the next item is requested, in the
+        current process. Scenes are never sampled in background threads, since sampling
+        uses the global state of the `random` module.
+        """
+        if workers is not None and workers > 1 and numScenes != 1:
+            stream = _ParallelSceneStream(
+                self, numScenes, maxIterations, verbosity, workers, prefetch
+            )
+            with stream:
+                while stream.fill():
+                    yield stream.finish(stream.pending.popleft().result)
+            return
+
+        count = itertools.count() if numScenes is None else range(numScenes)
+        totalIterations = 0
+        for _ in count:
             try:
                 remainingIts = maxIterations - totalIterations
                 scene, iterations = self._generateInner(remainingIts, verbosity, feedback)
-                scenes.append(scene)
-                totalIterations += iterations
             except RejectionException:
                 raise RejectionException(
                     f"failed to generate scenario in {maxIterations} iterations"
                 )
+            totalIterations += iterations
+            yield scene, iterations
 
-        return scenes, totalIterations
+    async def iterScenesAsync(
+        self,
+        numScenes=None,
+        maxIterations=float("inf"),
+        verbosity=0,
+        feedback=None,
+        workers=None,
+        prefetch=None,
+    ):
+        """Asynchronous version of `iterScenes`.
 
-    def _generateInner(self, maxIterations, verbosity, feedback):
+        When using workers, waiting for the next scene does not block the event loop.
+        Otherwise each scene is sampled in the event loop's thread, which is released
+        between scenes.
+        """
+        if workers is not None and workers > 1 and numScenes != 1:
+            stream = _ParallelSceneStream(
+                self, numScenes, maxIterations, verbosity, workers, prefetch
+            )
+            with stream:
+                while stream.fill():
+                    future = stream.pending.popleft()
+                    try:
+                        await asyncio.wrap_future(future)
+                    except RejectionException:
+                        pass  # re-raised with a proper message below
+                    yield stream.finish(future.result)
+            return
+
+        scenes = self.iterScenes(numScenes, maxIterations, verbosity, feedback)
+        for item in scenes:
+            yield item
+            await asyncio.sleep(0)
+
+    def _generateInner(self, maxIterations, verbosity, feedback, budget=None):
         # choose which custom requirements will be enforced for this sample
         for req in self.userRequirements:
             if random.random() <= req.prob:
@@ -451,44 +1103,63 @@ class Scenario(_ScenarioPickleMixin):
         # do rejection sampling until requirements are satisfied
         rejection = True
         iterations = 0
-        while rejection is not None:
-            if iterations > 0:  # rejected the last sample
-                if verbosity >= 2:
-                    print(f"  Rejected sample {iterations} because of {rejection}")
-                if self.externalSampler is not None:
-                    feedback = self.externalSampler.rejectionFeedback
-            if iterations >= maxIterations:
-                raise RejectionException(
-                    f"failed to generate scenario in {iterations} iterations"
-                )
-            iterations += 1
-            try:
-                if self.externalSampler is not None:
-                    self.externalSampler.sample(feedback)
-                sample = Samplable.sampleAll(self.dependencies)
-            except RejectionException as e:
-                optionallyDebugRejection(e)
-                rejection = e
-                continue
-            rejection = None
-
-            # Ensure nothing else is lazy
-            for obj in self.objects:
-                sampledObj = sample[obj]
-                assert not needsSampling(sampledObj)
-
-            # Check validity of sample, storing state so that
-            # checker heuristics don't affect determinism
-            rand_state, np_state = random.getstate(), numpy.random.get_state()
-            rejection = self.checker.checkRequirements(sample)
-            random.setstate(rand_state)
-            numpy.random.set_state(np_state)
-
-            if rejection is not None:
-                optionallyDebugRejection()
+        stats = self._generationStatistics
+        sampler = self._partialResampler or self._samplingPlan
+        if self._partialResampler:
+            self._partialResampler.start()
+        try:
+            while rejection is not None:
+                if iterations > 0:  # rejected the last sample
+                    if verbosity >= 2:
+                        print(f"  Rejected sample {iterations} because of {rejection}")
+                    if self.externalSampler is not None:
+                        feedback = self.externalSampler.rejectionFeedback
+                if iterations >= maxIterations or (budget and not budget.take()):
+                    raise RejectionException(
+                        f"failed to generate scenario in {iterations} iterations"
+                    )
+                iterations += 1
+                startTime = time.perf_counter()
+                try:
+                    if self.externalSampler is not None:
+                        self.externalSampler.sample(feedback)
+                    sample = sampler.sample()
+                except RejectionException as e:
+                    optionallyDebugRejection(e)
+                    stats["samplingRejections"] += 1
+                    rejection = e
+                    continue
+                finally:
+                    iterations += sampler.takeDiscarded()
+                    stats["samplingTime"] += time.perf_counter() - startTime
+                rejection = None
+
+                # Ensure nothing else is lazy
+                for obj in self.objects:
+                    sampledObj = sample[obj]
+                    assert not needsSampling(sampledObj)
+
+                # Check validity of sample, storing state so that
+                # checker heuristics don't affect determinism
+                startTime = time.perf_counter()
+                rand_state, np_state = random.getstate(), numpy.random.get_state()
+                rejection = self.checker.checkRequirements(sample)
+                if rejection is not None and self._partialResampler:
+                    self._partialResampler.reject(sample, self.checker.lastViolation)
+                random.setstate(rand_state)
+                numpy.random.set_state(np_state)
+                stats["checkingTime"] += time.perf_counter() - startTime
+
+                if rejection is not None:
+                    optionallyDebugRejection()
+        finally:
+            stats["iterations"] += iterations
 
         # obtained a valid sample; assemble a scene from it
+        startTime = time.perf_counter()
         scene = self._makeSceneFromSample(sample)
+        stats["constructingTime"] += time.perf_counter() - startTime
+        stats["scenes"] += 1
         return scene, iterations
 
     def generateDefaultRequirements(self):
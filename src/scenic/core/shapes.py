@@ -1,9 +1,12 @@
 """ Module containing the Shape class and its subclasses, which represent shapes of Objects"""
 
 from abc import ABC, abstractmethod
+import weakref
 
+import fcl
 import numpy
 import trimesh
+import trimesh.collision
 from trimesh.transformations import (
     concatenate_matrices,
     quaternion_matrix,
@@ -64,6 +67,109 @@ class Shape(ABC):
     def isConvex(self):
         pass
 
+    def _scaledGeometry(self, dimensions):
+        """Geometry of this shape scaled to the given dimensions.
+
+        The `ScaledShapeGeometry` is shared by all objects with this shape and
+        dimensions, and kept until the shape is garbage collected (for at most
+        `MAX_CACHED_SCALES` different dimensions).
+        """
+        dimensions = tuple(dimensions)
+        geometries = _scaledGeometries.setdefault(self, {})
+        geometry = geometries.get(dimensions)
+        if geometry is None:
+            if len(geometries) >= MAX_CACHED_SCALES:
+                del geometries[next(iter(geometries))]
+            geometry = ScaledShapeGeometry(self, dimensions)
+            geometries[dimensions] = geometry
+        return geometry
+
+
+#: Maximum number of dimensions of a shape for which scaled geometry is cached.
+MAX_CACHED_SCALES = 32
+
+_scaledGeometries = weakref.WeakKeyDictionary()
+
+
+class ScaledShapeGeometry:
+    """Geometry of a shape scaled to some dimensions, in the shape's local frame.
+
+    The mesh of an object is its shape's mesh scaled to the object's dimensions and
+    then rigidly transformed to its position and orientation. This class holds data
+    derived from the scaled mesh which is expensive to compute, namely its collision
+    geometry and the acceleration structures used for ray casting and distance
+    queries, so that it can be shared by all
+    objects with the same shape and dimensions. Queries then only need to transform
+    their inputs into the local frame of the shape.
+
+    Args:
+        shape: The `Shape`.
+        dimensions: The width, length, and height of the scaled mesh.
+    """
+
+    def __init__(self, shape, dimensions):
+        mesh = shape.mesh.copy()
+        scale = numpy.array(dimensions) / mesh.extents
+        mesh.apply_transform(numpy.diag([*scale, 1]))
+        self.mesh = mesh
+        self.isConvex = shape.isConvex
+
+    @cached_property
+    def collisionGeometry(self):
+        """The FCL geometry of the mesh.
+
+        As in `trimesh.collision.CollisionManager`, convex meshes are represented as
+        convex polytopes (so that containment counts as a collision) and other meshes
+        as bounding volume hierarchies of their triangles.
+        """
+        if self.isConvex:
+            return trimesh.collision.mesh_to_convex(self.mesh)
+        return trimesh.collision.mesh_to_BVH(self.mesh)
+
+    @cached_property
+    def hullVertices(self):
+        """The vertices of the convex hull of the mesh."""
+        if self.isConvex:
+            return self.mesh.vertices
+        return self.mesh.convex_hull.vertices
+
+    def collisionObject(self, rotation, position):
+        """An FCL collision object for the mesh placed at the given pose.
+
+        Args:
+            rotation: 3x3 rotation matrix.
+            position: Translation, as a sequence of 3 numbers.
+        """
+        transform = fcl.Transform(rotation, numpy.asarray(position, dtype=float))
+        return fcl.CollisionObject(self.collisionGeometry, transform)
+
+    def signedDistances(self, rotation, position, points):
+        """Signed distances from the mesh placed at the given pose to some points.
+
+        As for `trimesh.proximity.ProximityQuery.signed_distance`, distances are
+        positive for points inside the mesh.
+        """
+        localPoints = (
+            numpy.asarray(points) - numpy.asarray(position, dtype=float)
+        ) @ rotation
+        return self.mesh.nearest.signed_distance(localPoints)
+
+    def intersectRays(self, rotation, position, origins, directions):
+        """Intersect rays with the mesh placed at the given pose.
+
+        Returns:
+            The locations of the hits and the indices of the corresponding rays, as
+            for `trimesh.ray.ray_triangle.RayMeshIntersector.intersects_location`.
+        """
+        position = numpy.asarray(position, dtype=float)
+        # Row vectors times the rotation matrix apply the inverse rotation
+        localOrigins = (numpy.asarray(origins) - position) @ rotation
+        localDirections = numpy.asarray(directions) @ rotation
+        locations, rayIndices, _ = self.mesh.ray.intersects_location(
+            ray_origins=localOrigins, ray_directions=localDirections
+        )
+        return numpy.reshape(locations, (-1, 3)) @ rotation.T + position, rayIndices
+
 
 ###################################################################################################
 # 3D Shape Classes
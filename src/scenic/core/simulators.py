@@ -88,6 +88,8 @@ class Simulator(abc.ABC):
         divergenceTolerance=0,
         continueAfterDivergence=False,
         allowPickle=False,
+        continueAfterViolations=False,
+        terminateWhenRequirementsDecided=False,
     ):
         """Run a simulation for a given scene.
 
@@ -133,6 +135,19 @@ class Simulator(abc.ABC):
             allowPickle (bool): Whether to use `pickle` to (de)serialize custom object
                 types. See `sceneFromBytes` for a discussion of when this may be needed
                 (rarely) and its security implications.
+            continueAfterViolations (bool): Whether to keep simulating when a temporal
+                requirement is violated instead of rejecting the simulation. If this is
+                true, the remaining requirements are still monitored and the time step at
+                which each violated requirement failed is available from
+                `SimulationResult.requirementViolations`. Useful to check many requirements
+                against a single run, e.g. when replaying recorded data.
+            terminateWhenRequirementsDecided (bool): Whether to end the simulation as
+                soon as the verdict of every temporal requirement is final, i.e. no
+                later time step could change whether the simulation satisfies them.
+                This only applies to scenarios which have temporal requirements but
+                no :keyword:`record` or :keyword:`record final` statements (whose
+                values would be cut short), and not while a compose block or a
+                :term:`monitor` is still running.
 
         Returns:
             A `Simulation` object representing the completed simulation, or `None` if no
@@ -188,6 +203,8 @@ class Simulator(abc.ABC):
                 divergenceTolerance=divergenceTolerance,
                 continueAfterDivergence=continueAfterDivergence,
                 allowPickle=allowPickle,
+                continueAfterViolations=continueAfterViolations,
+                terminateWhenRequirementsDecided=terminateWhenRequirementsDecided,
             )
         return simulation
 
@@ -329,6 +346,8 @@ class Simulation(abc.ABC):
         enableDivergenceCheck=False,
         divergenceTolerance=0,
         continueAfterDivergence=False,
+        continueAfterViolations=False,
+        terminateWhenRequirementsDecided=False,
         verbosity=0,
     ):
         self.result = None
@@ -348,6 +367,9 @@ class Simulation(abc.ABC):
         self.initializeReplay(replay, enableReplay, enableDivergenceCheck, allowPickle)
         self.divergenceTolerance = divergenceTolerance
         self.continueAfterDivergence = continueAfterDivergence
+        self.continueAfterViolations = continueAfterViolations
+        self.requirementViolations = {}
+        self.terminateWhenRequirementsDecided = terminateWhenRequirementsDecided
 
         # Do the actual setup and execution of the simulation inside a try-finally
         # statement so that we roll back global state even if an error occurs.
@@ -388,6 +410,7 @@ class Simulation(abc.ABC):
                 terminationType,
                 terminationReason,
                 self.records,
+                self.requirementViolations,
             )
             self.result = result
         except (RejectSimulationException, RejectionException, GuardViolation) as e:
@@ -440,6 +463,11 @@ class Simulation(abc.ABC):
             terminationReason = dynamicScenario._checkSimulationTerminationConditions()
             if terminationReason is not None:
                 return TerminationType.simulationTerminationCondition, terminationReason
+            if self.terminateWhenRequirementsDecided and self._requirementsDecided():
+                return (
+                    TerminationType.requirementsDecided,
+                    "verdicts of all requirements are final",
+                )
             if maxSteps and self.currentTime >= maxSteps:
                 return TerminationType.timeLimit, f"reached time limit ({maxSteps} steps)"
 
@@ -571,6 +599,14 @@ class Simulation(abc.ABC):
         """
         raise NotImplementedError
 
+    def _requirementsDecided(self):
+        dynamicScenario = self.scene.dynamicScenario
+        if dynamicScenario._recordedExprs or dynamicScenario._recordedFinalExprs:
+            return False  # some records are still pending
+        if not dynamicScenario._temporalRequirements:
+            return False
+        return dynamicScenario._requirementVerdictsFinal()
+
     def recordCurrentState(self):
         dynamicScenario = self.scene.dynamicScenario
         records = self.records
@@ -886,6 +922,10 @@ class TerminationType(enum.Enum):
     #: A :term:`dynamic behavior` used :keyword:`terminate simulation` to end the simulation.
     terminatedByBehavior = "a behavior terminated the simulation"
 
+    #: The verdicts of all temporal requirements became final (only if enabled by
+    #: the **terminateWhenRequirementsDecided** option of `Simulator.simulate`).
+    requirementsDecided = "the verdicts of all requirements were final"
+
 
 class SimulationResult:
     """Result of running a simulation.
@@ -901,9 +941,21 @@ class SimulationResult:
             simulation ended, possibly including debugging info.
         records (dict): For each :keyword:`record` statement, the value or time series of
             values its expression took during the simulation.
+        requirementViolations (dict): For each temporal requirement which was violated,
+            the time step at which it was violated. Always empty unless the simulation
+            was run with **continueAfterViolations** (see `Simulator.simulate`), since
+            otherwise a violation rejects the simulation.
     """
 
-    def __init__(self, trajectory, actions, terminationType, terminationReason, records):
+    def __init__(
+        self,
+        trajectory,
+        actions,
+        terminationType,
+        terminationReason,
+        records,
+        requirementViolations=(),
+    ):
         self.trajectory = tuple(trajectory)
         assert self.trajectory
         self.finalState = self.trajectory[-1]
@@ -911,3 +963,4 @@ class SimulationResult:
         self.terminationType = terminationType
         self.terminationReason = str(terminationReason)
         self.records = dict(records)
+        self.requirementViolations = dict(requirementViolations)
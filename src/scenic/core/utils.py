@@ -7,6 +7,7 @@ import functools
 import itertools
 import math
 import os
+import random
 import signal
 from subprocess import CalledProcessError
 import sys
@@ -335,6 +336,63 @@ class DefaultIdentityDict:
         return f"<DefaultIdentityDict {{{allPairs}}}>"
 
 
+class AliasTable:
+    """Table for drawing indices from a discrete distribution in constant time.
+
+    Uses Vose's alias method: building the table takes linear time in the number of
+    weights, after which each draw takes a single uniform index and a single coin flip.
+
+    Args:
+        weights: Nonnegative weights of the indices, not all zero.
+    """
+
+    def __init__(self, weights):
+        weights = numpy.asarray(weights, dtype=float)
+        if weights.ndim != 1 or len(weights) == 0:
+            raise ValueError("alias table needs a nonempty sequence of weights")
+        total = weights.sum()
+        if not numpy.all(weights >= 0) or not total > 0:
+            raise ValueError("alias table weights must be nonnegative and not all zero")
+        count = len(weights)
+        probabilities = weights * (count / total)
+        aliases = numpy.arange(count)
+        small = list(numpy.flatnonzero(probabilities < 1))
+        large = list(numpy.flatnonzero(probabilities >= 1))
+        while small and large:
+            less, more = small.pop(), large.pop()
+            aliases[less] = more
+            probabilities[more] -= 1 - probabilities[less]
+            (small if probabilities[more] < 1 else large).append(more)
+        # Any remaining entries are full up to rounding error
+        probabilities[small + large] = 1
+        self.probabilities = probabilities
+        self.aliases = aliases
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def sample(self, size=None):
+        """Draw indices using `numpy.random`.
+
+        Args:
+            size: Number of indices to draw, or `None` to draw a single index.
+        """
+        columns = numpy.random.randint(len(self), size=size)
+        keep = numpy.random.random_sample(size) < self.probabilities[columns]
+        return numpy.where(keep, columns, self.aliases[columns])
+
+    def draw(self):
+        """Draw a single index using the `random` module.
+
+        Unlike `sample`, this only depends on the state of `random`, so it can be used
+        where results must be reproducible given ``random.seed``.
+        """
+        column = random.randrange(len(self))
+        if random.random() < self.probabilities[column]:
+            return column
+        return int(self.aliases[column])
+
+
 # Patched version of typing.get_type_hints fixing bpo-37838
 
 if sys.version_info >= (3, 8, 1) or (
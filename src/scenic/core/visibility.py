@@ -6,7 +6,7 @@ import math
 import numpy as np
 import trimesh
 
-from scenic.core.regions import Region
+from scenic.core.regions import MeshVolumeRegion, Region
 from scenic.core.type_support import toVector
 from scenic.core.utils import batched
 from scenic.core.vectors import Vector
@@ -14,6 +14,111 @@ from scenic.core.vectors import Vector
 BATCH_SIZE = 128
 
 
+def _intersectRays(region, origins, directions):
+    """Find where rays hit the mesh of a region.
+
+    Returns the locations of the hits and the indices of the corresponding rays.
+    """
+    if isinstance(region, MeshVolumeRegion):
+        # Uses geometry shared with other objects of the same shape, if possible
+        return region._intersectRays(origins, directions)
+    locations, rayIndices, _ = region.mesh.ray.intersects_location(
+        ray_origins=origins, ray_directions=directions
+    )
+    return locations, rayIndices
+
+
+class RayCaster:
+    """Finds the first objects hit by rays, among a fixed set of objects.
+
+    The objects are organized in a two-level hierarchy: all rays are first tested
+    at once against the axis-aligned bounding boxes of all objects, and then cast
+    only against the meshes of the objects whose boxes they enter, nearest boxes
+    first. The meshes use the ray-casting structures shared between objects with the
+    same shape (see `ScaledShapeGeometry`), which use Embree if it is installed.
+    Rays whose nearest hit so far is closer than the box of an object are not cast
+    against that object at all.
+
+    Args:
+        objects: The objects rays can hit.
+    """
+
+    def __init__(self, objects):
+        self.objects = tuple(objects)
+        if self.objects:
+            self.bounds = np.array(
+                [obj.occupiedSpace.mesh.bounds for obj in self.objects]
+            )
+        else:
+            self.bounds = np.zeros((0, 2, 3))
+
+    def firstHits(self, origins, directions, maxDistances=None):
+        """Find the first object hit by each of a batch of rays.
+
+        Args:
+            origins: Array of shape (N, 3) giving the origin of each ray.
+            directions: Array of shape (N, 3) giving the direction of each ray.
+            maxDistances: Optional array of N distances; hits farther than these
+                distances along each ray (in units of its direction) are ignored.
+
+        Returns:
+            A pair of arrays giving the distance to the first hit of each ray (or
+            infinity) and the index of the object it hit (or -1).
+        """
+        origins = np.asarray(origins, dtype=float)
+        directions = np.asarray(directions, dtype=float)
+        count = len(origins)
+        distances = np.full(count, np.inf)
+        if maxDistances is not None:
+            # Hits exactly at the maximum distance still count
+            distances[:] = np.nextafter(maxDistances, np.inf)
+        hitObjects = np.full(count, -1)
+        if count == 0 or not self.objects:
+            return distances, hitObjects
+
+        entries = self._boxEntries(origins, directions)
+        scale = np.linalg.norm(directions, axis=1)
+        for index in np.argsort(np.min(entries, axis=0)):
+            rays = np.flatnonzero(entries[:, index] < distances)
+            if len(rays) == 0:
+                continue
+            region = self.objects[index].occupiedSpace
+            locations, rayIndices = _intersectRays(
+                region, origins[rays], directions[rays]
+            )
+            if len(rayIndices) == 0:
+                continue
+            rays = rays[rayIndices]
+            hitDistances = np.linalg.norm(locations - origins[rays], axis=1) / scale[rays]
+            closest = np.full(count, np.inf)
+            np.minimum.at(closest, rays, hitDistances)
+            closer = closest < distances
+            distances[closer] = closest[closer]
+            hitObjects[closer] = index
+        distances[hitObjects < 0] = np.inf
+        return distances, hitObjects
+
+    def _boxEntries(self, origins, directions):
+        """Distances along each ray at which it enters the box of each object.
+
+        Returns:
+            An array of shape (rays, objects), which is infinite where a ray misses a
+            box. Rays starting inside a box enter it at distance 0.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse = 1 / directions[:, np.newaxis, :]
+            near = (
+                self.bounds[np.newaxis, :, 0, :] - origins[:, np.newaxis, :]
+            ) * inverse
+            far = (self.bounds[np.newaxis, :, 1, :] - origins[:, np.newaxis, :]) * inverse
+        # NaNs arise for rays parallel to a face of a box and starting on it; fmin and
+        # fmax ignore them
+        entry = np.fmax.reduce(np.fmin(near, far), axis=2)
+        exit = np.fmin.reduce(np.fmax(near, far), axis=2)
+        entry = np.maximum(entry, 0)
+        return np.where(entry <= exit, entry, np.inf)
+
+
 def canSee(
     position,
     orientation,
@@ -61,9 +166,9 @@ def canSee(
        the desired density in the intersection region. Keep all rays that intersect
        the object (candidate rays).
     6. If there are no candidate rays, the object is not visible.
-    7. For each occluding object in occludingObjects: check if any candidate rays
-       intersect the occluding object at a distance less than the distance they intersected
-       the target object. If they do, remove them from the candidate rays.
+    7. Cast the candidate rays against all occluding objects at once with a `RayCaster`,
+       removing any candidate ray which hits an occluding object at a distance no greater
+       than the distance at which it intersected the target object.
     8. If any candidate rays remain, the object is visible. If not, it is occluded
        and not visible.
 
@@ -73,9 +178,9 @@ def canSee(
        If so, the point cannot be visible
     2. Create a single candidate ray, using the vector from the viewer to the target.
        If this ray is outside of the bounds of viewAngles, the point cannot be visible.
-    3. For each occluding object in occludingObjets: check if the candidate ray hits
-       the occluding object at a distance less than the distance from the viewer to the
-       target point. If so, then the object is not visible. Otherwise, the object is visible.
+    3. Check if the candidate ray hits any occluding object at a distance no greater
+       than the distance from the viewer to the target point. If so, then the object is
+       not visible. Otherwise, the object is visible.
 
     Args:
         position: Position of the viewer, accounting for any offsets.
@@ -88,10 +193,9 @@ def canSee(
     """
     from scenic.core.object_types import Object, OrientedPoint, Point
 
-    # Filter occluding objects that are obviously infeasible
-    occludingObjects = [
-        obj for obj in occludingObjects if position.distanceTo(obj) <= visibleDistance
-    ]
+    # Occluding objects out of visible distance are skipped by the ray caster, using
+    # their bounding boxes.
+    occludingObjects = tuple(occludingObjects)
 
     if rayCount is None:
         rayCount = (
@@ -381,60 +485,57 @@ def canSee(
 
         batch_size = BATCH_SIZE
 
+        occluders = RayCaster(occludingObjects)
+        origin = np.array(position.coordinates)
+
         # Use a generator to avoid having to immediately split a large array
         for target_ray_indices in batched(ray_indices, batch_size):
             ray_batch = ray_vectors[np.asarray(target_ray_indices)]
+            origins = np.broadcast_to(origin, ray_batch.shape)
 
             # Check if candidate rays hit target
-            raw_target_hit_info = target_region.mesh.ray.intersects_location(
-                ray_origins=np.full(ray_batch.shape, position.coordinates),
-                ray_directions=ray_batch,
-            )
+            hit_locs, hit_rays = _intersectRays(target_region, origins, ray_batch)
 
             # If no hits, this object can't be visible with these rays
-            if len(raw_target_hit_info[0]) == 0:
+            if len(hit_rays) == 0:
                 continue
 
-            # Extract rays that are within visibleDistance, mapping the vector
-            # to the closest distance at which they hit the target
-            hit_locs = raw_target_hit_info[0]
-            hit_distances = np.linalg.norm(hit_locs - np.array(position), axis=1)
-
-            target_dist_map = {}
-
-            for hit_iter in range(len(raw_target_hit_info[0])):
-                hit_ray = tuple(ray_batch[raw_target_hit_info[1][hit_iter]])
-                hit_dist = hit_distances[hit_iter]
-
-                # If the hit was out of visible distance, don't consider it.
-                if hit_dist > visibleDistance:
-                    continue
-
-                # If we don't already have a hit distance for this vector, or if
-                # this hit was closer, update the target distance mapping.
-                if hit_ray not in target_dist_map or hit_dist < target_dist_map[hit_ray]:
-                    target_dist_map[hit_ray] = hit_dist
+            # Find the closest distance at which each ray hits the target, ignoring
+            # hits out of visible distance
+            hit_distances = np.linalg.norm(hit_locs - origin, axis=1)
+            target_distances = np.full(len(ray_batch), np.inf)
+            np.minimum.at(target_distances, hit_rays, hit_distances)
+            target_distances[target_distances > visibleDistance] = np.inf
 
             # If no hits within range, this object can't be visible with these rays
-            if len(target_dist_map) == 0:
+            candidate_rays = np.flatnonzero(np.isfinite(target_distances))
+            if len(candidate_rays) == 0:
                 continue
 
-            # Now check if occluded objects block sight to target
-            candidate_rays = set(target_dist_map.keys())
+            # Now check if occluding objects block sight to target: a ray is
+            # occluded if it hits an occluding object no farther than the target.
+            _, occluding_hits = occluders.firstHits(
+                origins[candidate_rays],
+                ray_batch[candidate_rays],
+                target_distances[candidate_rays],
+            )
+            clear = occluding_hits < 0
 
             ## DEBUG ##
-            # Show all candidate vertices that hit target
+            # Show occluded and non occluded candidate rays
             if debug:
-                vertices = [
-                    visibleDistance * np.array(vec) + position.coordinates
-                    for vec in candidate_rays
-                ]
-                vertices = [position.coordinates] + vertices
+                candidate_list = ray_batch[candidate_rays]
+                occluded_vertices = list(
+                    visibleDistance * candidate_list[~clear] + origin
+                )
+                clear_vertices = list(visibleDistance * candidate_list[clear] + origin)
+                vertices = [origin] + occluded_vertices + clear_vertices
                 lines = [
                     trimesh.path.entities.Line([0, v]) for v in range(1, len(vertices))
                 ]
-                colors = [(0, 0, 255, 255) for line in lines]
-
+                occluded_colors = [(255, 0, 0, 255) for vertex in occluded_vertices]
+                clear_colors = [(0, 255, 0, 255) for vertex in clear_vertices]
+                colors = occluded_colors + clear_colors
                 render_scene = trimesh.scene.Scene()
                 render_scene.add_geometry(
                     trimesh.path.Path3D(
@@ -442,81 +543,11 @@ def canSee(
                     )
                 )
                 render_scene.add_geometry(target.occupiedSpace.mesh)
-                for occ_obj in list(occludingObjects):
+                for occ_obj in occludingObjects:
                     render_scene.add_geometry(occ_obj.occupiedSpace.mesh)
                 render_scene.show()
 
-            for occ_obj in occludingObjects:
-                # If no more rays are candidates, then object is no longer visible.
-                # Short circuit the loop to get to the next batch of rays.
-                if len(candidate_rays) == 0:
-                    break
-
-                candidate_ray_list = np.array(list(candidate_rays))
-
-                # Test all candidate rays against this occluding object
-                object_hit_info = occ_obj.occupiedSpace.mesh.ray.intersects_location(
-                    ray_origins=np.full(candidate_ray_list.shape, position.coordinates),
-                    ray_directions=candidate_ray_list,
-                )
-
-                # If no hits, this object doesn't occlude. We don't need to
-                # filter any rays for this object so move on the next object.
-                if len(object_hit_info[0]) == 0:
-                    continue
-
-                # Check if any candidate ray hits the occluding object with a smaller
-                # distance than the target.
-                object_distances = np.linalg.norm(
-                    object_hit_info[0] - np.array(position), axis=1
-                )
-
-                occluded_rays = set()
-
-                for hit_iter in range(len(object_hit_info[0])):
-                    hit_ray = tuple(candidate_ray_list[object_hit_info[1][hit_iter]])
-                    hit_dist = object_distances[hit_iter]
-
-                    # If this ray hit the object earlier than it hit the target, reject the ray.
-                    if hit_dist <= target_dist_map[hit_ray]:
-                        occluded_rays.add(hit_ray)
-
-                candidate_rays = candidate_rays - occluded_rays
-
-                ## DEBUG ##
-                # Show occluded and non occluded rays from this object
-                if debug:
-                    occluded_vertices = [
-                        visibleDistance * np.array(vec) + position.coordinates
-                        for vec in occluded_rays
-                    ]
-                    clear_vertices = [
-                        visibleDistance * np.array(vec) + position.coordinates
-                        for vec in candidate_rays
-                    ]
-                    vertices = occluded_vertices + clear_vertices
-                    vertices = [position.coordinates] + vertices
-                    lines = [
-                        trimesh.path.entities.Line([0, v])
-                        for v in range(1, len(vertices))
-                    ]
-                    occluded_colors = [(255, 0, 0, 255) for line in occluded_vertices]
-                    clear_colors = [(0, 255, 0, 255) for line in clear_vertices]
-                    colors = occluded_colors + clear_colors
-                    render_scene = trimesh.scene.Scene()
-                    render_scene.add_geometry(
-                        trimesh.path.Path3D(
-                            entities=lines,
-                            vertices=vertices,
-                            process=False,
-                            colors=colors,
-                        )
-                    )
-                    render_scene.add_geometry(target.occupiedSpace.mesh)
-                    render_scene.add_geometry(occ_obj.occupiedSpace.mesh)
-                    render_scene.show()
-
-            if len(candidate_rays) > 0:
+            if np.any(clear):
                 return True
 
         # No rays hit the object and are not occluded, so the object is not visible
@@ -582,22 +613,12 @@ def canSee(
         if orientation is not None:
             candidate_ray_list = orientation.getRotation().apply(candidate_ray_list)
 
-        for occ_obj in occludingObjects:
-            # Test all candidate rays against this occluding object
-            object_hit_info = occ_obj.occupiedSpace.mesh.ray.intersects_location(
-                ray_origins=[position.coordinates for ray in candidate_ray_list],
-                ray_directions=candidate_ray_list,
-            )
-
-            for hit_iter in range(len(object_hit_info[0])):
-                ray = tuple(candidate_ray_list[object_hit_info[1][hit_iter]])
-                occ_distance = position.distanceTo(
-                    Vector(*object_hit_info[0][hit_iter, :])
-                )
-
-                if occ_distance <= target_distance:
-                    # The ray is occluded
-                    return False
+        _, occluding_hits = RayCaster(occludingObjects).firstHits(
+            np.array([position.coordinates]), candidate_ray_list, [target_distance]
+        )
+        if occluding_hits[0] >= 0:
+            # The ray is occluded
+            return False
 
         return True
     else:
@@ -0,0 +1,237 @@
+"""Batch evaluation of assurance claims against many recorded missions.
+
+Each claim is a Scenic file in the format produced by
+``tools/ansr/ac_scenario_generator.py``: it decodes the bag named by the
+``bag_path`` global parameter and checks its requirements while replaying it.
+This module evaluates every (claim, bag) pair over a process pool and writes a
+table of verdicts::
+
+    python -m scenic.simulators.replay.evaluate claims/*.scenic --bags missions/
+
+A claim file may contain several temporal requirements, e.g. the file written by
+``ac_scenario_generator.py --combined``, which names one requirement per claim.
+Violations do not stop the replay, so all of them are checked in a single pass
+over the bag and each gets its own verdict in the table. The replay does stop
+once the verdicts of all requirements are final, e.g. when an ``always``
+requirement was violated and all ``eventually`` requirements were satisfied.
+
+Bags are decoded only once: a first round evaluates one claim per bag, which
+fills the decoded-bag cache of `scenic.simulators.utils.parse_bag`, and the
+remaining claims then load the decoded bag from the cache. Claims are still
+compiled once per bag, since their top-level code depends on the replayed data
+(e.g. the time at which the mission ends).
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import functools
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import time
+import traceback
+
+import scenic
+from scenic.core.dynamics.utils import RejectSimulationException
+import scenic.core.geometry_cache as geometry_cache
+
+#: World model used to run claims, as with ``scenic --replay``.
+REPLAY_MODEL = "scenic.simulators.replay.driving_model"
+
+#: Columns of the table of results.
+RESULT_FIELDS = (
+    "claim",
+    "requirement",
+    "bag",
+    "verdict",
+    "violation_step",
+    "violation_time",
+    "seconds",
+)
+
+BAG_SUFFIXES = (".mcap", ".tgz")
+
+#: Maximum number of iterations used to sample the initial scene of a claim. Objects in
+#: claims are placeholders whose state comes from the replay, but their randomly sampled
+#: default orientations can still make nearby objects intersect in the initial scene.
+MAX_SCENE_ITERATIONS = 100
+
+
+def findBags(paths):
+    """Expand the given files and directories into a sorted list of bag files."""
+    bags = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            bags.extend(
+                p for p in path.rglob("*") if p.suffix in BAG_SUFFIXES and p.is_file()
+            )
+        else:
+            bags.append(path)
+    return sorted(set(bags))
+
+
+def evaluateClaim(claim, bag, maxSteps=None):
+    """Replay one bag against all the requirements of one claim.
+
+    Returns:
+        A list of dicts with the fields of `RESULT_FIELDS`, one for each temporal
+        requirement of the claim. The verdict is ``pass`` if the replay finished
+        without violating the requirement and ``fail`` if it was violated (in which
+        case the time step and simulated time of the violation are given). If the
+        replay was rejected for another reason, e.g. a non-temporal requirement
+        checked during the replay, a single ``fail`` row names that reason instead;
+        if the claim could not be evaluated at all, a single row has verdict
+        ``error``.
+    """
+
+    def makeResult(verdict, requirement="", simulation=None, violationStep=None):
+        result = dict.fromkeys(RESULT_FIELDS, "")
+        result.update(claim=str(claim), requirement=requirement, bag=str(bag))
+        result["verdict"] = verdict
+        if violationStep is not None:
+            result.update(
+                violation_step=violationStep,
+                violation_time=violationStep * simulation.timestep,
+            )
+        return result
+
+    startTime = time.time()
+    try:
+        scenario = scenic.scenarioFromFile(
+            claim, params={"bag_path": str(bag), "render": False}, model=REPLAY_MODEL
+        )
+        scene, _ = scenario.generate(maxIterations=MAX_SCENE_ITERATIONS)
+        simulator = scenario.getSimulator()
+        try:
+            simulation = simulator.createSimulation(
+                scene,
+                maxSteps=maxSteps,
+                name=Path(claim).stem,
+                verbosity=0,
+                timestep=scene.params.get("time_step"),
+                continueAfterViolations=True,
+                terminateWhenRequirementsDecided=True,
+            )
+        except RejectSimulationException as e:
+            simulation = e.simulation
+            results = [makeResult("fail", str(e), simulation, simulation.currentTime)]
+        else:
+            violations = simulation.result.requirementViolations
+            results = []
+            for req in scene.temporalRequirements:
+                step = violations.get(str(req))
+                verdict = "pass" if step is None else "fail"
+                results.append(makeResult(verdict, str(req), simulation, step))
+            if not results:
+                results.append(makeResult("pass"))
+    except Exception:
+        results = [makeResult("error")]
+        print(f"Error evaluating {claim} on {bag}:", file=sys.stderr)
+        traceback.print_exc()
+    seconds = round(time.time() - startTime, 3)
+    for result in results:
+        result["seconds"] = seconds
+    return results
+
+
+def evaluate(claims, bags, workers=None, maxSteps=None, geometryCache=None):
+    """Evaluate every claim against every bag.
+
+    Args:
+        claims: Paths to the Scenic files of the claims.
+        bags: Paths to the bags (``.mcap`` files or ``.tgz`` archives).
+        workers: Number of worker processes (default: number of CPUs). If 1, all
+            claims are evaluated in the current process.
+        maxSteps: Optional limit on the number of time steps of each replay.
+        geometryCache: Optional directory in which the workers share derived geometry
+            such as view regions (see `scenic.core.geometry_cache`).
+
+    Returns:
+        The concatenated results of `evaluateClaim`, ordered by bag and then by
+        claim.
+    """
+    claims, bags = [str(claim) for claim in claims], [str(bag) for bag in bags]
+    if not claims or not bags:
+        return []
+    # The first claim of each bag decodes it; the others then hit the cache.
+    rounds = (
+        [(claims[0], bag) for bag in bags],
+        [(claim, bag) for bag in bags for claim in claims[1:]],
+    )
+    evaluatePair = functools.partial(evaluateClaim, maxSteps=maxSteps)
+    if workers is None:
+        workers = os.cpu_count()
+    configureCache = None
+    if geometryCache is not None:
+        configureCache = functools.partial(geometry_cache.configure, geometryCache)
+        configureCache()
+    results = []
+    if workers <= 1:
+        for pairs in rounds:
+            for pair in pairs:
+                results.extend(evaluatePair(*pair))
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            workers, mp_context=context, initializer=configureCache
+        ) as pool:
+            for pairs in (pairs for pairs in rounds if pairs):
+                for claimResults in pool.map(evaluatePair, *zip(*pairs)):
+                    results.extend(claimResults)
+    rank = {pair: i for i, pair in enumerate((c, b) for b in bags for c in claims)}
+    return sorted(results, key=lambda result: rank[result["claim"], result["bag"]])
+
+
+def writeResults(results, output):
+    """Write results as CSV to the given text stream."""
+    writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m scenic.simulators.replay.evaluate",
+        description="Evaluate assurance claims against recorded missions.",
+    )
+    parser.add_argument("claims", nargs="+", help="Scenic files of the claims")
+    parser.add_argument(
+        "--bags",
+        nargs="+",
+        required=True,
+        help="bag files or archives, or directories to search for them",
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, help="number of worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "-o", "--output", help="CSV file for the results (default: standard output)"
+    )
+    parser.add_argument("--max-steps", type=int, help="maximum time steps per replay")
+    parser.add_argument(
+        "--geometry-cache",
+        metavar="DIR",
+        help="directory in which workers share view regions and other geometry",
+    )
+    args = parser.parse_args(argv)
+
+    bags = findBags(args.bags)
+    results = evaluate(
+        args.claims,
+        bags,
+        workers=args.workers,
+        maxSteps=args.max_steps,
+        geometryCache=args.geometry_cache,
+    )
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writeResults(results, f)
+    else:
+        writeResults(results, sys.stdout)
+    return 0 if all(r["verdict"] != "error" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
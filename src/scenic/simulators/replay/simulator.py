@@ -11,9 +11,7 @@ import os
 import pathlib
 import pandas as pd
 import scipy
-import time
 
-from PIL import Image
 import numpy as np
 
 import scenic.core.errors as errors  # isort: skip
@@ -32,7 +30,8 @@ from scenic.domains.driving.controllers import (
     PIDLongitudinalController,
 )
 from scenic.domains.driving.simulators import DrivingSimulation, DrivingSimulator
-from scenic.syntax.veneer import verbosePrint, _globalParameters
+from scenic.simulators.utils.video import VideoWriter
+from scenic.syntax.veneer import verbosePrint
 
 current_dir = pathlib.Path(__file__).parent.absolute()
 
@@ -53,8 +52,15 @@ class ReplaySimulator(DrivingSimulator):
     """Implementation of `Simulator` for the Replay simulator.
 
     Args:
-        network (Network): road network to display in the background, if any.
         render (bool): whether to render the simulation in a window.
+        export_gif (bool): whether to save the simulation to ``simulation.gif``; this is
+          shorthand for ``video="simulation.gif"``.
+        video (str): file to which to save the simulation as it runs, e.g. a ``.gif``
+          or ``.mp4`` file (see `scenic.simulators.utils.video`). Frames are rendered
+          offscreen unless **render** is also true, so no display is needed.
+        frame_every (int): only save every n-th time step to the video.
+        resolution (tuple): width and height of the rendered frames, in pixels.
+        fps (float): frame rate of the video; by default, it plays in real time.
 
     .. versionchanged:: 3.0
 
@@ -63,34 +69,69 @@ class ReplaySimulator(DrivingSimulator):
         when not otherwise specified is still 0.1 seconds.
     """
 
-    def __init__(self, render=False, export_gif=False):
+    def __init__(
+        self,
+        render=False,
+        export_gif=False,
+        video=None,
+        frame_every=1,
+        resolution=(WIDTH, HEIGHT),
+        fps=None,
+    ):
         super().__init__()
+        if video is None and export_gif:
+            video = "simulation.gif"
+        if int(frame_every) < 1:
+            raise ValueError("frame_every must be a positive integer")
         self.export_gif = export_gif
         self.render = render
+        self.video = video
+        self.frame_every = int(frame_every)
+        self.resolution = tuple(int(size) for size in resolution)
+        self.fps = fps
 
     def createSimulation(self, scene, **kwargs):
-        simulation = ReplaySimulation(
-            scene, self.render, self.export_gif, **kwargs
+        return ReplaySimulation(
+            scene,
+            self.render,
+            self.video,
+            frame_every=self.frame_every,
+            resolution=self.resolution,
+            fps=self.fps,
+            **kwargs,
         )
-        if self.export_gif and self.render:
-            simulation.generate_gif("simulation.gif")
-        return simulation
 
 
 class ReplaySimulation(DrivingSimulation):
     """Implementation of `Simulation` for the Replay simulator."""
 
-    def __init__(self, scene, render, export_gif, timestep, **kwargs):
-        self.export_gif = export_gif
+    def __init__(
+        self,
+        scene,
+        render,
+        video,
+        timestep,
+        frame_every=1,
+        resolution=(WIDTH, HEIGHT),
+        fps=None,
+        **kwargs,
+    ):
         self.render = render
-        self.frames = []
+        self.video = video
+        self.frame_every = frame_every
+        self.width, self.height = resolution
+        self.video_writer = None
 
         if timestep is None:
             timestep = 0.1
-
-        self.sim_data: pd.DataFrame = _globalParameters["sim_data"]
-        self.sim_data_iterrows = self.sim_data.iterrows()
-        self.now_time: float = float(self.sim_data.head(1).Timestamp.values[0])
+        if video is not None:
+            if fps is None:
+                fps = 1 / (timestep * frame_every)
+            self.video_writer = VideoWriter(video, fps)
+
+        self.sim_data: pd.DataFrame = scene.params["sim_data"]
+        self._indexSimData()
+        self.now_time: float = float(self.timestamps[0])
         self.sim_start_time = self.now_time
         self.obj_from_id = {}
         self.ego = None
@@ -104,18 +145,37 @@ class ReplaySimulation(DrivingSimulation):
             self.obj_from_id[obj.id] = obj
         assert self.ego is not None
 
-        if self.render:
+        if self.render or self.video_writer:
             # determine window size
             min_x, max_x = -500, 500 #findMinMax(obj.x for obj in self.objects)
             min_y, max_y = -500, 500 #findMinMax(obj.y for obj in self.objects)
 
-            pygame.init()
-            pygame.font.init()
-            self.screen = pygame.display.set_mode(
-                (WIDTH, HEIGHT), pygame.HWSURFACE | pygame.DOUBLEBUF
-            )
-            img_path = _globalParameters["map_data"]
-            self.map = pygame.image.load(img_path)
+            size = (self.width, self.height)
+            if self.render:
+                pygame.init()
+                pygame.font.init()
+                self.screen = pygame.display.set_mode(
+                    size, pygame.HWSURFACE | pygame.DOUBLEBUF
+                )
+            else:
+                # Offscreen rendering: draw on a plain surface, without any display
+                self.screen = pygame.Surface(size)
+            img_path = self.scene.params.get("map_data")
+            if img_path is None:
+                self.map = pygame.Surface(size)
+                self.map.fill((255, 255, 255))
+            else:
+                self.map = pygame.image.load(img_path)
+                if size != (WIDTH, HEIGHT):
+                    # Maps are drawn for the default resolution
+                    map_width, map_height = self.map.get_size()
+                    self.map = pygame.transform.scale(
+                        self.map,
+                        (
+                            round(map_width * self.width / WIDTH),
+                            round(map_height * self.height / HEIGHT),
+                        ),
+                    )
             self.screen.blit(self.map, (0, 0)) #.fill((255, 255, 255))
             x, y, _ = self.objects[0].position
             self.min_x, self.max_x = min_x - 50, max_x + 50
@@ -133,7 +193,7 @@ class ReplaySimulation(DrivingSimulation):
 
             img_path = os.path.join(current_dir, "car.png")
             self.car = pygame.image.load(img_path)
-            self.car_width = 10*int(3.5 * WIDTH / self.size_x)
+            self.car_width = max(10*int(3.5 * self.width / self.size_x), 1)
             self.car_height = self.car_width
             self.car = pygame.transform.scale(self.car, (self.car_width, self.car_height))
             img_path = os.path.join(current_dir, "drone.png")
@@ -148,7 +208,7 @@ class ReplaySimulation(DrivingSimulation):
         x, y = pos[:2]
         x_prop = (x - self.min_x) / self.size_x
         y_prop = (y - self.min_y) / self.size_y
-        return int(x_prop * WIDTH), HEIGHT - 1 - int(y_prop * HEIGHT)
+        return int(x_prop * self.width), self.height - 1 - int(y_prop * self.height)
 
     def createObjectInSimulator(self, obj):
         # Set actor's initial speed
@@ -172,106 +232,124 @@ class ReplaySimulation(DrivingSimulation):
         while self.ego.targets_reported != []:
             self.ego.targets_reported.pop()
 
+    def _indexSimData(self):
+        """Presort the replayed messages by time and split them into NumPy columns.
+
+        Each step then only needs a binary search for the end of its time window and
+        grouped reductions over the rows inside it.
+        """
+        data = self.sim_data.sort_values("Timestamp", kind="stable")
+        count = len(data)
+
+        def columns(*names):
+            return np.column_stack(
+                [
+                    data[name].to_numpy(dtype=float)
+                    if name in data
+                    else np.full(count, np.nan)
+                    for name in names
+                ]
+            )
+
+        self.timestamps = data.Timestamp.to_numpy(dtype=float)
+        self.next_row = 0
+        events = data.Event.to_numpy()
+        self.event_rows = {
+            event: np.flatnonzero(events == event)
+            for event in ("GT_POSITION", "ODOM", "MSG", "CLSN")
+        }
+        if "EntityID" in data:
+            self.entity_codes, self.entity_ids = pd.factorize(data.EntityID)
+        else:
+            self.entity_codes, self.entity_ids = np.full(count, -1), []
+        self.poses = columns("X", "Y", "Z", "Roll", "Pitch", "Yaw")
+        self.odometry = columns("Xdot", "Ydot", "Zdot", "Surge", "Heave", "Sway")
+        self.colors = data.Color.to_numpy() if "Color" in data else np.full(count, None)
+        self.vehicle_types = data.Type.to_numpy() if "Type" in data else np.full(count, None)
+
+    def _windowRows(self, event, start, stop):
+        """Rows of the given event type among rows ``start:stop`` of the sorted data."""
+        rows = self.event_rows[event]
+        return rows[np.searchsorted(rows, start) : np.searchsorted(rows, stop)]
+
+    def _entityMeans(self, rows, values):
+        """Average ``values`` over the given rows for each entity appearing in them.
+
+        Returns a dict mapping entity IDs to their mean values and their last row.
+        """
+        codes = self.entity_codes[rows]
+        counts = np.bincount(codes, minlength=len(self.entity_ids))
+        sums = np.column_stack(
+            [
+                np.bincount(codes, weights=column, minlength=len(self.entity_ids))
+                for column in values[rows].T
+            ]
+        )
+        # Index of the last row of each entity within the window
+        last = np.full(len(self.entity_ids), -1)
+        np.maximum.at(last, codes, rows)
+        return {
+            self.entity_ids[code]: (sums[code] / counts[code], last[code])
+            for code in np.flatnonzero(counts)
+        }
+
     def step(self):
-        targets_groundtruth = {}
-        targets_reported = {}
-        ego = {}
-        # Process simulation data for the next timestep
-        for i, msg in self.sim_data_iterrows:
-            if msg.Event == "GT_POSITION":
-                if msg.EntityID not in targets_groundtruth:
-                    targets_groundtruth[msg.EntityID] = {}
-                    t = targets_groundtruth[msg.EntityID]
-                    t["position"] = np.array([0, 0, 0], dtype=float)
-                    t["roll"] = 0.0
-                    t["pitch"] = 0.0
-                    t["yaw"] = 0.0
-                    t["update_count"] = 0
-                t = targets_groundtruth[msg.EntityID]
-                t["position"] += np.array([msg.X, msg.Y, msg.Z], dtype=float)
-                t["roll"] += msg.Roll
-                t["pitch"] += msg.Pitch
-                t["yaw"] += msg.Yaw
-                t["update_count"] += 1
-            elif msg.Event == "ODOM":
-                if ego == {}:
-                    ego["position"] = np.array([0, 0, 0], dtype=float)
-                    ego["velocity"] = np.array([0, 0, 0], dtype=float)
-                    ego["angularVelocity"] = np.array([0, 0, 0], dtype=float)
-                    ego["roll"] = 0.0
-                    ego["pitch"] = 0.0
-                    ego["yaw"] = 0.0
-                    ego["update_count"] = 0
-                ego["position"] += np.array([msg.X, msg.Y, msg.Z], dtype=float)
-                ego["velocity"] += np.array([msg.Xdot, msg.Ydot, msg.Zdot], dtype=float)
-                ego["angularVelocity"] += np.array([msg.Surge, msg.Heave, msg.Sway], dtype=float)
-                ego["roll"] += msg.Roll
-                ego["pitch"] += msg.Pitch
-                ego["yaw"] += msg.Yaw
-                ego["update_count"] += 1
-            elif msg.Event == "MSG":
-                if msg.EntityID not in targets_reported:
-                    targets_reported[msg.EntityID] = {}
-                    t = targets_reported[msg.EntityID]
-                    t["position"] = np.array([0, 0, 0], dtype=float)
-                    t["roll"] = 0.0
-                    t["pitch"] = 0.0
-                    t["yaw"] = 0.0
-                    t["update_count"] = 0
-                t = targets_reported[msg.EntityID]
-                t["position"] += np.array([msg.X, msg.Y, msg.Z], dtype=float)
-                t["roll"] += msg.Roll
-                t["pitch"] += msg.Pitch
-                t["yaw"] += msg.Yaw
-                # TODO: Should the color be averaged? What about vehicle_type?
-                t["color"] = msg.Color
-                t["vehicle_type"] = msg.Type
-                t["update_count"] += 1
-            elif msg.Event == "CLSN":
-                ego["collision"] = True
-
-            # TODO: Need to stop one row earlier but there is no way to peek
-            #       at message timestamp without stepping sim_data_iterrows.
-            if msg.Timestamp > self.now_time + self.timestep:
-                self.now_time = msg.Timestamp
-                break
+        # Process simulation data for the next timestep: all messages up to the end
+        # of the current time window.
+        start = self.next_row
+        stop = int(
+            np.searchsorted(self.timestamps, self.now_time + self.timestep, side="right")
+        )
+        self.next_row = stop
+        if stop < len(self.timestamps):
+            self.now_time = float(self.timestamps[stop])
+        elif stop > start:
+            self.now_time = float(self.timestamps[-1])
+
+        targets_groundtruth = self._entityMeans(
+            self._windowRows("GT_POSITION", start, stop), self.poses
+        )
+        targets_reported = self._entityMeans(
+            self._windowRows("MSG", start, stop), self.poses
+        )
+        odometry_rows = self._windowRows("ODOM", start, stop)
+        collided = len(self._windowRows("CLSN", start, stop)) > 0
 
         # Update simulation objects
         self.clear_targets_reported()
         self.ego.collision = False
-        for id, t in targets_groundtruth.items():
+        for id, (mean, _) in targets_groundtruth.items():
             obj = self.obj_from_id[id]
-            obj.position = Vector(*(t["position"]/t["update_count"]))
-            obj.roll = t["roll"]/t["update_count"]
-            obj.pitch = t["pitch"]/t["update_count"]
-            obj.yaw = t["yaw"]/t["update_count"]
-            obj.heading = t["pitch"]/t["update_count"]
-        for id, t in targets_reported.items():
+            obj.position = Vector(*mean[:3])
+            obj.roll, obj.pitch, obj.yaw = mean[3:]
+            obj.heading = obj.pitch
+        for id, (mean, last) in targets_reported.items():
             obj = self.obj_from_id[id]._copyWith()
-            obj.position = Vector(*(t["position"]/t["update_count"]))
-            obj.roll = t["roll"]/t["update_count"]
-            obj.pitch = t["pitch"]/t["update_count"]
-            obj.yaw = t["yaw"]/t["update_count"]
-            obj.heading = t["pitch"]/t["update_count"]
-            obj.color = t["color"]
-            obj.vehicle_type = t["vehicle_type"]
+            obj.position = Vector(*mean[:3])
+            obj.roll, obj.pitch, obj.yaw = mean[3:]
+            obj.heading = obj.pitch
+            # TODO: Should the color be averaged? What about vehicle_type?
+            obj.color = self.colors[last]
+            obj.vehicle_type = self.vehicle_types[last]
             self.ego.targets_reported.append(obj)
-        if "position" in ego:
-            self.ego.position = Vector(*(ego["position"]/ego["update_count"]))
-            self.ego.velocity = Vector(*(ego["velocity"]/ego["update_count"]))
+        if len(odometry_rows) > 0:
+            pose = self.poses[odometry_rows].mean(axis=0)
+            odometry = self.odometry[odometry_rows].mean(axis=0)
+            self.ego.position = Vector(*pose[:3])
+            self.ego.velocity = Vector(*odometry[:3])
             self.ego.speed = scipy.linalg.norm(self.ego.velocity)
-            self.ego.angularVelocity = Vector(*(ego["angularVelocity"]/ego["update_count"]))
+            self.ego.angularVelocity = Vector(*odometry[3:])
             self.ego.angularSpeed = self.ego.angularVelocity.z
-            self.ego.roll = ego["roll"]/ego["update_count"]
-            self.ego.pitch = ego["pitch"]/ego["update_count"]
-            self.ego.yaw = ego["yaw"]/ego["update_count"]
+            self.ego.roll, self.ego.pitch, self.ego.yaw = pose[3:]
             self.ego.heading = self.ego.yaw
-        if "collision" in ego:
-            self.ego.collision = ego["collision"]
+        if collided:
+            self.ego.collision = True
         self.ego.T = self.now_time - self.sim_start_time
         if self.render:
             self.draw_objects()
             pygame.event.pump()
+        elif self.video_writer and self.currentTime % self.frame_every == 0:
+            self.draw_objects()
 
     def draw_objects(self):
         self.screen.blit(self.map, (0, 0))
@@ -304,18 +382,12 @@ class ReplaySimulation(DrivingSimulation):
                     pygame.draw.circle(self.screen, color, (x,y), w)
                 else:
                     assert False
-        pygame.display.update()
+        if self.render:
+            pygame.display.update()
 
-        if self.export_gif:
+        if self.video_writer and self.currentTime % self.frame_every == 0:
             frame = pygame.surfarray.array3d(self.screen)
-            frame = np.transpose(frame, (1, 0, 2))
-            self.frames.append(frame)
-
-        time.sleep(self.timestep/100)
-
-    def generate_gif(self, filename="simulation.gif"):
-        imgs = [Image.fromarray(frame) for frame in self.frames]
-        imgs[0].save(filename, save_all=True, append_images=imgs[1:], duration=50, loop=0)
+            self.video_writer.write(frame.transpose((1, 0, 2)))
 
     def getProperties(self, obj, properties):
         yaw, _, _ = obj.parentOrientation.globalToLocalAngles(obj.heading, 0, 0)
@@ -335,5 +407,7 @@ class ReplaySimulation(DrivingSimulation):
         return values
 
     def destroy(self):
+        if self.video_writer:
+            self.video_writer.close()
         if self.render:
             pygame.quit()
\ No newline at end of file
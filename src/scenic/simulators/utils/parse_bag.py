@@ -1,19 +1,25 @@
 # Copyright 2024 The Johns Hopkins University Applied Physics Laboratory LLC
 
+import contextlib
+import hashlib
 import json
 import logging
 import math
+import numpy as np
+import os
 import pandas as pd
 import re
+import shutil
 import sys
 import tarfile
+import tempfile
 
 from mcap.reader import make_reader
 from mcap_ros2.decoder import DecoderFactory
 from pathlib import Path
 from scipy.spatial.transform import Rotation
 import scipy.linalg as linalg
-from typing import Union
+from typing import IO, Iterator, Union
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -31,11 +37,15 @@ PERCEPTION_TOPIC = '/adk_node/input/perception'
 GT_ODOMETRY_TOPIC = '/adk_node/SimpleFlight/odom_local_ned'
 COLLISION_TOPIC = '/adk_node/SimpleFlight/collision_state'
 
+MCAP_MEMBER_NAME = 'bags_0.mcap'
+
 def verify_bag_path(bag_path: Union[str, Path]) -> Path:
     """
     Checks whether a .tgz bag archive or .mcap bag file is present.
 
-    Returns Path to whichever file is present, preferring .mcap if both are present.
+    Archives are not extracted: use open_bag to read the bag stored inside them.
+
+    Returns Path to the bag file or archive.
     """
     if not isinstance(bag_path, Path):
         bag_path = Path(bag_path)
@@ -47,32 +57,61 @@ def verify_bag_path(bag_path: Union[str, Path]) -> Path:
     is_mcap = bag_path.suffix == '.mcap'
     is_tarfile = bag_path.suffix == '.tgz' and tarfile.is_tarfile(bag_path)
 
-    if not is_mcap:
-        if not is_tarfile:
-            raise BagFileIsWrongFormat
-        else:
-            tar = tarfile.open(bag_path, 'r')
-            tar.extractall(path=bag_path.parent)
-            bag_path = Path(bag_path.parent / 'bags_0.mcap')
-
-            if not bag_path.exists():
-                raise BagFileDoesNotExistException
+    if not (is_mcap or is_tarfile):
+        raise BagFileIsWrongFormat
     return bag_path
 
-def bag_to_dataframe(bag_path: Union[str, Path], topics: list, entity_attribute_map: dict) -> pd.DataFrame:
+class _ForwardStream:
     """
-    Extracts ROS bag (archive) into an intermediate format used by various metrics computation
-    classes in .metrics.
+    Non-seekable view of a stream, making the MCAP reader consume it in a single pass.
 
-    Returns pandas.DataFrame object.
+    Seeking within a compressed archive member restarts decompression from the start of
+    the archive, which the indexed MCAP reader would do for every chunk.
+    """
+    def __init__(self, stream: IO[bytes]) -> None:
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+    def seekable(self) -> bool:
+        return False
+
+@contextlib.contextmanager
+def open_bag(bag_path: Union[str, Path]) -> Iterator[IO[bytes]]:
+    """
+    Opens the MCAP bag at bag_path, or the one stored in the .tgz archive at bag_path.
+
+    Bags inside archives are streamed out of the archive without writing anything to disk,
+    so several processes can safely read the same archive at once. Plain .mcap files are
+    opened seekable, so that the reader can use their chunk index to skip chunks without
+    the requested topics.
     """
     bag_path = verify_bag_path(bag_path)
+    if bag_path.suffix == '.mcap':
+        with open(bag_path, 'rb') as f:
+            yield f
+        return
+    with tarfile.open(bag_path, 'r|*') as tar:
+        for member in tar:
+            if member.isfile() and Path(member.name).name == MCAP_MEMBER_NAME:
+                break
+        else:
+            raise BagFileDoesNotExistException
+        yield _ForwardStream(tar.extractfile(member))
+
+def _decode_messages(bag_path: Path, topics: list):
+    """
+    Yields (topic, log_time, message) for every decodable message in the bag.
 
-    data = []
-    with open(bag_path, 'rb') as f:
+    Messages are yielded in the order they are stored in the bag, which need not be
+    log time order.
+    """
+    with open_bag(bag_path) as f:
         decoders: dict = {}
         bag_reader = make_reader(f, decoder_factories=[DecoderFactory()])
-        for schema,channel,encoded_msg in bag_reader.iter_messages(topics=topics):
+        for schema,channel,encoded_msg in bag_reader.iter_messages(topics=topics,
+                                                                   log_time_order=False):
             if channel.topic not in decoders:
                 decoders[channel.topic] = DecoderFactory().decoder_for('cdr', schema)
             try:
@@ -89,79 +128,374 @@ def bag_to_dataframe(bag_path: Union[str, Path], topics: list, entity_attribute_
                 else:
                     logger.warning(f"Failed to decode a message on {channel.topic}")
                     continue
-            # Process perception topics
-            if channel.topic == PERCEPTION_TOPIC:
-                seconds: float = float(message.detection_time.sec) + (
-                        message.detection_time.nanosec / 1e9)
-                if message.enter_or_leave != 1:
-                    q = message.position.orientation
-                    if linalg.norm([q.x, q.y, q.z, q.w]) > 0:
-                        R, P, Y = Rotation.from_quat([q.x, q.y, q.z, q.w]).as_euler("xyz")
-                    else:
-                        R, P, Y = (0.0, 0.0, 0.0)
-                    data.append({
-                        'Timestamp': seconds,
-                        'Event': 'MSG',
-                        'EntityID': message.entity_id,
-                        'X': message.position.position.x,
-                        'Y': message.position.position.y,
-                        'Z': message.position.position.z,
-                        'Roll': R,
-                        'Pitch': P,
-                        'Yaw': Y,
-                        'Type': entity_attribute_map[message.entity_id]['class'],
-                        'Color': entity_attribute_map[message.entity_id]['color'],
-                        'Confidence': message.probability,
-                    })
-            # Process UAV odometry
-            elif channel.topic == GT_ODOMETRY_TOPIC:
-                seconds = (float(message.header.stamp.sec)
-                                  + (message.header.stamp.nanosec / 1e9))
-                q = message.pose.pose.orientation
-                R, P, Y = Rotation.from_quat([q.x, q.y, q.z, q.w]).as_euler("xyz")
-                data.append({
-                    'Timestamp': seconds,
-                    'Event': 'ODOM',
-                    'X': message.pose.pose.position.x,
-                    'Y': message.pose.pose.position.y,
-                    'Z': message.pose.pose.position.z,
-                    'Roll': R,
-                    'Pitch': P,
-                    'Yaw': Y,
-                    'Xdot': message.twist.twist.linear.x,
-                    'Ydot': message.twist.twist.linear.y,
-                    'Zdot': message.twist.twist.linear.z,
-                    'Surge': message.twist.twist.angular.x,
-                    'Sway': message.twist.twist.angular.y,
-                    'Heave': message.twist.twist.angular.z
-                })
-            # Process collisions
-            elif channel.topic == COLLISION_TOPIC:
-                seconds = (float(message.timestamp.sec)
-                                  + (message.timestamp.nanosec / 1e9))
-                if message.has_collided:
-                    data.append({
-                        'Timestamp': seconds,
-                        'Event': 'CLSN',
-                        'Object': message.object_name,
-                        'ObjectID': message.object_id
-                    })
-            # Entity ground truth topics
+            yield channel.topic, encoded_msg.log_time, message
+
+# Raw fields gathered for each event type, in the order they are read from the messages.
+# Quaternions are kept as QX/QY/QZ/QW and converted to Roll/Pitch/Yaw in one batch per event.
+_RAW_FIELDS = {
+    'MSG': ('Sec', 'Nanosec', 'EntityID', 'X', 'Y', 'Z', 'QX', 'QY', 'QZ', 'QW', 'Confidence'),
+    'ODOM': ('Sec', 'Nanosec', 'X', 'Y', 'Z', 'QX', 'QY', 'QZ', 'QW',
+             'Xdot', 'Ydot', 'Zdot', 'Surge', 'Sway', 'Heave'),
+    'CLSN': ('Sec', 'Nanosec', 'Object', 'ObjectID'),
+    'GT_POSITION': ('Sec', 'Nanosec', 'EntityID', 'X', 'Y', 'Z', 'QX', 'QY', 'QZ', 'QW'),
+}
+
+# Columns of the resulting DataFrame for each event type, in output order.
+_EVENT_COLUMNS = {
+    'MSG': ('Timestamp', 'Event', 'EntityID', 'X', 'Y', 'Z', 'Roll', 'Pitch', 'Yaw',
+            'Type', 'Color', 'Confidence'),
+    'ODOM': ('Timestamp', 'Event', 'X', 'Y', 'Z', 'Roll', 'Pitch', 'Yaw',
+             'Xdot', 'Ydot', 'Zdot', 'Surge', 'Sway', 'Heave'),
+    'CLSN': ('Timestamp', 'Event', 'Object', 'ObjectID'),
+    'GT_POSITION': ('Timestamp', 'Event', 'EntityID', 'X', 'Y', 'Z', 'Roll', 'Pitch', 'Yaw'),
+}
+
+_NUMERIC_FIELDS = {'Sec', 'Nanosec', 'X', 'Y', 'Z', 'QX', 'QY', 'QZ', 'QW',
+                   'Xdot', 'Ydot', 'Zdot', 'Surge', 'Sway', 'Heave', 'Confidence'}
+
+def _event_columns(event: str, raw: dict, entity_attribute_map: dict) -> dict:
+    """
+    Converts the raw field lists gathered for one event type into typed output columns.
+    """
+    arrays = {name: (np.asarray(values, dtype=float) if name in _NUMERIC_FIELDS
+                     else np.asarray(values, dtype=object))
+              for name, values in raw.items()}
+    columns = {
+        'Timestamp': arrays['Sec'] + arrays['Nanosec'] / 1e9,
+        'Event': np.full(len(arrays['Sec']), event, dtype=object),
+    }
+    if 'QW' in arrays:
+        quats = np.column_stack((arrays['QX'], arrays['QY'], arrays['QZ'], arrays['QW']))
+        euler = np.zeros((len(quats), 3))
+        if event == 'MSG':
+            # Perception messages may carry an all-zero quaternion when no orientation
+            # is reported; those rows get zero angles instead of failing the conversion.
+            valid = linalg.norm(quats, axis=1) > 0
+        else:
+            valid = np.ones(len(quats), dtype=bool)
+        if valid.any():
+            euler[valid] = Rotation.from_quat(quats[valid]).as_euler("xyz")
+        columns['Roll'], columns['Pitch'], columns['Yaw'] = euler.T
+    if event == 'MSG':
+        attributes = [entity_attribute_map[entity_id] for entity_id in arrays['EntityID']]
+        columns['Type'] = np.array([a['class'] for a in attributes], dtype=object)
+        columns['Color'] = np.array([a['color'] for a in attributes], dtype=object)
+    if event == 'CLSN':
+        columns['ObjectID'] = np.asarray(raw['ObjectID'])
+    for name in _EVENT_COLUMNS[event]:
+        if name not in columns:
+            columns[name] = arrays[name]
+    return {name: columns[name] for name in _EVENT_COLUMNS[event]}
+
+def _decode_bag(bag_path: Path, topics: list, entity_attribute_map: dict) -> pd.DataFrame:
+    """
+    Decodes an MCAP bag (or the bag inside an archive) into a DataFrame.
+
+    Message fields are gathered per event type into columns, quaternions are converted to
+    Euler angles in a single batch per event type, and the frame is assembled from the
+    columns with rows in log time order (messages logged at the same time keep the order
+    in which they are stored in the bag).
+    """
+    raw: dict = {}
+    order: dict = {}
+    log_times: list = []
+    for topic, log_time, message in _decode_messages(bag_path, topics):
+        # Process perception topics
+        if topic == PERCEPTION_TOPIC:
+            if message.enter_or_leave == 1:
+                continue
+            event = 'MSG'
+            stamp = message.detection_time
+            pose = message.position
+            values = (stamp.sec, stamp.nanosec, message.entity_id,
+                      pose.position.x, pose.position.y, pose.position.z,
+                      pose.orientation.x, pose.orientation.y, pose.orientation.z,
+                      pose.orientation.w, message.probability)
+        # Process UAV odometry
+        elif topic == GT_ODOMETRY_TOPIC:
+            event = 'ODOM'
+            stamp = message.header.stamp
+            pose = message.pose.pose
+            twist = message.twist.twist
+            values = (stamp.sec, stamp.nanosec,
+                      pose.position.x, pose.position.y, pose.position.z,
+                      pose.orientation.x, pose.orientation.y, pose.orientation.z,
+                      pose.orientation.w,
+                      twist.linear.x, twist.linear.y, twist.linear.z,
+                      twist.angular.x, twist.angular.y, twist.angular.z)
+        # Process collisions
+        elif topic == COLLISION_TOPIC:
+            if not message.has_collided:
+                continue
+            event = 'CLSN'
+            stamp = message.timestamp
+            values = (stamp.sec, stamp.nanosec, message.object_name, message.object_id)
+        # Entity ground truth topics
+        else:
+            event = 'GT_POSITION'
+            stamp = message.header.stamp
+            pose = message.pose
+            values = (stamp.sec, stamp.nanosec, topic.split('/')[2],
+                      pose.position.x, pose.position.y, pose.position.z,
+                      pose.orientation.x, pose.orientation.y, pose.orientation.z,
+                      pose.orientation.w)
+
+        if event not in raw:
+            raw[event] = {name: [] for name in _RAW_FIELDS[event]}
+            order[event] = []
+        for column, value in zip(raw[event].values(), values):
+            column.append(value)
+        order[event].append(len(log_times))
+        log_times.append(log_time)
+
+    if not raw:
+        return pd.DataFrame()
+    frames = [
+        pd.DataFrame(_event_columns(event, raw[event], entity_attribute_map),
+                     index=order[event])
+        for event in raw
+    ]
+    frame = pd.concat(frames, sort=False).sort_index()
+    return frame.iloc[np.argsort(log_times, kind='stable')].reset_index(drop=True)
+
+
+# Version of the on-disk cache format; should be incremented whenever the cache layout
+# or the contents of decoded frames change, so that stale entries are not loaded.
+_CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_CACHE_SIZE = 4 * 1024**3
+#: Environment variable overriding the default cache directory.
+CACHE_DIR_VARIABLE = 'SCENIC_BAG_CACHE'
+
+def default_cache_dir() -> Path:
+    """
+    Returns the directory in which decoded bags are cached by default.
+
+    This is the directory named by the SCENIC_BAG_CACHE environment variable if it is
+    set, and otherwise scenic/bags inside the per-user cache directory of the platform
+    ($XDG_CACHE_HOME or ~/.cache on Linux, ~/Library/Caches on macOS, and
+    %LOCALAPPDATA% on Windows). Nothing is ever written next to the bags themselves,
+    which may be on read-only or shared storage.
+    """
+    override = os.environ.get(CACHE_DIR_VARIABLE)
+    if override:
+        return Path(override)
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'scenic' / 'bags'
+
+# Size of the blocks in which a bag (or archive) is read to compute its digest.
+DIGEST_BLOCK_SIZE = 1 << 20
+# Directory inside the cache holding the memoized digests of bags.
+DIGEST_MEMO_DIR_NAME = '.digests'
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(DIGEST_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def content_digest(path: Union[str, Path], cache_dir: Union[str, Path, None] = None) -> str:
+    """
+    Computes a digest of the full contents of a bag (or archive).
+
+    Hashing a multi-GB bag takes a while, so digests are memoized in a small file in the
+    cache directory, keyed by the path, size, and modification time of the bag. The bag is
+    only hashed again when one of them changes.
+    """
+    path = Path(path).resolve()
+    before = path.stat()
+    stamp = [str(path), before.st_size, before.st_mtime_ns]
+    memo_dir = Path(cache_dir if cache_dir is not None else default_cache_dir())
+    memo_dir /= DIGEST_MEMO_DIR_NAME
+    name = hashlib.blake2b(str(path).encode(), digest_size=16).hexdigest()
+    memo = memo_dir / f'{name}.json'
+    try:
+        with open(memo) as f:
+            saved = json.load(f)
+        if saved['stamp'] == stamp:
+            return saved['digest']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    digest = _file_digest(path)
+    after = path.stat()
+    if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+        return digest     # modified while hashing; do not memoize
+    try:
+        memo_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=memo_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'stamp': stamp, 'digest': digest}, f)
+            os.replace(tmp, memo)
+        except OSError:
+            os.unlink(tmp)
+            raise
+    except OSError as e:
+        logger.warning(f"Unable to memoize digest of {path} in {memo_dir}: {e}")
+    return digest
+
+def bag_digest(bag_path: Union[str, Path], topics: list, entity_attribute_map: dict,
+               cache_dir: Union[str, Path, None] = None) -> str:
+    """
+    Computes the cache key of a decoded bag.
+
+    The key covers the full contents of the bag file (or archive), as computed by
+    content_digest with the given cache directory, as well as the topics and entity
+    attributes used to decode it.
+    """
+    digest = hashlib.blake2b()
+    digest.update(content_digest(bag_path, cache_dir).encode())
+    options = json.dumps([_CACHE_FORMAT_VERSION, sorted(topics), entity_attribute_map],
+                         sort_keys=True)
+    digest.update(options.encode())
+    return digest.hexdigest()
+
+def _write_cache_entry(entry: Path, frame: pd.DataFrame) -> None:
+    """
+    Stores a frame as one .npy file per column plus a JSON metadata file.
+
+    Object columns are stored as integer codes into a list of unique values so that
+    every column can be memory mapped when loading. The entry is written to a
+    temporary directory and renamed into place so that concurrent writers and readers
+    never see a partial entry.
+    """
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=entry.parent, prefix='.tmp-'))
+    try:
+        columns = []
+        for i, name in enumerate(frame.columns):
+            values = frame[name].to_numpy()
+            if values.dtype == object:
+                codes, uniques = pd.factorize(values)
+                np.save(tmp / f'{i}.npy', codes.astype(np.int32))
+                columns.append({'name': name, 'uniques': uniques.tolist()})
+            else:
+                np.save(tmp / f'{i}.npy', values)
+                columns.append({'name': name})
+        metadata = {'version': _CACHE_FORMAT_VERSION, 'rows': len(frame), 'columns': columns}
+        with open(tmp / 'metadata.json', 'w') as f:
+            json.dump(metadata, f)
+        os.chmod(tmp, 0o755)    # mkdtemp makes the directory private
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # Another process cached the same bag first; keep its entry
+            if not entry.exists():
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _read_cache_entry(entry: Path) -> pd.DataFrame:
+    """
+    Loads a frame written by _write_cache_entry, memory mapping its columns.
+
+    Numeric columns are used directly without copying them into memory. They are mapped
+    copy-on-write, so the frame can be modified without changing the cache entry.
+
+    Raises ValueError if the entry is corrupted or in an old format.
+    """
+    try:
+        with open(entry / 'metadata.json') as f:
+            metadata = json.load(f)
+        if metadata['version'] != _CACHE_FORMAT_VERSION:
+            raise ValueError('cached bag has an old format')
+        data = {}
+        for i, column in enumerate(metadata['columns']):
+            values = np.load(entry / f'{i}.npy', mmap_mode='c')
+            if len(values) != metadata['rows']:
+                raise ValueError('cached bag is corrupted')
+            if 'uniques' in column:
+                uniques = np.array(column['uniques'] + [np.nan], dtype=object)
+                values = uniques[values]
             else:
-                entity_id = channel.topic.split('/')[2]
-                seconds = float(message.header.stamp.sec) + (
-                        message.header.stamp.nanosec / 1e9)
-                q = message.pose.orientation
-                R, P, Y = Rotation.from_quat([q.x, q.y, q.z, q.w]).as_euler("xyz")
-                data.append({
-                    'Timestamp': seconds,
-                    'Event': 'GT_POSITION',
-                    'EntityID': entity_id,
-                    'X': message.pose.position.x,
-                    'Y': message.pose.position.y,
-                    'Z': message.pose.position.z,
-                    'Roll': R,
-                    'Pitch': P,
-                    'Yaw': Y
-                })
-    return pd.DataFrame.from_dict(data)
\ No newline at end of file
+                values = values.view(np.ndarray)     # still backed by the mapping
+            data[column['name']] = values
+    except (OSError, KeyError, json.JSONDecodeError) as e:
+        raise ValueError('cached bag is corrupted') from e
+    return pd.DataFrame(data, index=pd.RangeIndex(metadata['rows']), copy=False)
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir())
+
+def evict_cache(cache_dir: Union[str, Path], max_size: int, keep: tuple = ()) -> None:
+    """
+    Removes least recently used entries until the cache is no larger than max_size bytes.
+
+    Entries listed in keep are never removed.
+    """
+    entries = []
+    for entry in Path(cache_dir).iterdir():
+        if not entry.is_dir() or entry.name.startswith('.'):    # temporary or memo
+            continue
+        try:
+            entries.append((entry.stat().st_mtime, _entry_size(entry), entry))
+        except OSError:
+            continue    # removed concurrently
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_size:
+            break
+        if entry.name in keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
+def bag_to_dataframe(bag_path: Union[str, Path], topics: list, entity_attribute_map: dict,
+                     use_cache: bool = True, write_cache: bool = True,
+                     cache_dir: Union[str, Path, None] = None,
+                     max_cache_size: int = DEFAULT_MAX_CACHE_SIZE) -> pd.DataFrame:
+    """
+    Extracts ROS bag (archive) into an intermediate format used by various metrics computation
+    classes in .metrics.
+
+    Decoded frames are cached on disk, keyed by the contents of the bag (or archive) together
+    with the topics and entity attributes, so that evaluating several claims against the same
+    bag only extracts and decodes it once. Cached frames are stored column by column and
+    loaded through memory mapping.
+
+    Args:
+        bag_path: Path to a .mcap bag or a .tgz archive containing one.
+        topics: Topics to extract.
+        entity_attribute_map: Class and color of each entity, keyed by entity ID.
+        use_cache: Whether to use a cached version of the decoded bag, if one exists.
+        write_cache: Whether to cache the decoded bag after decoding it.
+        cache_dir: Directory holding the cache (default: see default_cache_dir).
+        max_cache_size: Size in bytes above which least recently used entries are evicted.
+
+    Returns pandas.DataFrame object.
+    """
+    bag_path = Path(bag_path)
+    if not bag_path.exists():
+        raise BagFileDoesNotExistException
+    if not (use_cache or write_cache):
+        return _decode_bag(bag_path, topics, entity_attribute_map)
+
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    key = bag_digest(bag_path, topics, entity_attribute_map, cache_dir)
+    entry = Path(cache_dir) / key
+    if use_cache and entry.exists():
+        try:
+            frame = _read_cache_entry(entry)
+        except ValueError as e:
+            logger.warning(f"Ignoring cached bag {entry}: {e}")
+        else:
+            os.utime(entry)     # mark as recently used for eviction
+            return frame
+
+    frame = _decode_bag(bag_path, topics, entity_attribute_map)
+    if write_cache:
+        try:
+            if entry.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+            _write_cache_entry(entry, frame)
+            evict_cache(cache_dir, max_cache_size, keep=(key,))
+        except OSError as e:
+            logger.warning(f"Unable to cache decoded bag in {cache_dir}: {e}")
+    return frame
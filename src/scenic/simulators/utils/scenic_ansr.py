@@ -1,8 +1,12 @@
 # Copyright 2024 The Johns Hopkins University Applied Physics Laboratory LLC
 
 from scenic.core.regions import BoxRegion
-from scenic.core.object_types import Vector
+from scenic.core.object_types import Object, Vector
+from scipy.spatial import cKDTree
+from typing import Callable, Iterable, Optional, Union
 import math
+import numpy as np
+import shapely
 
 class Zone:
     def __init__(self, region:BoxRegion, no_earlier_than:float=-math.inf, no_later_than:float=math.inf)->None:
@@ -10,6 +14,123 @@ class Zone:
         self.no_earlier_than = no_earlier_than
         self.no_later_than = no_later_than
 
+class ZoneSet:
+    """
+    Collection of zones supporting fast point queries, e.g. `ego.position in keep_out_zones`.
+
+    Iterating over a ZoneSet yields its zones, so it can stand in for a list of zones.
+    Candidate zones for a point are found with an R-tree (shapely's STRtree) over the
+    bounding boxes of the zones, and the candidates are then tested in their own frames
+    with NumPy, so a query takes logarithmic time in the number of zones instead of one
+    trimesh query per zone. Zones whose region is not a BoxRegion are tested with
+    `containsPoint` after the bounding box test.
+    """
+    def __init__(self, zones:Iterable[Zone])->None:
+        self.zones:tuple = tuple(zones)
+        regions = [z.region for z in self.zones]
+        bounds = np.array([r.AABB for r in regions], dtype=float).reshape(-1, 3, 2)
+        self._lower, self._upper = bounds[:, :, 0], bounds[:, :, 1]
+        self._tree = shapely.STRtree(shapely.box(
+            self._lower[:, 0], self._lower[:, 1], self._upper[:, 0], self._upper[:, 1]
+        ))
+        self._is_box = np.array([isinstance(r, BoxRegion) for r in regions], dtype=bool)
+        frames = [_box_frame(r) for r in regions]
+        self._centers = np.array([f[0] for f in frames], dtype=float).reshape(-1, 3)
+        self._rotations = np.array([f[1] for f in frames], dtype=float).reshape(-1, 3, 3)
+        self._half_extents = np.array([f[2] for f in frames], dtype=float).reshape(-1, 3)
+        self._earliest = np.array([z.no_earlier_than for z in self.zones], dtype=float)
+        self._latest = np.array([z.no_later_than for z in self.zones], dtype=float)
+
+    def __len__(self)->int:
+        return len(self.zones)
+
+    def __iter__(self):
+        return iter(self.zones)
+
+    def __getitem__(self, index):
+        return self.zones[index]
+
+    def __contains__(self, thing)->bool:
+        if isinstance(thing, Object):
+            thing = thing.position
+        return self.containsPoint(thing)
+
+    def containsPoints(self, points, time:Optional[float]=None)->np.ndarray:
+        """
+        Returns a boolean array telling which of the given 2D or 3D points lie in some zone.
+        If time is given, only the zones active at that time are considered.
+        """
+        points = np.asarray(points, dtype=float)
+        points = points.reshape(-1, points.shape[-1] if points.ndim > 0 else 1)
+        if points.shape[1] == 2:
+            points = np.column_stack((points, np.zeros(len(points))))
+        inside = np.zeros(len(points), dtype=bool)
+        if len(self.zones) == 0 or len(points) == 0:
+            return inside
+        point_ids, zone_ids = self._tree.query(shapely.points(points[:, :2]))
+        z = points[point_ids, 2]
+        keep = (self._lower[zone_ids, 2] <= z) & (z <= self._upper[zone_ids, 2])
+        if time is not None:
+            keep &= (self._earliest[zone_ids] <= time) & (time <= self._latest[zone_ids])
+        point_ids, zone_ids = point_ids[keep], zone_ids[keep]
+
+        box = self._is_box[zone_ids]
+        box_points, box_zones = point_ids[box], zone_ids[box]
+        offsets = points[box_points] - self._centers[box_zones]
+        local = np.einsum("ni,nij->nj", offsets, self._rotations[box_zones])
+        in_box = np.all(np.abs(local) <= self._half_extents[box_zones], axis=1)
+        inside[box_points[in_box]] = True
+        for i, j in zip(point_ids[~box], zone_ids[~box]):
+            if not inside[i]:
+                inside[i] = self.zones[j].region.containsPoint(Vector(*points[i]))
+        return inside
+
+    def containsPoint(self, point, time:Optional[float]=None)->bool:
+        """
+        Tells whether a point lies in some zone (active at the given time, if any).
+        """
+        return bool(self.containsPoints([tuple(point)], time=time)[0])
+
+def _box_frame(region)->tuple:
+    """
+    Returns the center, rotation matrix and half extents (with tolerance) of a BoxRegion.
+    """
+    if not isinstance(region, BoxRegion):
+        return np.zeros(3), np.eye(3), np.zeros(3)
+    rotation = np.eye(3) if region.rotation is None else region.rotation.r.as_matrix()
+    half_extents = np.array(tuple(region.dimensions), dtype=float) / 2 + region.tolerance
+    return np.array(tuple(region.position), dtype=float), rotation, half_extents
+
+def match_reported_targets(targets_groundtruth, targets_reported:Iterable[Object],
+                           max_distance:Union[float, Callable[[Object], float]])->dict:
+    """
+    Matches each ground truth target to the nearest reported target with the same id
+    lying within max_distance of it, which may be a number or a function of the ground
+    truth target (e.g. `lambda p: 2*p.width`).
+
+    targets_groundtruth may be a list of objects or a dict whose values are objects.
+    Returns a dict mapping the id of each matched ground truth target to a pair
+    (report, distance). The reports are indexed with a KD-tree, so each target costs
+    a logarithmic-time query instead of a loop over all reports.
+    """
+    if isinstance(targets_groundtruth, dict):
+        targets_groundtruth = targets_groundtruth.values()
+    reports = list(targets_reported)
+    if not reports:
+        return {}
+    tree = cKDTree(np.array([tuple(q.position) for q in reports], dtype=float))
+    report_ids = [q.id for q in reports]
+    matches = {}
+    for p in targets_groundtruth:
+        radius = max_distance(p) if callable(max_distance) else max_distance
+        center = np.array(tuple(p.position), dtype=float)
+        candidates = [i for i in tree.query_ball_point(center, radius) if report_ids[i] == p.id]
+        if candidates:
+            distances = np.linalg.norm(tree.data[candidates] - center, axis=1)
+            best = int(np.argmin(distances))
+            matches[p.id] = (reports[candidates[best]], float(distances[best]))
+    return matches
+
 COLORS = {
     "white" : (248/255., 248/255., 248/255.),
     "black" : (50/255., 50/255., 50/255.),
@@ -0,0 +1,129 @@
+"""Streaming export of simulation frames to GIF or video files.
+
+Frames are handed to the encoder as soon as they are rendered, so the memory used
+does not grow with the length of the simulation. GIFs are encoded frame by frame
+with Pillow, using an adaptive palette computed from the first frame and shared by
+all later frames; other formats (e.g. MP4) use imageio's FFmpeg plugin if the
+``imageio-ffmpeg`` package is installed, and otherwise an ``ffmpeg`` executable
+found on the ``PATH``.
+"""
+
+from pathlib import Path
+import shutil
+import subprocess
+
+import numpy as np
+
+
+class VideoWriter:
+    """Writer streaming RGB frames to a GIF or video file.
+
+    Args:
+        path: Output file; its suffix selects the format.
+        fps (float): Frame rate of the output.
+
+    Frames are passed to `write` as arrays of shape (height, width, 3) with dtype
+    ``uint8``, and must all have the same size. Call `close` (or use the writer as a
+    context manager) to finish the file.
+    """
+
+    def __init__(self, path, fps):
+        self.path = Path(path)
+        self.fps = float(fps)
+        self.frameCount = 0
+        self._writer = None
+        self._ffmpeg = None
+        self._process = None
+        self._gif = None
+        self._gifPalette = None
+        if self.path.suffix.lower() == ".gif":
+            self._gif = open(self.path, "wb")
+            # GIF frame durations are in hundredths of a second
+            self._gifDuration = 10 * max(round(100 / self.fps), 2)
+            return
+        try:
+            import imageio_ffmpeg  # noqa: F401
+        except ModuleNotFoundError:
+            self._ffmpeg = shutil.which("ffmpeg")
+            if self._ffmpeg is None:
+                raise RuntimeError(
+                    f"cannot write {self.path.name}: "
+                    'exporting videos requires "imageio-ffmpeg" or ffmpeg'
+                ) from None
+        else:
+            import imageio.v2 as imageio
+
+            self._writer = imageio.get_writer(self.path, fps=self.fps, macro_block_size=1)
+
+    def write(self, frame):
+        """Append a frame to the output."""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self._gif is not None:
+            self._writeGIFFrame(frame)
+        elif self._writer is not None:
+            self._writer.append_data(frame)
+        else:
+            if self._process is None:
+                self._process = self._startFFmpeg(frame.shape[1], frame.shape[0])
+            self._process.stdin.write(frame.tobytes())
+        self.frameCount += 1
+
+    def _writeGIFFrame(self, frame):
+        from PIL import GifImagePlugin, Image
+
+        image = Image.fromarray(frame, "RGB")
+        if self._gifPalette is None:
+            image = image.quantize(256)
+            self._gifPalette = image
+        else:
+            image = image.quantize(palette=self._gifPalette, dither=Image.Dither.NONE)
+        if self.frameCount == 0:
+            header, _ = GifImagePlugin.getheader(image, info={"loop": 0})
+            self._gif.writelines(header)
+        data = GifImagePlugin.getdata(image, duration=self._gifDuration, disposal=1)
+        self._gif.writelines(data)
+
+    def _startFFmpeg(self, width, height):
+        command = [
+            self._ffmpeg,
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(self.fps),
+            "-i",
+            "-",
+            "-pix_fmt",
+            "yuv420p",
+            "-vf",
+            "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            str(self.path),
+        ]
+        return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def close(self):
+        """Finish writing the output file."""
+        if self._gif is not None:
+            self._gif.write(b";")  # GIF trailer
+            self._gif.close()
+            self._gif = None
+        elif self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self._process is not None:
+            self._process.stdin.close()
+            if self._process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to write {self.path}")
+            self._process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
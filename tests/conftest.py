@@ -51,6 +51,14 @@ def getAssetPath():
     return loader
 
 
+@pytest.fixture(autouse=True)
+def bagCacheDir(tmp_path, monkeypatch):
+    """Keep decoded replay bags out of the user's cache directory."""
+    path = tmp_path / "bag_cache"
+    monkeypatch.setenv("SCENIC_BAG_CACHE", str(path))
+    return path
+
+
 ## Command-line options
 
 
@@ -1,7 +1,9 @@
 import math
+import random
 import typing
 import warnings
 
+import numpy
 import numpy.linalg
 import pytest
 import scipy.stats
@@ -11,6 +13,9 @@ from scenic.core.distributions import (
     Normal,
     Options,
     Range,
+    RejectionException,
+    Samplable,
+    SamplingPlan,
     TruncatedNormal,
     distributionFunction,
     distributionMethod,
@@ -280,3 +285,102 @@ def test_attribute_distribution():
     assert all(val == "1" or val == "2" for val in vals)
     assert any(val == "1" for val in vals)
     assert any(val == "2" for val in vals)
+
+
+# Sampling plans
+
+
+def test_sampling_plan_matches_sampleAll():
+    x = Range(0, 1)
+    y = Options([x, Normal(x, 1), 5])
+    z = (x + y) * Range(1, 3)
+    quantities = (z, 4, y, x, Range(z, 10))
+    plan = SamplingPlan(quantities)
+    for seed in range(10):
+        random.seed(seed)
+        numpy.random.seed(seed)
+        expected = Samplable.sampleAll(quantities)
+        nextValue = random.random()
+        random.seed(seed)
+        numpy.random.seed(seed)
+        values = plan.sample()
+        assert [values[q] for q in quantities] == [expected[q] for q in quantities]
+        assert random.random() == nextValue
+
+
+def test_sampling_plan_conditioning():
+    x = Range(0, 1)
+    y = x + 1
+    plan = SamplingPlan((y,))
+    assert 1 <= plan.sample()[y] <= 2
+    x.conditionTo(Range(5, 6))
+    assert 6 <= plan.sample()[y] <= 7
+
+
+def test_sampling_plan_batches():
+    x = Range(0, 1)
+    n = DiscreteRange(1, 3)
+    y = Options([10, 20]) + x * n
+    z = TruncatedNormal(0, 1, -1, 1)
+    w = Normal(x, 1)
+    plan = SamplingPlan((y, z, w), batchSize=50)
+    for _ in range(100):
+        values = plan.sample()
+        assert type(values[n]) is int and 1 <= values[n] <= 3
+        assert type(values[x]) is float and 0 <= values[x] <= 1
+        assert values[y] - values[x] * values[n] in (10, 20)
+        assert -1 <= values[z] <= 1
+        assert type(values[w]) is float
+    assert plan.takeDiscarded() == 0
+
+
+def test_sampling_plan_batch_filters():
+    x = Range(0, 1)
+    y = x * 10
+    plan = SamplingPlan((y,), batchSize=100, filters=[lambda batch, size: batch[x] < 0.1])
+    ys = [plan.sample()[y] for _ in range(20)]
+    assert all(0 <= y < 1 for y in ys)
+    assert plan.takeDiscarded() > 20
+
+    plan = SamplingPlan((x,), batchSize=10, filters=[lambda batch, size: batch[x] > 2])
+    with pytest.raises(RejectionException):
+        plan.sample()
+    assert plan.takeDiscarded() == 9
+
+
+def test_sampling_plan_checks():
+    class Check:
+        def __init__(self, dependencies, predicate):
+            self.dependencies = dependencies
+            self.predicate = predicate
+            self.active = True
+            self.violationMsg = "violated"
+
+        def falsifiedBy(self, sample):
+            return not self.predicate(sample)
+
+    x = Range(0, 1)
+    y = Range(0, 1)
+    z = Range(0, 1) + y
+    w = Range(0, 1)
+    check = Check((x,), lambda sample: sample[x] < 0.5)
+    unscheduled = Check(None, lambda sample: False)
+    plan = SamplingPlan((z, x, w), checks=(unscheduled, check))
+    for _ in range(50):
+        try:
+            values = plan.sample()
+        except RejectionException as e:
+            assert str(e) == "violated"
+        else:
+            assert values[x] < 0.5
+            assert values[z] - values[y] <= 1
+    assert plan.checkCounts[check] == 50
+    assert 0 < plan.rejectionCounts[check] < 50
+    # Rejections skip sampling y, z (and the Range it contains), and w
+    assert plan.skippedSteps[check] == 4 * plan.rejectionCounts[check]
+    assert unscheduled not in plan.checkCounts
+
+    check.active = False
+    for _ in range(20):
+        plan.sample()
+    assert plan.checkCounts[check] == 50
@@ -0,0 +1,130 @@
+import math
+
+import numpy
+import pytest
+import shapely.geometry
+
+from scenic.core import geometry_cache
+from scenic.core.geometry_cache import GeometryCache
+from scenic.core.regions import (
+    BoxRegion,
+    EmptyRegion,
+    PolygonalFootprintRegion,
+    ViewRegion,
+    VoxelRegion,
+)
+from scenic.core.vectors import Vector
+
+
+@pytest.fixture
+def cache(tmp_path):
+    geometry_cache.configure(directory=tmp_path)
+    yield geometry_cache.geometryCache
+    geometry_cache.configure()
+
+
+def encode(value):
+    return {"value": numpy.array(value)}
+
+
+def decode(arrays):
+    return arrays["value"].tolist()
+
+
+def test_geometry_cache():
+    cache = GeometryCache(maxEntries=2)
+    computed = []
+
+    def get(x):
+        def compute():
+            computed.append(x)
+            return [x]
+
+        return cache.get(cache.key("test", x), compute, encode, decode)
+
+    assert get(1) == [1]
+    assert get(1.0) is get(1)
+    assert get(2) == [2]
+    assert get(3) == [3]
+    assert computed == [1, 2, 3]
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 3)
+    # Least recently used entries are evicted
+    get(1)
+    assert computed == [1, 2, 3, 1]
+    assert cache.key("test", 1) != cache.key("other", 1)
+
+
+def test_geometry_cache_directory(tmp_path):
+    first = GeometryCache(directory=tmp_path)
+    key = first.key("test", (1, 2))
+    assert first.get(key, lambda: [1, 2], encode, decode) == [1, 2]
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    # A new cache (e.g. in another process) loads the entry instead of computing it
+    second = GeometryCache(directory=tmp_path)
+    assert second.get(key, lambda: pytest.fail(), encode, decode) == [1, 2]
+    assert (second.diskHits, second.misses) == (1, 0)
+
+    # Corrupted entries are recomputed
+    next(tmp_path.glob("*.npz")).write_bytes(b"garbage")
+    third = GeometryCache(directory=tmp_path)
+    with pytest.warns(UserWarning, match="corrupted"):
+        assert third.get(key, lambda: [3], encode, decode) == [3]
+    assert GeometryCache(directory=tmp_path).get(key, None, encode, decode) == [3]
+
+    # Old entries are removed once the directory is too large
+    small = GeometryCache(directory=tmp_path, maxDiskSize=1)
+    small.get(small.key("test", 2), lambda: [2], encode, decode)
+    assert [path.stem for path in tmp_path.glob("*.npz")] == [small.key("test", 2)]
+
+
+def test_cached_view_regions(cache):
+    angles = (math.radians(90), math.radians(60))
+    region = ViewRegion(50, angles, position=Vector(1, 2, 3))
+    other = ViewRegion(50, angles, position=Vector(-5, 0, 0))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert numpy.allclose(
+        region.mesh.vertices - (1, 2, 3), other.mesh.vertices + (5, 0, 0)
+    )
+    assert region.containsPoint((1, 40, 3))
+    assert not region.containsPoint((1, -40, 3))
+
+    # Meshes loaded from the directory give the same regions
+    geometry_cache.configure(directory=cache.directory)
+    loaded = ViewRegion(50, angles, position=Vector(1, 2, 3))
+    assert cache.diskHits == 1
+    assert numpy.array_equal(loaded.mesh.vertices, region.mesh.vertices)
+    assert numpy.array_equal(loaded.mesh.faces, region.mesh.faces)
+    assert loaded.mesh.is_volume
+
+
+def test_cached_voxel_overapproximations(cache):
+    box = BoxRegion(dimensions=(4, 4, 4))
+    eroded = box._erodeOverapproximate(1, 0.05)
+    assert isinstance(eroded, VoxelRegion)
+    assert box._erodeOverapproximate(1, 0.05) is eroded
+    assert BoxRegion(dimensions=(4, 4, 4))._erodeOverapproximate(1, 0.05) is eroded
+    assert isinstance(box._erodeOverapproximate(5, 0.05), EmptyRegion)
+    buffered = box._bufferOverapproximate(1, 0.1)
+    assert isinstance(buffered, VoxelRegion)
+    assert isinstance(box._bufferOverapproximate(1, 1), BoxRegion)
+    assert cache.misses == 3
+
+    geometry_cache.configure(directory=cache.directory)
+    loaded = box._erodeOverapproximate(1, 0.05)
+    assert numpy.array_equal(loaded.voxel_points, eroded.voxel_points)
+    assert isinstance(box._erodeOverapproximate(5, 0.05), EmptyRegion)
+    assert cache.diskHits == 2
+
+
+def test_cached_bound_footprint(cache):
+    footprint = PolygonalFootprintRegion(shapely.geometry.box(0, 0, 2, 1))
+    bounded = footprint.boundFootprint(centerZ=1, height=4)
+    again = PolygonalFootprintRegion(shapely.geometry.box(0, 0, 2, 1))
+    assert again.boundFootprint(centerZ=1, height=4).mesh.bounds.tolist() == [
+        [0, 0, -1],
+        [2, 1, 3],
+    ]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert bounded.mesh is not again.boundFootprint(centerZ=1, height=4).mesh
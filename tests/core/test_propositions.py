@@ -0,0 +1,87 @@
+import random
+
+import pytest
+import rv_ltl
+
+from scenic.core.propositions import (
+    Always,
+    And,
+    Atomic,
+    Eventually,
+    Implies,
+    Next,
+    Not,
+    Or,
+    Until,
+)
+
+
+class Trace:
+    """Atomic propositions reading their values from a shared trace."""
+
+    def __init__(self, values):
+        self.values = values
+        self.step = 0
+        self.evaluations = 0
+
+    def atomic(self, index):
+        def closure():
+            self.evaluations += 1
+            return self.values[self.step][index]
+
+        return Atomic(closure, syntax_id=index)
+
+
+def formulas(trace):
+    a, b, c = (trace.atomic(i) for i in range(3))
+    return [
+        Always(a),
+        Eventually(And([a, b])),
+        And([Always(a), Eventually(b)]),
+        Or([Always(Not(a)), c]),
+        Implies(b, Always(Or([a, c]))),
+        Not(And([Eventually(a), Always(Implies(b, c))])),
+        Always(Implies(a, Next(b))),
+        Until(a, b),
+        Or([Until(a, b), And([c, Always(b)])]),
+    ]
+
+
+@pytest.mark.parametrize("index", range(9))
+def test_monitor_matches_rv_ltl(index):
+    rand = random.Random(index)
+    for _ in range(50):
+        length = rand.randint(1, 8)
+        values = [[rand.random() < 0.7 for _ in range(3)] for _ in range(length)]
+        trace = Trace(values)
+        formula = formulas(trace)[index]
+        monitor = formula.create_monitor()
+        reference = formula.ltl_node.create_monitor()
+        for step, state in enumerate(values):
+            trace.step = step
+            reference.update({str(i): v for i, v in enumerate(state)})
+            assert monitor.update() == reference.evaluate()
+
+
+def test_monitor_short_circuit():
+    trace = Trace([[True, False, False]] * 3 + [[False, True, False]] * 3)
+    a, b = trace.atomic(0), trace.atomic(1)
+    monitor = And([Always(a), Eventually(b)]).create_monitor()
+    verdicts = []
+    for step in range(6):
+        trace.step = step
+        verdicts.append(monitor.update())
+    assert verdicts == [rv_ltl.B4.PRESUMABLY_FALSE] * 3 + [rv_ltl.B4.FALSE] * 3
+    # Both atomics are evaluated until the verdict becomes final at step 3
+    assert trace.evaluations == 8
+
+
+def test_monitor_partial_short_circuit():
+    trace = Trace([[True, True, False]] * 4)
+    a, b = trace.atomic(0), trace.atomic(1)
+    monitor = And([Always(a), Eventually(b)]).create_monitor()
+    for step in range(4):
+        trace.step = step
+        assert monitor.update() == rv_ltl.B4.PRESUMABLY_TRUE
+    # "eventually b" is true after the first step, so b is not evaluated again
+    assert trace.evaluations == 4 + 1
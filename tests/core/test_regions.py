@@ -1,6 +1,8 @@
+import itertools
 import math
 from pathlib import Path
 
+import numpy
 import pytest
 import shapely.geometry
 import trimesh.voxel
@@ -267,6 +269,21 @@ def test_polygon_sampling():
     assert sum(y >= 1.5 for y in ys) >= 1250
 
 
+def test_polygon_uniform_points():
+    p = shapely.geometry.Polygon(
+        [(0, 0), (0, 3), (3, 3), (3, 0)], holes=[[(1, 1), (1, 2), (2, 2), (2, 1)]]
+    )
+    r = PolygonalRegion(polygon=p, z=2)
+    pts = r.uniformPoints(3000)
+    assert pts.shape == (3000, 3)
+    assert r.containsPoints(pts).all()
+    assert numpy.all(pts[:, 2] == 2)
+    xs, ys = pts[:, 0], pts[:, 1]
+    assert numpy.sum((1 <= xs) & (xs <= 2)) <= 870
+    assert numpy.sum(xs >= 1.5) >= 1250
+    assert numpy.sum(ys >= 1.5) >= 1250
+
+
 def test_polygon_trueContainsPoint():
     r = CircularRegion((0, 0), 1, resolution=64)
 
@@ -320,6 +337,30 @@ def test_mesh_volume_region_sampling():
         assert -1 <= z <= 1
 
 
+def test_mesh_volume_region_uniform_points():
+    r = BoxRegion(position=(1, 0, 0), dimensions=(2, 4, 2))
+    pts = r.uniformPoints(2000)
+    assert pts.shape == (2000, 3)
+    assert numpy.all(pts.min(axis=0) >= (0, -2, -1))
+    assert numpy.all(pts.max(axis=0) <= (2, 2, 1))
+    assert 0.4 < numpy.mean(pts[:, 1] > 0) < 0.6
+    assert r.uniformPoints(0).shape == (0, 3)
+
+    # Nonconvex mesh: the inner half of the annulus has 5/12 of its volume
+    annulus = trimesh.creation.annulus(r_min=1, r_max=2, height=1)
+    r = MeshVolumeRegion(annulus, centerMesh=False)
+    pts = r.uniformPoints(3000)
+    assert r.containsPoints(pts).all()
+    radii = numpy.hypot(pts[:, 0], pts[:, 1])
+    assert 0.37 < numpy.mean(radii < 1.5) < 0.47
+
+    # Regions with the same mesh share the decomposition into tetrahedra
+    other = MeshVolumeRegion(annulus.copy(), centerMesh=False)
+    assert other._tetrahedra is r._tetrahedra
+    assert r._tetrahedra.negativeInverses is not None
+    assert BoxRegion()._tetrahedra.negativeInverses is None
+
+
 def test_mesh_surface_region_sampling():
     r = BoxRegion(position=(0, 0, 0), dimensions=(2, 2, 2)).getSurfaceRegion()
     pts = [r.uniformPointInner() for _ in range(100)]
@@ -819,6 +860,37 @@ def test_region_combinations(A, B):
     assert isinstance(difference_out, Region)
 
 
+@pytest.mark.parametrize("region", REGIONS.values(), ids=lambda r: type(r).__name__)
+def test_region_point_arrays(region):
+    points = numpy.random.default_rng(0).uniform(-1, 8, (100, 3))
+    points[::2, 2] = 0
+    if not isinstance(region, PolygonalFootprintRegion):
+        samples = sample_ignoring_rejections(region, 20)
+        points = numpy.vstack([points] + samples)
+    expected = [region.containsPoint(Vector(*point)) for point in points]
+    assert list(region.containsPoints(points)) == expected
+    distances = region.distancesTo(points)
+    assert distances == pytest.approx([region.distanceTo(point) for point in points])
+    assert region.containsPoints(numpy.zeros((0, 3))).shape == (0,)
+    assert region.distancesTo([(1, 2)]) == pytest.approx([region.distanceTo((1, 2))])
+
+
+def test_combined_region_point_arrays():
+    circle = CircularRegion(Vector(1, 1), 1)
+    poly = PolygonalRegion([(0, 0), (2, 0), (2, 2), (0, 1)])
+    points = numpy.random.default_rng(0).uniform(-2, 3, (100, 2))
+    for region in (
+        circle.intersect(poly),
+        UnionRegion(poly, CircularRegion(Vector(-1, -1), 1)),
+        poly.difference(CircularRegion(Vector(1, 1), 0.5)),
+        GridRegion("grid", [[0, 1, 0], [1, 0, 0]], 1, 1, -1, -1),
+        everywhere,
+        nowhere,
+    ):
+        expected = [region.containsPoint(Vector(*point)) for point in points]
+        assert list(region.containsPoints(points)) == expected
+
+
 ## Deprecation Tests
 @deprecationTest("3.3.0")
 def test_polygons_points():
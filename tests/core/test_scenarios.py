@@ -1,6 +1,16 @@
+import asyncio
+import csv
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import time
+
 import pytest
 
-from scenic.core.distributions import Range
+from scenic.core.distributions import Range, RejectionException
+from scenic.core.sample_checking import WeightedAcceptanceChecker
 from tests.utils import compileScenic
 
 
@@ -59,3 +69,461 @@ def test_condition_scenario_params_2():
     assert all(0.5 <= x <= 0.51 for x in xs)
     assert any(0.505 <= x for x in xs)
     assert any(x < 0.505 for x in xs)
+
+
+## Parallel scene generation
+
+batchCode = """
+    param p = Range(0, 1)
+    ego = new Object at Range(0, 10) @ 0
+    require ego.position.x > 3
+"""
+
+
+def test_generate_batch_parallel():
+    scenario = compileScenic(batchCode)
+    random.seed(42)
+    scenes, iterations = scenario.generateBatch(6, workers=3)
+    assert len(scenes) == 6
+    assert iterations >= 6
+    assert all(scene.egoObject.position.x > 3 for scene in scenes)
+    ps = [scene.params["p"] for scene in scenes]
+    assert len(set(ps)) == 6
+
+    # Scenes depend on the master seed but not on the number of workers
+    random.seed(42)
+    scenes2, iterations2 = scenario.generateBatch(6, workers=2)
+    assert [scene.params["p"] for scene in scenes2] == ps
+    assert iterations2 == iterations
+    random.seed(43)
+    scenes3, _ = scenario.generateBatch(6, workers=3)
+    assert [scene.params["p"] for scene in scenes3] != ps
+
+
+def test_generate_batch_parallel_budget():
+    scenario = compileScenic(
+        """
+        ego = new Object at Range(0, 10) @ 0
+        require ego.position.x > 9.99
+    """
+    )
+    with pytest.raises(RejectionException, match="in 20 iterations"):
+        scenario.generateBatch(4, maxIterations=20, workers=2)
+
+
+def test_iter_scenes():
+    scenario = compileScenic(batchCode)
+    scenes = list(itertools.islice(scenario.iterScenes(), 5))
+    assert len(scenes) == 5
+    assert all(scene.egoObject.position.x > 3 for scene, _ in scenes)
+    assert all(iterations >= 1 for _, iterations in scenes)
+    assert len(list(scenario.iterScenes(3))) == 3
+
+
+def test_iter_scenes_parallel():
+    scenario = compileScenic(batchCode)
+    random.seed(42)
+    batch, _ = scenario.generateBatch(6, workers=2)
+
+    # Streaming yields the same scenes as a batch, in the same order
+    random.seed(42)
+    stream = scenario.iterScenes(workers=2, prefetch=1)
+    scenes = [scene for scene, _ in itertools.islice(stream, 4)]
+    stream.close()
+    assert [s.params["p"] for s in scenes] == [s.params["p"] for s in batch[:4]]
+
+
+def test_iter_scenes_async():
+    scenario = compileScenic(batchCode)
+
+    async def collect(workers):
+        random.seed(42)
+        stream = scenario.iterScenesAsync(4, workers=workers)
+        return [scene.params["p"] async for scene, _ in stream]
+
+    random.seed(42)
+    batch, _ = scenario.generateBatch(4, workers=2)
+    assert asyncio.run(collect(2)) == [s.params["p"] for s in batch]
+    assert len(asyncio.run(collect(None))) == 4
+
+
+def test_iter_scenes_close():
+    # Closing a stream does not wait for scenes which can never be sampled
+    scenario = compileScenic(
+        """
+        ego = new Object at Range(0, 10) @ 0
+        require ego.position.x > 20
+    """
+    )
+
+    async def close():
+        stream = scenario.iterScenesAsync(workers=2)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(stream.__anext__(), 0.5)
+        await stream.aclose()
+
+    start = time.monotonic()
+    asyncio.run(close())
+    assert time.monotonic() - start < 5
+
+    # The workers stop too
+    while multiprocessing.active_children():
+        assert time.monotonic() - start < 10
+        time.sleep(0.05)
+
+
+## Batched sampling
+
+
+def test_batch_sampling():
+    scenario = compileScenic(
+        """
+        x = Range(0, 100)
+        y = Range(0, 100)
+        ego = new Object at x @ y
+        require x + y > 190
+        require abs(x - y) < 5
+    """
+    )
+    scenario.setSamplingBatchSize(1000)
+    scenes, iterations = scenario.generateBatch(10)
+    for scene in scenes:
+        x, y, _ = scene.egoObject.position
+        assert x + y > 190 and abs(x - y) < 5
+    # Candidates rejected in bulk still count as iterations
+    assert iterations >= 1000
+
+
+def test_batch_sampling_fallback():
+    # Requirements which cannot be checked on batches are checked as usual
+    scenario = compileScenic(
+        """
+        import math
+        x = Range(0, 10)
+        ego = new Object at x @ 0
+        require math.sin(x) > 0.9
+        require ego.position.x > 1
+    """
+    )
+    scenario.setSamplingBatchSize(100)
+    scenes, _ = scenario.generateBatch(10, maxIterations=10000)
+    for scene in scenes:
+        assert math.sin(scene.egoObject.position.x) > 0.9
+
+
+def test_batch_sampling_budget():
+    scenario = compileScenic(
+        """
+        x = Range(0, 1)
+        ego = new Object at x @ 0
+        require x > 2
+    """
+    )
+    scenario.setSamplingBatchSize(100)
+    with pytest.raises(RejectionException):
+        scenario.generate(maxIterations=500)
+
+
+@pytest.mark.parametrize("batchSize", (None, 50))
+def test_batch_sampling_division(batchSize):
+    # Division by zero raises the same errors with and without batches
+    for code, message in (
+        ("param y = 6 // x", "integer division or modulo by zero"),
+        ("param y = 6 % x", "integer modulo by zero"),
+        ("param y = 6 / x", "division by zero"),
+        ("param y = x / (x - x)", "division by zero"),
+    ):
+        scenario = compileScenic(f"x = DiscreteRange(0, 3)\n{code}\nego = new Object")
+        scenario.setSamplingBatchSize(batchSize)
+        with pytest.raises(ZeroDivisionError, match=message):
+            scenario.generateBatch(50)
+
+    scenario = compileScenic(
+        """
+        x = DiscreteRange(1, 3)
+        param y = 6 // x
+        param z = 6 / x
+        ego = new Object
+    """
+    )
+    scenario.setSamplingBatchSize(batchSize)
+    scenes, _ = scenario.generateBatch(10)
+    for scene in scenes:
+        assert scene.params["y"] in (6, 3, 2)
+        assert scene.params["z"] in (6, 3, 2)
+
+
+## Partial resampling
+
+partialCode = """
+    x = Range(0, 1)
+    y = Range(0, 1)
+    ego = new Object
+    new Object at (x * 10) @ 5, with allowCollisions True
+    new Object at 5 @ (y * 10), with allowCollisions True
+    require x > 0.9
+    require y < 0.5
+    param x = x
+    param y = y
+"""
+
+
+def test_partial_resampling():
+    scenario = compileScenic(partialCode)
+    random.seed(0)
+    _, fullIterations = scenario.generateBatch(50)
+    scenario.setPartialResampling()
+    random.seed(0)
+    scenes, partialIterations = scenario.generateBatch(300)
+    assert partialIterations / 300 < fullIterations / 50
+
+    # The independent values have the same distributions as with full resampling
+    stats = pytest.importorskip("scipy.stats")
+    xs = [(scene.params["x"] - 0.9) / 0.1 for scene in scenes]
+    ys = [scene.params["y"] / 0.5 for scene in scenes]
+    assert all(0 <= v <= 1 for v in xs + ys)
+    assert stats.kstest(xs, "uniform").pvalue > 0.001
+    assert stats.kstest(ys, "uniform").pvalue > 0.001
+    assert abs(stats.pearsonr(xs, ys)[0]) < 0.25
+
+
+def test_partial_resampling_connected():
+    scenario = compileScenic(
+        """
+        x = Range(0, 1)
+        y = Range(0, 1)
+        ego = new Object at (x * 10) @ (y * 10)
+        require x + y > 1.5
+    """
+    )
+    scenario.setPartialResampling()
+    scenes, _ = scenario.generateBatch(20)
+    for scene in scenes:
+        x, y, _ = scene.egoObject.position
+        assert x + y > 15
+
+
+def test_partial_resampling_optional():
+    scenario = compileScenic(
+        """
+        x = Range(0, 1)
+        y = Range(0, 1)
+        ego = new Object
+        new Object at (x * 10) @ 5
+        new Object at 5 @ (y * 10 + 20)
+        require[0.5] x > 0.5
+        require y < 0.5
+        param y = y
+    """
+    )
+    scenario.setPartialResampling()
+    scenes, _ = scenario.generateBatch(20)
+    assert all(scene.params["y"] < 0.5 for scene in scenes)
+    scenario.setPartialResampling(False)
+    scene, _ = scenario.generate()
+    assert scene.params["y"] < 0.5
+
+
+## Early rejection
+
+
+def test_early_rejection():
+    scenario = compileScenic(
+        """
+        x = Range(0, 1)
+        ego = new Object
+        other = new Object at (Range(5, 10) @ 0), with requireVisible True
+        require x > 0.9
+        param x = x
+    """
+    )
+    scenario.setEarlyRejection()
+    scenes, iterations = scenario.generateBatch(10)
+    assert all(scene.params["x"] > 0.9 for scene in scenes)
+    stats = scenario.earlyRejectionStatistics()
+    (req,) = scenario.userRequirements
+    assert stats[req]["checked"] == iterations
+    assert stats[req]["rejected"] == iterations - 10
+    # The other object is not sampled when the requirement rejects a sample
+    assert stats[req]["skipped"] >= stats[req]["rejected"]
+
+    scenario.setEarlyRejection(False)
+    scene, _ = scenario.generate()
+    assert scene.params["x"] > 0.9
+    assert scenario.earlyRejectionStatistics() == {}
+
+
+def test_early_rejection_partial_resampling():
+    scenario = compileScenic(partialCode)
+    scenario.setEarlyRejection()
+    scenario.setPartialResampling()
+    scenes, _ = scenario.generateBatch(10)
+    assert all(scene.params["x"] > 0.9 for scene in scenes)
+    assert all(scene.params["y"] < 0.5 for scene in scenes)
+    stats = scenario.earlyRejectionStatistics()
+    assert sum(reqStats["rejected"] for reqStats in stats.values()) > 0
+
+
+## Sample checker statistics
+
+checkerCode = """
+    x = Range(0, 1)
+    ego = new Object at (x * 10) @ 0
+    new Object at 10 @ 0
+    require x > 0.2
+    require x < 0.8
+"""
+
+
+def test_checker_statistics(tmpdir):
+    path = tmpdir / "stats.json"
+    scenario = compileScenic(checkerCode)
+    scenario.generateBatch(20)
+    scenario.saveCheckerStatistics(path)
+    exported = scenario.checker.exportStatistics()
+    assert set(exported) == {
+        "line 4",
+        "line 5",
+        "IntersectionRequirement",
+        "BlanketCollisionRequirement",
+    }
+
+    # A new checker for the same scenario starts with the same order
+    scenario2 = compileScenic(checkerCode)
+    assert scenario2.loadCheckerStatistics(path)
+    assert scenario2.checker.exportStatistics() == exported
+    assert [
+        scenario2.checker.requirementKeys()[req]
+        for req in scenario2.checker.sortedRequirements()
+    ] == [
+        scenario.checker.requirementKeys()[req]
+        for req in scenario.checker.sortedRequirements()
+    ]
+
+    # Statistics for another scenario are ignored
+    scenario3 = compileScenic(checkerCode + "\n    require x != 0.5")
+    assert not scenario3.loadCheckerStatistics(path)
+
+
+def test_checker_statistics_parallel():
+    scenario = compileScenic(checkerCode)
+    before = scenario.checker.exportStatistics()
+    scenario.generateBatch(6, workers=2)
+    exported = scenario.checker.exportStatistics()
+    # What the workers learned is merged into the checker of this process
+    assert exported["line 4"] != before["line 4"]
+    assert any(acc or seconds for acc, seconds in exported["line 4"])
+
+
+def test_checker_merge_statistics():
+    checker, other = (WeightedAcceptanceChecker(bufferSize=10) for _ in range(2))
+    compileScenic(checkerCode).setSampleChecker(checker)
+    compileScenic(checkerCode).setSampleChecker(other)
+    other.importStatistics({"line 4": [[1, 0.5]] * 10})
+    other.resetRequirementStatistics()
+    assert other.exportStatistics(recent=True)["line 4"] == []
+    (req,) = [r for r, key in other.requirementKeys().items() if key == "line 4"]
+    other.updateMetrics(req, (0, 2))
+    recent = other.exportStatistics(recent=True)
+    assert recent["line 4"] == [[0, 2]]
+    checker.mergeStatistics(recent)
+    assert checker.exportStatistics()["line 4"] == [[0, 0]] * 9 + [[0, 2]]
+
+
+def test_checker_cost_per_rejection():
+    scenario = compileScenic(checkerCode)
+    checker = WeightedAcceptanceChecker(bufferSize=4, sortBy="costPerRejection")
+    scenario.setSampleChecker(checker)
+    first, second = scenario.userRequirements
+    checker.importStatistics(
+        {
+            # rejects half of the samples in 1s each: 2s per rejection
+            "line 4": [[1, 1], [0, 1], [1, 1], [0, 1]],
+            # rejects all samples in 3s each: 3s per rejection
+            "line 5": [[0, 3]] * 4,
+            # never rejects
+            "IntersectionRequirement": [[1, 0.1]] * 4,
+        }
+    )
+    # The optional collision requirement has no statistics, so is explored first
+    assert checker.sortedRequirements()[1:3] == [first, second]
+    (intersection,) = [
+        req
+        for req in scenario.defaultRequirements
+        if type(req).__name__ == "IntersectionRequirement"
+    ]
+    assert checker.getExpectedCostPerRejection(intersection) == math.inf
+    scenes, _ = scenario.generateBatch(5)
+    assert all(2 <= scene.egoObject.position.x <= 8 for scene in scenes)
+
+    with pytest.raises(ValueError):
+        WeightedAcceptanceChecker(sortBy="fastest")
+
+
+## Sampling statistics
+
+
+def test_sampling_statistics(tmpdir):
+    scenario = compileScenic(checkerCode)
+    scenes, iterations = scenario.generateBatch(10)
+    stats = scenario.samplingStatistics()
+    assert stats["scenes"] == 10
+    assert stats["iterations"] == iterations
+    assert stats["samplingRejections"] == 0
+    assert all(seconds > 0 for seconds in stats["time"].values())
+    requirements = stats["requirements"]
+    # The optional collision requirement also rejects samples where the objects overlap
+    rejections = sum(reqStats["rejected"] for reqStats in requirements.values())
+    assert rejections == iterations - 10
+    assert all(
+        reqStats["checked"] >= reqStats["rejected"] for reqStats in requirements.values()
+    )
+
+    # Failed calls to generate are counted too
+    with pytest.raises(RejectionException):
+        scenario.generate(maxIterations=0)
+    assert scenario.samplingStatistics()["scenes"] == 10
+
+    path = tmpdir / "stats.csv"
+    scenario.saveSamplingStatistics(path)
+    with open(path) as inFile:
+        rows = {row["requirement"]: row for row in csv.DictReader(inFile)}
+    assert set(rows) == set(requirements)
+    assert int(rows["line 4"]["checked"]) == requirements["line 4"]["checked"]
+
+    path = tmpdir / "stats.json"
+    scenario.saveSamplingStatistics(path)
+    with open(path) as inFile:
+        assert json.load(inFile) == scenario.samplingStatistics()
+
+    scenario.resetSamplingStatistics()
+    stats = scenario.samplingStatistics()
+    assert stats["scenes"] == stats["iterations"] == 0
+    assert all(reqStats["checked"] == 0 for reqStats in stats["requirements"].values())
+
+
+def test_sampling_statistics_parallel():
+    scenario = compileScenic(checkerCode)
+    scenario.setEarlyRejection()
+    scenes, iterations = scenario.generateBatch(6, workers=2)
+    stats = scenario.samplingStatistics()
+    assert stats["scenes"] == 6
+    assert stats["iterations"] == iterations
+    assert stats["samplingRejections"] == iterations - 6
+    assert stats["time"]["sampling"] > 0
+    assert stats["requirements"]["line 4"]["earlyChecked"] == iterations
+
+
+def test_sampling_statistics_early_rejection():
+    scenario = compileScenic(checkerCode)
+    scenario.setEarlyRejection()
+    scenes, iterations = scenario.generateBatch(10)
+    stats = scenario.samplingStatistics()
+    assert stats["samplingRejections"] == iterations - 10
+    early = stats["requirements"]["line 4"]
+    assert early["earlyChecked"] == iterations
+    assert early["earlyRejected"] + stats["requirements"]["line 5"]["earlyRejected"] == (
+        iterations - 10
+    )
+    # Samples violating requirements checked early never reach the sample checker
+    assert early["rejected"] == 0
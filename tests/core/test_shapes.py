@@ -1,9 +1,14 @@
 import math
 from pathlib import Path
 
+import fcl
+import numpy
 import pytest
+import trimesh
 
-from scenic.core.shapes import BoxShape, MeshShape
+from scenic.core.regions import MeshVolumeRegion
+from scenic.core.shapes import MAX_CACHED_SCALES, BoxShape, MeshShape
+from scenic.core.vectors import Orientation
 
 
 def test_shape_fromFile(getAssetPath):
@@ -21,3 +26,54 @@ def test_invalid_dimension(badDim):
             BoxShape(dimensions=dims)
     with pytest.raises(ValueError):
         BoxShape(scale=badDim)
+
+
+def test_scaled_geometry(getAssetPath):
+    shape = MeshShape.fromFile(getAssetPath("meshes/classic_plane.obj.bz2"))
+    geometry = shape._scaledGeometry((2, 3, 1))
+    assert shape._scaledGeometry([2, 3, 1]) is geometry
+    assert shape._scaledGeometry((2, 3, 2)) is not geometry
+    assert numpy.allclose(geometry.mesh.extents, (2, 3, 1))
+
+    # Queries on the shared geometry match queries on a transformed copy
+    region = MeshVolumeRegion(
+        shape.mesh,
+        dimensions=(2, 3, 1),
+        position=(1, 2, 3),
+        rotation=Orientation.fromEuler(0.5, 0.2, -0.3),
+        centerMesh=False,
+    )
+    rotation = region.rotation.r.as_matrix()
+    origins = numpy.array([[-5, 2, 3], [1, -5, 3], [1, 2, 10], [10, 10, 10]])
+    directions = numpy.array([[1, 0, 0], [0, 1, 0], [0, 0, -1], [1, 0, 0]])
+    locations, rays = geometry.intersectRays(rotation, (1, 2, 3), origins, directions)
+    expected, expectedRays, _ = region.mesh.ray.intersects_location(origins, directions)
+    assert set(rays) == set(expectedRays) == {0, 1, 2}
+    # Sort on rounded coordinates, since hits may differ by rounding errors
+    order = numpy.lexsort(numpy.round(locations, 6).T)
+    expectedOrder = numpy.lexsort(numpy.round(expected, 6).T)
+    assert numpy.allclose(locations[order], expected[expectedOrder])
+
+    points = numpy.array([[1, 2, 3], [1, 2, 5], [3, 0, 3]])
+    distances = geometry.signedDistances(rotation, (1, 2, 3), points)
+    expected = trimesh.proximity.ProximityQuery(region.mesh).signed_distance(points)
+    assert numpy.allclose(distances, expected)
+
+    box = BoxShape()._scaledGeometry((1, 1, 1))
+    for offset, collides in ((1.5, True), (4, False)):
+        other = box.collisionObject(numpy.eye(3), (1 + offset, 2, 3))
+        result = fcl.collide(
+            geometry.collisionObject(rotation, (1, 2, 3)),
+            other,
+            fcl.CollisionRequest(),
+            fcl.CollisionResult(),
+        )
+        assert bool(result) == collides
+
+
+def test_scaled_geometry_cache_limit():
+    shape = BoxShape()
+    first = shape._scaledGeometry((1, 1, 1))
+    for i in range(MAX_CACHED_SCALES):
+        shape._scaledGeometry((1, 1, 2 + i))
+    assert shape._scaledGeometry((1, 1, 1)) is not first
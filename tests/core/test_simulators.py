@@ -1,6 +1,11 @@
 import pytest
 
-from scenic.core.simulators import DummySimulation, DummySimulator, Simulation
+from scenic.core.simulators import (
+    DummySimulation,
+    DummySimulator,
+    Simulation,
+    TerminationType,
+)
 from tests.utils import compileScenic, sampleResultFromScene, sampleSceneFrom
 
 
@@ -94,3 +99,50 @@ def test_simulator_bad_scheduler():
     simulator = TestSimulator()
     with pytest.raises(RuntimeError):
         result = simulator.simulate(scene, maxSteps=2)
+
+
+def test_simulator_continue_after_violations():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object at (0, 0)
+        require always ego.position.y < 1.5 as early
+        require always ego.position.y < 2.5 as late
+        require eventually ego.position.y > 10 as never
+        require always ego.position.y < 10 as ok
+        """
+    )
+    simulator = DummySimulator(drift=1)
+    assert simulator.simulate(scene, maxSteps=4) is None
+    simulation = simulator.simulate(scene, maxSteps=4, continueAfterViolations=True)
+    assert simulation is not None
+    assert simulation.currentTime == 4
+    violations = simulation.result.requirementViolations
+    assert violations == {"early": 2, "late": 3, "never": 4}
+
+
+@pytest.mark.parametrize(
+    "requirements, steps",
+    (
+        ("require eventually ego.position.y > 2.5", 3),
+        ("require always ego.position.y < 20", 5),
+        ("require eventually ego.position.y > 2.5\nrecord ego.position.y", 5),
+        (
+            "require eventually ego.position.y > 2.5\nrequire always ego.position.y < 1.5",
+            3,
+        ),
+    ),
+)
+def test_simulator_terminate_when_requirements_decided(requirements, steps):
+    scene = sampleSceneFrom(f"ego = new Object at (0, 0)\n{requirements}")
+    simulator = DummySimulator(drift=1)
+    simulation = simulator.simulate(
+        scene,
+        maxSteps=5,
+        continueAfterViolations=True,
+        terminateWhenRequirementsDecided=True,
+    )
+    assert simulation.currentTime == steps
+    expectedType = (
+        TerminationType.requirementsDecided if steps < 5 else TerminationType.timeLimit
+    )
+    assert simulation.result.terminationType is expectedType
@@ -1,10 +1,11 @@
+import math
 from pathlib import Path
 
 import numpy
 import pytest
 import trimesh
 
-from scenic.core.utils import repairMesh, unifyMesh
+from scenic.core.utils import AliasTable, repairMesh, unifyMesh
 
 
 @pytest.mark.slow
@@ -60,3 +61,22 @@ def test_unify_mesh():
     fixed_mesh = unifyMesh(bad_mesh)
     assert fixed_mesh.is_volume
     assert fixed_mesh.body_count == 3
+
+
+def test_alias_table():
+    weights = [1, 0, 3, 4]
+    table = AliasTable(weights)
+    assert len(table) == 4
+    samples = table.sample(20000)
+    assert samples.shape == (20000,)
+    frequencies = numpy.bincount(samples, minlength=4) / len(samples)
+    assert frequencies[1] == 0
+    assert numpy.allclose(frequencies, numpy.array(weights) / 8, atol=0.02)
+    assert 0 <= table.sample() < 4
+    draws = [table.draw() for _ in range(4000)]
+    assert 1 not in draws
+    assert 0.45 < draws.count(3) / len(draws) < 0.55
+
+    for weights in ([], [0, 0], [1, -1], [1, math.nan]):
+        with pytest.raises(ValueError):
+            AliasTable(weights)
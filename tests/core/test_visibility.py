@@ -0,0 +1,37 @@
+import math
+
+import numpy
+
+from scenic.core.visibility import RayCaster
+from tests.utils import sampleSceneFrom
+
+
+def test_ray_caster():
+    scene = sampleSceneFrom(
+        """
+        ego = new Object at (0, 5, 0)
+        new Object at (0, 10, 0), with width 4
+        new Object at (5, 0, 0), with shape SpheroidShape()
+        """
+    )
+    caster = RayCaster(scene.objects)
+    origins = numpy.zeros((5, 3))
+    directions = numpy.array([[0, 1, 0], [1, 0, 0], [0, -1, 0], [0, 0, 1], [1.5, 10, 0]])
+    distances, hits = caster.firstHits(origins, directions)
+    assert list(hits) == [0, 2, -1, -1, 1]
+    assert numpy.allclose(distances[:2], [4.5, 4.5])
+    assert distances[2] == distances[3] == math.inf
+    # Distances are in units of the direction of each ray
+    assert math.isclose(distances[4], 0.95)
+
+    # Hits beyond the maximum distance of a ray are ignored, but not hits at it
+    distances, hits = caster.firstHits(origins[:2], directions[:2], [4.5, 4])
+    assert list(hits) == [0, -1]
+
+    # Rays starting inside an object hit it on the way out
+    distances, hits = caster.firstHits([(0, 10, 0)], [(0, 1, 0)])
+    assert list(hits) == [1]
+    assert math.isclose(distances[0], 0.5)
+
+    distances, hits = RayCaster(()).firstHits(origins, directions)
+    assert list(hits) == [-1] * 5
@@ -0,0 +1,111 @@
+import csv
+
+import pytest
+
+from scenic.simulators.replay import evaluate
+from tests.utils import BAG_ENTITY_ATTRIBUTES, BAG_TOPICS, writeReplayBag
+
+CLAIM = """
+import scenic.simulators.utils.parse_bag as parse_bag
+param time_step = 0.1
+param render = False
+param bag_path = None
+param sim_data = parse_bag.bag_to_dataframe(
+    globalParameters.bag_path, {topics}, {attributes}
+)
+
+model scenic.domains.driving.replay
+
+class UAVObject(Object):
+    targets_reported: []
+    T: 0.0
+
+ego = new UAVObject with id 'ego', with _needsSampling False
+car000 = new Car at (0, 50), with id 'car000', with _needsSampling False
+car001 = new Car at (50, -20), with id 'car001', with _needsSampling False
+
+sim_data = globalParameters["sim_data"]
+sim_time_end = float(sim_data.tail(1).Timestamp.values[0]) - float(sim_data.head(1).Timestamp.values[0])
+terminate when (sim_time_end - ego.T) < globalParameters["time_step"]
+
+require {requirement}
+"""
+
+
+def writeClaim(directory, name, requirement):
+    path = directory / f"{name}.scenic"
+    path.write_text(
+        CLAIM.format(
+            topics=BAG_TOPICS,
+            attributes=BAG_ENTITY_ATTRIBUTES,
+            requirement=requirement,
+        )
+    )
+    return str(path)
+
+
+@pytest.fixture
+def claims(tmp_path):
+    return [
+        writeClaim(tmp_path, "pass", "always ego.position.z <= 0"),
+        writeClaim(tmp_path, "fail", "always ego.position.x < 10"),
+        writeClaim(tmp_path, "error", "always ego.nonexistent"),
+    ]
+
+
+@pytest.fixture
+def bags(tmp_path):
+    bagDir = tmp_path / "missions"
+    for mission, steps in (("short", 10), ("long", 30)):
+        (bagDir / mission).mkdir(parents=True)
+        writeReplayBag(bagDir / mission / "bags_0.mcap", steps=steps)
+    return evaluate.findBags([bagDir])
+
+
+def test_find_bags(bags):
+    assert [bag.parent.name for bag in bags] == ["long", "short"]
+
+
+def test_evaluate(claims, bags):
+    results = evaluate.evaluate(claims, bags, workers=1)
+    assert [(r["claim"], r["bag"]) for r in results] == [
+        (claim, str(bag)) for bag in bags for claim in claims
+    ]
+    verdicts = [r["verdict"] for r in results]
+    assert verdicts == ["pass", "fail", "error", "pass", "pass", "error"]
+    failure = results[1]
+    assert failure["violation_step"] == 6
+    assert failure["violation_time"] == pytest.approx(0.6)
+
+
+def test_main_parallel(claims, bags, tmp_path):
+    output = tmp_path / "results.csv"
+    args = claims[:2] + ["--bags"] + [str(bag) for bag in bags]
+    status = evaluate.main(args + ["--workers", "2", "--output", str(output)])
+    assert status == 0
+    with open(output) as f:
+        rows = list(csv.DictReader(f))
+    assert [row["verdict"] for row in rows] == ["pass", "fail", "pass", "pass"]
+    assert rows[1]["violation_step"] == "6"
+
+
+def test_evaluate_combined(bags, tmp_path):
+    claim = writeClaim(
+        tmp_path,
+        "combined",
+        "(\n    always ego.position.z <= 0\n) as altitude\n"
+        "require (always ego.position.x < 10) as range\n"
+        "require eventually ego.position.x > 100 as far",
+    )
+    results = evaluate.evaluate([claim], bags[:1], workers=1)
+    assert [(r["requirement"], r["verdict"]) for r in results] == [
+        ("altitude", "pass"),
+        ("range", "fail"),
+        ("far", "fail"),
+    ]
+    assert results[0]["violation_step"] == ""
+    assert results[1]["violation_step"] == 6
+    # The "eventually" requirement is only violated when the replay ends
+    assert results[2]["violation_step"] == 15
+    # All requirements were checked by the same replay
+    assert len({r["seconds"] for r in results}) == 1
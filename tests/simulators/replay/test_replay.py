@@ -5,7 +5,16 @@ from PIL import Image as IPImage
 import pytest
 
 from scenic.simulators.replay import ReplaySimulator
-from tests.utils import pickle_test, sampleScene, tryPickling
+from scenic.simulators.utils import parse_bag
+from tests.utils import (
+    BAG_ENTITY_ATTRIBUTES,
+    BAG_TOPICS,
+    compileScenic,
+    pickle_test,
+    sampleScene,
+    tryPickling,
+    writeReplayBag,
+)
 
 
 def test_basic(loadLocalScenario):
@@ -13,3 +22,65 @@ def test_basic(loadLocalScenario):
     scene, _ = scenario.generate(maxIterations=1)
     simulator = ReplaySimulator()
     simulator.simulate(scene, maxSteps=100)
+
+
+@pytest.fixture
+def bagScenario(tmp_path):
+    path = writeReplayBag(tmp_path / "bags_0.mcap", steps=30)
+    frame = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    code = """
+        param replay = True
+        model scenic.domains.driving.replay
+        class UAVObject(Object):
+            targets_reported: []
+            T: 0.0
+            collision: False
+        ego = new UAVObject with id "ego", with _needsSampling False
+        car000 = new Car with id "car000", with vehicle_type "SEDAN",
+            with _needsSampling False
+        car001 = new Car with id "car001", with vehicle_type "SUV",
+            with _needsSampling False
+        for obj in (ego, car000, car001):
+            obj.allowCollisions = True
+        record ego.T as T
+        record ego.position as position
+        record car001.position as car
+        record len(ego.targets_reported) as reports
+        record ego.collision as collision
+    """
+    return compileScenic(code, params={"sim_data": frame})
+
+
+def test_replay_windows(bagScenario):
+    scenario = bagScenario
+    simulation = ReplaySimulator().simulate(sampleScene(scenario), maxSteps=14)
+    records = {
+        name: [value for _, value in rs] for name, rs in simulation.result.records.items()
+    }
+
+    # Each step covers exactly two odometry messages, without consuming the first
+    # message of the next step
+    assert records["T"][1:] == pytest.approx([0.2 * i for i in range(1, 15)])
+    for i, position in enumerate(records["position"][1:]):
+        assert tuple(position) == pytest.approx((2 * i + 0.5, 4 * i + 1, -10))
+    for i, position in enumerate(records["car"][1:]):
+        assert tuple(position)[:2] == pytest.approx((50 + i + 0.25, -20))
+    # The report in the second step of the bag is a "leave" event
+    assert records["reports"][1:4] == [2, 1, 2]
+    assert [i for i, c in enumerate(records["collision"]) if c] == [2, 7, 12]
+    # The replay ends after the last message
+    simulation = ReplaySimulator().simulate(sampleScene(scenario), maxSteps=20)
+    T = [value for _, value in simulation.result.records["T"]]
+    assert T[-1] == pytest.approx(2.9)
+
+
+@pytest.mark.parametrize("frameEvery", (1, 4))
+def test_replay_video(bagScenario, tmp_path, frameEvery):
+    path = tmp_path / "replay.gif"
+    simulator = ReplaySimulator(
+        video=str(path), frame_every=frameEvery, resolution=(200, 120)
+    )
+    simulator.simulate(sampleScene(bagScenario), maxSteps=12)
+    with IPImage.open(path) as gif:
+        assert gif.size == (200, 120)
+        assert gif.n_frames == len(range(0, 12, frameEvery))
@@ -0,0 +1,211 @@
+import math
+import os
+import tarfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scenic.simulators.utils import parse_bag
+from tests.utils import BAG_ENTITY_ATTRIBUTES, BAG_TOPICS, writeReplayBag
+
+
+@pytest.fixture
+def bagFrame(tmp_path):
+    path = writeReplayBag(tmp_path / "bags_0.mcap", steps=20)
+    return parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+
+
+def test_bag_to_dataframe_events(bagFrame):
+    counts = bagFrame.Event.value_counts()
+    assert counts["ODOM"] == 20
+    assert counts["GT_POSITION"] == 40
+    assert counts["MSG"] == 19  # the "leave" event is dropped
+    assert counts["CLSN"] == 2  # only states with has_collided set
+    assert list(bagFrame.Timestamp) == sorted(bagFrame.Timestamp)
+    assert list(bagFrame.Event[:4]) == ["ODOM", "GT_POSITION", "GT_POSITION", "MSG"]
+
+
+def test_bag_to_dataframe_values(bagFrame):
+    odom = bagFrame[bagFrame.Event == "ODOM"].iloc[3]
+    assert odom.Timestamp == pytest.approx(1000.3)
+    assert (odom.X, odom.Y, odom.Z) == (3, 6, -10)
+    assert odom.Yaw == pytest.approx(0.3)
+    assert odom.Roll == pytest.approx(0) and odom.Pitch == pytest.approx(0)
+    assert (odom.Xdot, odom.Ydot, odom.Heave) == (10, 20, 1)
+
+    truth = bagFrame[bagFrame.EntityID == "car001"]
+    truth = truth[truth.Event == "GT_POSITION"].iloc[0]
+    assert (truth.X, truth.Y) == (50, -20)
+    assert truth.Yaw == pytest.approx(0.05)
+
+    reports = bagFrame[bagFrame.Event == "MSG"]
+    assert list(reports.Type[:2]) == ["SEDAN", "SUV"]
+    assert list(reports.Color[:2]) == ["yellow", "violet"]
+    assert reports.Confidence.iloc[0] == pytest.approx(0.75)
+    assert reports.Yaw.iloc[0] == pytest.approx(0.2)
+    # All-zero quaternions are reported as zero angles
+    assert (reports.Roll.iloc[1], reports.Pitch.iloc[1], reports.Yaw.iloc[1]) == (0, 0, 0)
+
+    collision = bagFrame[bagFrame.Event == "CLSN"].iloc[0]
+    assert collision.Object == "tree"
+    assert collision.ObjectID == 7
+    assert math.isnan(collision.X)
+
+
+def test_bag_to_dataframe_missing(tmp_path):
+    with pytest.raises(parse_bag.BagFileDoesNotExistException):
+        parse_bag.bag_to_dataframe(tmp_path / "missing.mcap", BAG_TOPICS, {})
+
+
+def test_bag_to_dataframe_wrong_format(tmp_path):
+    path = tmp_path / "bags_0.db3"
+    path.write_bytes(b"")
+    with pytest.raises(parse_bag.BagFileIsWrongFormat):
+        parse_bag.bag_to_dataframe(path, BAG_TOPICS, {})
+
+
+## Archives
+
+
+def makeArchive(path, members):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, source in members.items():
+            tar.add(source, arcname=name)
+    return path
+
+
+def test_archive_streaming(tmp_path):
+    bag = writeReplayBag(tmp_path / "source.mcap", steps=20)
+    archiveDir = tmp_path / "archive"
+    archiveDir.mkdir()
+    archive = makeArchive(
+        archiveDir / "bag.tgz",
+        {"bags/metadata.yaml": bag, "bags/bags_0.mcap": bag},
+    )
+    options = dict(use_cache=False, write_cache=False)
+    frame = parse_bag.bag_to_dataframe(bag, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES, **options)
+    streamed = parse_bag.bag_to_dataframe(
+        archive, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES, **options
+    )
+    pd.testing.assert_frame_equal(streamed, frame, check_exact=True)
+    # Nothing is extracted next to the archive
+    assert list(archiveDir.iterdir()) == [archive]
+
+
+def test_archive_without_bag(tmp_path):
+    bag = writeReplayBag(tmp_path / "source.mcap", steps=2)
+    archive = makeArchive(tmp_path / "bag.tgz", {"bags/other.mcap": bag})
+    with pytest.raises(parse_bag.BagFileDoesNotExistException):
+        parse_bag.bag_to_dataframe(archive, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+
+
+## Caching
+
+
+def cacheEntries(cacheDir):
+    return [entry for entry in cacheDir.iterdir() if not entry.name.startswith(".")]
+
+
+def test_cache_hit(tmp_path, bagCacheDir, monkeypatch):
+    path = writeReplayBag(tmp_path / "bags_0.mcap", steps=10)
+    frame = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    assert len(cacheEntries(bagCacheDir)) == 1
+    # Nothing is written next to the bag
+    assert sorted(tmp_path.iterdir()) == sorted([bagCacheDir, path])
+
+    def fail(*args):
+        raise AssertionError("bag decoded despite cache")
+
+    monkeypatch.setattr(parse_bag, "_decode_bag", fail)
+    cached = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    pd.testing.assert_frame_equal(cached, frame, check_exact=True)
+    # Numeric columns are memory mapped rather than read into memory
+    base = cached.X.to_numpy()
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+    cached.loc[0, "X"] = 1234
+    reloaded = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    pd.testing.assert_frame_equal(reloaded, frame, check_exact=True)
+
+
+def test_cache_key(tmp_path, bagCacheDir):
+    path = writeReplayBag(tmp_path / "bags_0.mcap", steps=10)
+    frame = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    subset = parse_bag.bag_to_dataframe(path, BAG_TOPICS[:2], BAG_ENTITY_ATTRIBUTES)
+    assert len(subset) < len(frame)
+    assert len(cacheEntries(bagCacheDir)) == 2
+
+    writeReplayBag(path, steps=5)
+    changed = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    assert len(changed) < len(frame)
+
+
+def test_cache_key_contents(tmp_path, monkeypatch):
+    path = tmp_path / "bags_0.mcap"
+    path.write_bytes(b"headMIDDLEtail")
+
+    def digest():
+        return parse_bag.bag_digest(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+
+    original = digest()
+    # Bags of the same size differing only in the middle have different keys
+    path.write_bytes(b"headmiddletail")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    changed = digest()
+    assert changed != original
+
+    # The digest of the contents is memoized until the bag is modified
+    def fail(path):
+        raise AssertionError("bag hashed again despite memo")
+
+    with monkeypatch.context() as m:
+        m.setattr(parse_bag, "_file_digest", fail)
+        assert digest() == changed
+    path.write_bytes(b"headMIDDLEtail")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 2))
+    assert digest() == original
+
+
+def test_cache_corrupted(tmp_path, bagCacheDir):
+    path = writeReplayBag(tmp_path / "bags_0.mcap", steps=10)
+    frame = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    (entry,) = cacheEntries(bagCacheDir)
+    (entry / "0.npy").write_bytes(b"garbage")
+    reloaded = parse_bag.bag_to_dataframe(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+    pd.testing.assert_frame_equal(reloaded, frame)
+    # The corrupted entry is replaced
+    parse_bag._read_cache_entry(entry)
+
+
+def test_cache_eviction(tmp_path):
+    path = writeReplayBag(tmp_path / "bags_0.mcap", steps=10)
+    cacheDir = tmp_path / "cache"
+    for i in range(3):
+        parse_bag.bag_to_dataframe(
+            path, BAG_TOPICS[: i + 1], BAG_ENTITY_ATTRIBUTES, cache_dir=cacheDir
+        )
+    assert len(cacheEntries(cacheDir)) == 3
+    parse_bag.bag_to_dataframe(
+        path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES, cache_dir=cacheDir, max_cache_size=1
+    )
+    (entry,) = cacheEntries(cacheDir)
+    assert entry.name == parse_bag.bag_digest(path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+
+
+def test_cache_disabled(tmp_path, bagCacheDir):
+    path = writeReplayBag(tmp_path / "bags_0.mcap", steps=10)
+    parse_bag.bag_to_dataframe(
+        path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES, use_cache=False, write_cache=False
+    )
+    assert not bagCacheDir.exists()
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("SCENIC_BAG_CACHE", str(tmp_path))
+    assert parse_bag.default_cache_dir() == tmp_path
+    monkeypatch.delenv("SCENIC_BAG_CACHE")
+    monkeypatch.setattr(parse_bag.sys, "platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert parse_bag.default_cache_dir() == tmp_path / "scenic" / "bags"
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from scenic.core.regions import BoxRegion, SpheroidRegion
+from scenic.core.vectors import Orientation, Vector
+from scenic.simulators.utils.scenic_ansr import Zone, ZoneSet, match_reported_targets
+
+
+def test_zone_set_contains():
+    rng = np.random.default_rng(0)
+    zones = [
+        Zone(
+            BoxRegion(
+                position=Vector(*rng.uniform(-50, 50, 3)),
+                dimensions=tuple(rng.uniform(1, 30, 3)),
+                rotation=Orientation.fromEuler(*rng.uniform(-3, 3, 3)),
+            )
+        )
+        for _ in range(20)
+    ]
+    zones.append(Zone(SpheroidRegion(position=Vector(0, 0, 0), dimensions=(20, 20, 20))))
+    zoneSet = ZoneSet(zones)
+    assert list(zoneSet) == zones and len(zoneSet) == 21
+    points = rng.uniform(-60, 60, (500, 3))
+    expected = [any(z.region.containsPoint(Vector(*p)) for z in zones) for p in points]
+    assert list(zoneSet.containsPoints(points)) == expected
+    assert [Vector(*p) in zoneSet for p in points[:50]] == expected[:50]
+
+
+def test_zone_set_times():
+    zoneSet = ZoneSet(
+        [
+            Zone(BoxRegion(position=Vector(0, 0), dimensions=(10, 10, 1e3)), 5, 10),
+            Zone(BoxRegion(position=Vector(4, 0), dimensions=(10, 10, 1e3)), 20),
+        ]
+    )
+    assert zoneSet.containsPoints([(0, 0), (8, 0), (20, 0)]).tolist() == [
+        True,
+        True,
+        False,
+    ]
+    assert zoneSet.containsPoint((0, 0), time=7)
+    assert not zoneSet.containsPoint((0, 0), time=12)
+    assert zoneSet.containsPoint((0, 0), time=25)
+    assert not zoneSet.containsPoint((0, 0, 600))
+    assert not ZoneSet([]).containsPoint((0, 0))
+
+
+def test_match_reported_targets():
+    def target(id, x, y):
+        return SimpleNamespace(id=id, position=Vector(x, y, 0), width=1)
+
+    targets = {f"car{i}": target(f"car{i}", 10 * i, 0) for i in range(3)}
+    reports = [
+        target("car0", 1.5, 0),
+        target("car0", 0.5, 0),
+        target("car1", 10, 4),
+        target("car1", 19, 0),
+    ]
+    matches = match_reported_targets(targets, reports, 3)
+    assert set(matches) == {"car0"}
+    report, distance = matches["car0"]
+    assert report is reports[1] and distance == pytest.approx(0.5)
+    matches = match_reported_targets(
+        list(targets.values()), reports, lambda p: 5 * p.width
+    )
+    assert matches["car1"][0] is reports[2]
+    assert match_reported_targets(targets, [], 3) == {}
@@ -0,0 +1,28 @@
+import numpy as np
+from PIL import Image
+
+from scenic.simulators.utils.video import VideoWriter
+
+
+def test_gif_colors(tmp_path):
+    path = tmp_path / "video.gif"
+    gradient = np.zeros((30, 256, 3), dtype=np.uint8)
+    gradient[..., 0] = np.arange(256)
+    gradient[..., 1] = np.arange(256)[::-1]
+    gradient[..., 2] = 90
+    frames = []
+    with VideoWriter(path, fps=10) as writer:
+        for i in range(4):
+            frame = gradient.copy()
+            frame[10:20, 10 * i : 10 * i + 10] = 255
+            frames.append(frame)
+            writer.write(frame)
+    assert writer.frameCount == 4
+
+    # Frames share an adaptive palette, so gradients are not banded
+    with Image.open(path) as gif:
+        assert gif.n_frames == 4
+        for i, frame in enumerate(frames):
+            gif.seek(i)
+            decoded = np.asarray(gif.convert("RGB"), dtype=int)
+            assert np.abs(decoded - frame).max() <= 4
@@ -1124,6 +1124,15 @@ class TestRequire:
             case _:
                 assert False
 
+    def test_require_parenthesized_temporal_with_name(self):
+        mod = parse_string_helper("require (\n    always X\n) as safety")
+        stmt = mod.body[0]
+        match stmt:
+            case Require(Always(Name("X")), None, "safety"):
+                assert True
+            case _:
+                assert False
+
 
 class TestRecord:
     def test_record(self):
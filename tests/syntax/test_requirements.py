@@ -1,8 +1,12 @@
 import pytest
+import trimesh
 
 import scenic
 from scenic.core.distributions import RejectionException
 from scenic.core.errors import InvalidScenarioError, ScenicSyntaxError
+from scenic.core.requirements import BlanketCollisionRequirement
+from scenic.core.sample_checking import SampleChecker
+from scenic.core.utils import DefaultIdentityDict
 from tests.utils import compileScenic, sampleEgo, sampleScene, sampleSceneFrom
 
 ## Basic
@@ -294,6 +298,56 @@ def test_intersection_requirement_disabled_2():
     assert any(x < 1 for x in xs)
 
 
+class AcceptAllChecker(SampleChecker):
+    def checkRequirementsInner(self, sample):
+        return None
+
+
+def test_blanket_collision_requirement():
+    scenario = compileScenic(
+        """
+        for i in range(6):
+            new Object at (Range(-3, 3), Range(-3, 3), Range(-1, 1)),
+                facing (Range(0, 360) deg, Range(-40, 40) deg, Range(-40, 40) deg),
+                with shape Uniform(ConeShape(), BoxShape(), SpheroidShape()),
+                with width Range(0.5, 2),
+                with allowCollisions (i == 0)
+        ego = new Object at Range(-3, 3) @ Range(-3, 3)
+        """
+    )
+    scenario.setSampleChecker(AcceptAllChecker())
+    collisions = 0
+    for i in range(30):
+        objects = sampleScene(scenario, maxIterations=1).objects
+        req = BlanketCollisionRequirement(objects)
+        # Reference implementation: check all surfaces at once with FCL
+        manager = trimesh.collision.CollisionManager()
+        for j, obj in enumerate(objects):
+            if not obj.allowCollisions:
+                manager.add_object(str(j), obj.occupiedSpace.mesh)
+        expected = manager.in_collision_internal()
+        assert req.falsifiedBy(DefaultIdentityDict()) == expected
+        if expected:
+            collisions += 1
+            a, b = req._collidingObjects[0]
+            assert objects[a].intersects(objects[b])
+    assert 0 < collisions < 30
+
+
+def test_blanket_collision_requirement_planar():
+    scenario = compileScenic(
+        """
+        ego = new Object at Range(0, 2) @ 0
+        other = new Object at 0 @ Range(0, 2)
+        """
+    )
+    scenario.setSampleChecker(AcceptAllChecker())
+    for i in range(30):
+        ego, other = sampleScene(scenario, maxIterations=1).objects
+        req = BlanketCollisionRequirement((ego, other))
+        assert req.falsifiedBy(DefaultIdentityDict()) == ego.intersects(other)
+
+
 ## Static violations of built-in requirements
 
 
@@ -1,6 +1,8 @@
 """Tests for the 'scenic' command-line tool."""
 
+import csv
 import inspect
+import json
 import os
 import re
 import subprocess
@@ -106,3 +108,40 @@ def test_time(runAndGetRecordR):
         options=["--time", "5"],
     )
     assert r == "10"
+
+
+def test_gather_stats_workers(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    program = "ego = new Object at Range(0, 10) @ 0\nrequire ego.position.x > 5"
+    lines = run(path, program, ["--gather-stats", "6", "--workers", "2"])
+    assert any(line.startswith("Sampled 6 scenes") for line in lines)
+
+
+def test_checker_stats(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    statsPath = os.path.join(tmpdir, "stats.json")
+    program = "ego = new Object at Range(0, 10) @ 0\nrequire ego.position.x > 5"
+    options = ["--gather-stats", "3", "--checker-stats", statsPath]
+    run(path, program, options)
+    assert os.path.exists(statsPath)
+    lines = run(path, program, options + ["-v", "1"])
+    assert not any(line.startswith("Ignoring") for line in lines)
+    lines = run(path, program + "\nrequire ego.position.x < 9", options + ["-v", "1"])
+    assert any(line.startswith("Ignoring") for line in lines)
+
+
+def test_sampling_stats(tmpdir):
+    path = os.path.join(tmpdir, "test.sc")
+    program = "ego = new Object at Range(0, 10) @ 0\nrequire ego.position.x > 5"
+    jsonPath = os.path.join(tmpdir, "stats.json")
+    lines = run(path, program, ["--gather-stats", "3", "--sampling-stats", jsonPath])
+    assert any(line.startswith("Time sampling/checking") for line in lines)
+    with open(jsonPath) as inFile:
+        stats = json.load(inFile)
+    assert stats["scenes"] == 3
+    assert stats["requirements"]["line 3"]["checked"] >= 3
+    csvPath = os.path.join(tmpdir, "stats.csv")
+    run(path, program, ["--gather-stats", "3", "--sampling-stats", csvPath])
+    with open(csvPath) as inFile:
+        rows = list(csv.DictReader(inFile))
+    assert "line 3" in [row["requirement"] for row in rows]
@@ -597,3 +597,172 @@ def deprecationTest(removalVersion):
         return wrapper
 
     return decorator
+
+
+## Replay bag utilities
+
+_TIME_MSGDEF = """
+================================================================================
+MSG: std_msgs/Header
+builtin_interfaces/Time stamp
+string frame_id
+"""
+_POSE_MSGDEF = """
+================================================================================
+MSG: geometry_msgs/Pose
+Point position
+Quaternion orientation
+================================================================================
+MSG: geometry_msgs/Point
+float64 x
+float64 y
+float64 z
+================================================================================
+MSG: geometry_msgs/Quaternion
+float64 x
+float64 y
+float64 z
+float64 w
+"""
+_BAG_MSGDEFS = {
+    "adk_msgs/msg/Perception": (
+        "builtin_interfaces/Time detection_time\n"
+        "uint8 enter_or_leave\n"
+        "string entity_id\n"
+        "geometry_msgs/Pose position\n"
+        "float32 probability\n" + _POSE_MSGDEF
+    ),
+    "nav_msgs/msg/Odometry": (
+        "std_msgs/Header header\n"
+        "string child_frame_id\n"
+        "geometry_msgs/PoseWithCovariance pose\n"
+        "geometry_msgs/TwistWithCovariance twist\n"
+        + _TIME_MSGDEF
+        + """
+================================================================================
+MSG: geometry_msgs/PoseWithCovariance
+Pose pose
+float64[36] covariance
+================================================================================
+MSG: geometry_msgs/TwistWithCovariance
+Twist twist
+float64[36] covariance
+================================================================================
+MSG: geometry_msgs/Twist
+Vector3 linear
+Vector3 angular
+================================================================================
+MSG: geometry_msgs/Vector3
+float64 x
+float64 y
+float64 z
+"""
+        + _POSE_MSGDEF
+    ),
+    "airsim_interfaces/msg/CollisionState": (
+        "builtin_interfaces/Time timestamp\n"
+        "bool has_collided\n"
+        "string object_name\n"
+        "int32 object_id\n"
+    ),
+    "geometry_msgs/msg/PoseStamped": (
+        "std_msgs/Header header\ngeometry_msgs/Pose pose\n" + _TIME_MSGDEF + _POSE_MSGDEF
+    ),
+}
+BAG_ENTITY_ATTRIBUTES = {
+    "car000": {"color": "yellow", "class": "SEDAN"},
+    "car001": {"color": "violet", "class": "SUV"},
+}
+BAG_TOPICS = [
+    "/adk_node/input/perception",
+    "/adk_node/SimpleFlight/odom_local_ned",
+    "/adk_node/SimpleFlight/collision_state",
+] + [f"/airsim_node/{entity}/envcar_pose" for entity in BAG_ENTITY_ATTRIBUTES]
+
+
+def writeReplayBag(path, steps=20, rate=10, start=1000.0):
+    """Write a small synthetic MCAP bag in the format read by `parse_bag`.
+
+    Each step has one odometry message, one ground truth pose per entity of
+    `BAG_ENTITY_ATTRIBUTES` and one perception report, interleaved as a recorder
+    would. A few messages exercise the special cases of the decoder: an all-zero
+    perception quaternion, a perception "leave" event and collision states.
+    """
+    from mcap_ros2.writer import Writer
+
+    def stamp(t):
+        sec = math.floor(t)
+        return {"sec": sec, "nanosec": round((t - sec) * 1e9)}
+
+    def pose(x, y, z, yaw):
+        q = {"x": 0.0, "y": 0.0, "z": math.sin(yaw / 2), "w": math.cos(yaw / 2)}
+        return {"position": {"x": x, "y": y, "z": z}, "orientation": q}
+
+    with open(path, "wb") as f:
+        writer = Writer(f)
+        schemas = {
+            name: writer.register_msgdef(name, msgdef)
+            for name, msgdef in _BAG_MSGDEFS.items()
+        }
+
+        def write(topic, schema, t, message):
+            writer.write_message(topic, schemas[schema], message, log_time=int(t * 1e9))
+
+        for i in range(steps):
+            t = start + i / rate
+            vector = lambda x, y, z: {"x": x, "y": y, "z": z}
+            write(
+                BAG_TOPICS[1],
+                "nav_msgs/msg/Odometry",
+                t,
+                {
+                    "header": {"stamp": stamp(t), "frame_id": "map"},
+                    "pose": {"pose": pose(i, 2 * i, -10, 0.1 * i)},
+                    "twist": {
+                        "twist": {
+                            "linear": vector(rate, 2 * rate, 0),
+                            "angular": vector(0, 0, 0.1 * rate),
+                        }
+                    },
+                },
+            )
+            for j, entity in enumerate(BAG_ENTITY_ATTRIBUTES):
+                write(
+                    f"/airsim_node/{entity}/envcar_pose",
+                    "geometry_msgs/msg/PoseStamped",
+                    t,
+                    {
+                        "header": {"stamp": stamp(t), "frame_id": "map"},
+                        "pose": pose(50 * j + 0.5 * i, -20 * j, 0, 0.05 * j),
+                    },
+                )
+            entity = list(BAG_ENTITY_ATTRIBUTES)[i % len(BAG_ENTITY_ATTRIBUTES)]
+            report = pose(0.5 * i + 1, 0, 0, 0.2)
+            if i == 1:
+                report["orientation"] = {"x": 0.0, "y": 0.0, "z": 0.0, "w": 0.0}
+            write(
+                BAG_TOPICS[0],
+                "adk_msgs/msg/Perception",
+                t,
+                {
+                    "detection_time": stamp(t),
+                    "enter_or_leave": 1 if i == 2 else 0,
+                    "entity_id": entity,
+                    "position": report,
+                    "probability": 0.75,
+                },
+            )
+            if i % 5 == 3:
+                write(
+                    BAG_TOPICS[2],
+                    "airsim_interfaces/msg/CollisionState",
+                    t,
+                    {
+                        "timestamp": stamp(t),
+                        "has_collided": i % 10 == 3,
+                        "object_name": "tree",
+                        "object_id": 7,
+                    },
+                )
+        writer.finish()
+    return path
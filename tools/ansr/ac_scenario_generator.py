@@ -25,13 +25,14 @@ eoi_def_str = """{id} = new Car at ({location[0]}, {location[1]}),
 """
 
 preamble = """import scenic.simulators.utils.parse_bag as parse_bag
-from scenic.simulators.utils.scenic_ansr import Zone, COLORS
+from scenic.simulators.utils.scenic_ansr import Zone, ZoneSet, COLORS, match_reported_targets
 param time_step = 1.0/10
 param render = False
 
 param map_data = {map_path}
+param bag_path = "{bag_path}"
 param sim_data = parse_bag.bag_to_dataframe(
-    "{bag_path}",
+    globalParameters.bag_path,
     {topics},
     {entity_attribute_map}
 )
@@ -131,7 +132,7 @@ def parse_mission_description(description_file) -> str:
     koz_defs = []
     for z in keepout_zones:
         koz_defs.append(koz_def_str.format(center=z[0], dimensions=z[1]))
-    koz_definition = "keep_out_zones = [\n\t" + ",\n\t".join(koz_defs) + "\n]\n\n"
+    koz_definition = "keep_out_zones = ZoneSet([\n\t" + ",\n\t".join(koz_defs) + "\n])\n\n"
     return koz_definition
 
 def parse_mission_config(config_file: str) -> tuple:
@@ -175,17 +176,26 @@ def main(args: argparse.Namespace) -> None:
             koz_defs = parse_mission_description(os.path.join(args.mission_dir, f))
     topics += [f"/airsim_node/{i}/envcar_pose" for i in entity_attributes]
     targets_groundtruth_def = ",\n\t".join(map(lambda x:"'{0}': {0}".format(x), entity_attributes.keys()))
-    for f in os.listdir(args.assurance_claim_dir):
-        if f.endswith(".md"):
-            scenario = preamble.format(bag_path=os.path.join(args.bag_dir, "bags_0.mcap"),
-                                       topics=topics,
-                                       entity_attribute_map=entity_attributes,
-                                       map_path=args.map_path)
-            scenario += koz_defs
-            scenario += entity_defs
-            scenario += coda.format(id_list=targets_groundtruth_def)
-            scenario += f"require (\n{parse_assurance_claim(os.path.join(args.assurance_claim_dir, f))})"
-            open(os.path.join(args.assurance_claim_dir, os.path.splitext(f)[0]+".scenic"), "w").write(scenario)
+    scenario = preamble.format(bag_path=os.path.join(args.bag_dir, "bags_0.mcap"),
+                               topics=topics,
+                               entity_attribute_map=entity_attributes,
+                               map_path=args.map_path)
+    scenario += koz_defs
+    scenario += entity_defs
+    scenario += coda.format(id_list=targets_groundtruth_def)
+    claims = sorted(f for f in os.listdir(args.assurance_claim_dir) if f.endswith(".md"))
+    if args.combined:
+        # One scenario checking every claim in a single replay, with each
+        # requirement named after its claim
+        for f in claims:
+            claim = parse_assurance_claim(os.path.join(args.assurance_claim_dir, f))
+            scenario += f"require (\n{claim}) as \"{os.path.splitext(f)[0]}\"\n"
+        open(args.combined, "w").write(scenario)
+        return
+    for f in claims:
+        claim = parse_assurance_claim(os.path.join(args.assurance_claim_dir, f))
+        open(os.path.join(args.assurance_claim_dir, os.path.splitext(f)[0]+".scenic"), "w").write(
+            scenario + f"require (\n{claim})")
 
 if __name__ == "__main__":
     """
@@ -206,6 +216,10 @@ if __name__ == "__main__":
     parser.add_argument(
         "--map_path", help="Path to the map image file", default=None
     )
+    parser.add_argument(
+        "--combined", help="Write a single scenario checking all claims to this file instead",
+        default=None
+    )
 
     # Parse command line arguments
     args: argparse.Namespace = parser.parse_args()
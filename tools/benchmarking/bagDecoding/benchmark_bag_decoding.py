@@ -0,0 +1,141 @@
+"""Compare columnar and row-by-row decoding of replay bags.
+
+Writes a synthetic MCAP bag with the test suite's bag writer and times
+`parse_bag.bag_to_dataframe` against the previous row-by-row implementation,
+which built one dict and called `Rotation.from_quat` once per message.
+"""
+
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import scipy.linalg as linalg
+from scipy.spatial.transform import Rotation
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+import scenic.simulators.utils.parse_bag as parse_bag
+from tests.utils import BAG_ENTITY_ATTRIBUTES, BAG_TOPICS, writeReplayBag
+
+STEPS = [1_000, 10_000, 50_000]
+TRIALS_PER = 3
+
+
+def bag_to_dataframe_rowwise(bag_path, topics, entity_attribute_map):
+    data = []
+    # The previous reader yielded messages in log time order
+    messages = sorted(parse_bag._decode_messages(bag_path, topics), key=lambda m: m[1])
+    for topic, _, message in messages:
+        if topic == parse_bag.PERCEPTION_TOPIC:
+            seconds = float(message.detection_time.sec) + (
+                message.detection_time.nanosec / 1e9
+            )
+            if message.enter_or_leave != 1:
+                q = message.position.orientation
+                if linalg.norm([q.x, q.y, q.z, q.w]) > 0:
+                    R, P, Y = Rotation.from_quat([q.x, q.y, q.z, q.w]).as_euler("xyz")
+                else:
+                    R, P, Y = (0.0, 0.0, 0.0)
+                data.append(
+                    {
+                        "Timestamp": seconds,
+                        "Event": "MSG",
+                        "EntityID": message.entity_id,
+                        "X": message.position.position.x,
+                        "Y": message.position.position.y,
+                        "Z": message.position.position.z,
+                        "Roll": R,
+                        "Pitch": P,
+                        "Yaw": Y,
+                        "Type": entity_attribute_map[message.entity_id]["class"],
+                        "Color": entity_attribute_map[message.entity_id]["color"],
+                        "Confidence": message.probability,
+                    }
+                )
+        elif topic == parse_bag.GT_ODOMETRY_TOPIC:
+            seconds = float(message.header.stamp.sec) + (
+                message.header.stamp.nanosec / 1e9
+            )
+            q = message.pose.pose.orientation
+            R, P, Y = Rotation.from_quat([q.x, q.y, q.z, q.w]).as_euler("xyz")
+            data.append(
+                {
+                    "Timestamp": seconds,
+                    "Event": "ODOM",
+                    "X": message.pose.pose.position.x,
+                    "Y": message.pose.pose.position.y,
+                    "Z": message.pose.pose.position.z,
+                    "Roll": R,
+                    "Pitch": P,
+                    "Yaw": Y,
+                    "Xdot": message.twist.twist.linear.x,
+                    "Ydot": message.twist.twist.linear.y,
+                    "Zdot": message.twist.twist.linear.z,
+                    "Surge": message.twist.twist.angular.x,
+                    "Sway": message.twist.twist.angular.y,
+                    "Heave": message.twist.twist.angular.z,
+                }
+            )
+        elif topic == parse_bag.COLLISION_TOPIC:
+            seconds = float(message.timestamp.sec) + (message.timestamp.nanosec / 1e9)
+            if message.has_collided:
+                data.append(
+                    {
+                        "Timestamp": seconds,
+                        "Event": "CLSN",
+                        "Object": message.object_name,
+                        "ObjectID": message.object_id,
+                    }
+                )
+        else:
+            seconds = float(message.header.stamp.sec) + (
+                message.header.stamp.nanosec / 1e9
+            )
+            q = message.pose.orientation
+            R, P, Y = Rotation.from_quat([q.x, q.y, q.z, q.w]).as_euler("xyz")
+            data.append(
+                {
+                    "Timestamp": seconds,
+                    "Event": "GT_POSITION",
+                    "EntityID": topic.split("/")[2],
+                    "X": message.pose.position.x,
+                    "Y": message.pose.position.y,
+                    "Z": message.pose.position.z,
+                    "Roll": R,
+                    "Pitch": P,
+                    "Yaw": Y,
+                }
+            )
+    return pd.DataFrame.from_dict(data)
+
+
+def bag_to_dataframe_columnar(bag_path, topics, entity_attribute_map):
+    return parse_bag.bag_to_dataframe(
+        bag_path, topics, entity_attribute_map, use_cache=False, write_cache=False
+    )
+
+
+def time_decoder(decoder, bag_path):
+    times = []
+    for _ in range(TRIALS_PER):
+        start = time.time()
+        frame = decoder(bag_path, BAG_TOPICS, BAG_ENTITY_ATTRIBUTES)
+        times.append(time.time() - start)
+    return frame, statistics.mean(times)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for steps in STEPS:
+            bag_path = writeReplayBag(Path(tmpdir) / f"bag_{steps}.mcap", steps=steps)
+            rowwise, rowwise_time = time_decoder(bag_to_dataframe_rowwise, bag_path)
+            columnar, columnar_time = time_decoder(bag_to_dataframe_columnar, bag_path)
+            pd.testing.assert_frame_equal(columnar, rowwise)
+            print(
+                f"{steps} steps ({len(columnar)} rows): "
+                f"row-by-row {rowwise_time:.2f}s, columnar {columnar_time:.2f}s, "
+                f"speedup {rowwise_time / columnar_time:.1f}x"
+            )
@@ -0,0 +1,73 @@
+"""Time `BlanketCollisionRequirement` against checking all meshes with FCL.
+
+Samples scenes from the benchmark scenarios without checking any requirements, then
+times checking each sample for collisions with the requirement (which first culls
+pairs of objects whose bounding boxes do not overlap) and with a `CollisionManager`
+containing the meshes of all objects (the previous implementation).
+"""
+
+from pathlib import Path
+import random
+import time
+
+import trimesh
+
+import scenic
+from scenic.core.requirements import BlanketCollisionRequirement
+from scenic.core.sample_checking import SampleChecker
+from scenic.core.utils import DefaultIdentityDict
+
+BENCHMARKS = [
+    ("city_intersection.scenic", {}),
+]
+SAMPLES = 50
+
+
+class AcceptAllChecker(SampleChecker):
+    def checkRequirementsInner(self, sample):
+        return None
+
+
+def checkAllMeshes(objects):
+    manager = trimesh.collision.CollisionManager()
+    for i, obj in enumerate(objects):
+        if not obj.allowCollisions:
+            manager.add_object(str(i), obj.occupiedSpace.mesh)
+    return manager.in_collision_internal()
+
+
+def timeChecks(samples, check):
+    start = time.perf_counter()
+    results = [check(objects) for objects in samples]
+    return time.perf_counter() - start, results
+
+
+def main():
+    directory = Path(__file__).parent
+    for name, params in BENCHMARKS:
+        scenario = scenic.scenarioFromFile(directory / name, params=params)
+        scenario.setSampleChecker(AcceptAllChecker())
+
+        def sampleObjects():
+            return [scenario.generate(maxIterations=1)[0].objects for _ in range(SAMPLES)]
+
+        # Use separate samples for each method, since objects cache their meshes
+        random.seed(0)
+        old, expected = timeChecks(sampleObjects(), checkAllMeshes)
+        random.seed(0)
+        new, results = timeChecks(
+            sampleObjects(),
+            lambda objects: BlanketCollisionRequirement(objects).falsifiedBy(
+                DefaultIdentityDict()
+            ),
+        )
+        assert results == expected
+        print(
+            f"{name} {params}: all meshes {old:.3f}s, culled {new:.3f}s "
+            f"({old / new:.1f}x) for {SAMPLES} samples"
+            f" ({sum(results)} with collisions)"
+        )
+
+
+if __name__ == "__main__":
+    main()
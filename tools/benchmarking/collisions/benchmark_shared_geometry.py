@@ -0,0 +1,78 @@
+"""Time collision checks with and without shared shape geometry.
+
+All cars in the scenario use the same mesh, so with shared geometry their collision
+models are built once for all samples, rather than once for each car in each sample.
+"""
+
+from pathlib import Path
+import random
+import time
+
+import numpy
+
+import scenic
+from scenic.core.regions import MeshVolumeRegion
+from scenic.core.sample_checking import SampleChecker
+
+SAMPLES = 50
+
+SCENARIO = """
+from pathlib import Path
+carShape = MeshShape.fromFile(Path(localPath(".")).parent.parent.parent
+    / "assets" / "meshes" / "bmwx5_hull.obj.bz2", initial_rotation=(90 deg, 0, 0))
+class Car:
+    shape: carShape
+    width: 2
+    length: 5
+    height: 1.5
+    yaw: Range(0, 360) deg
+    allowCollisions: True
+ego = new Car at 0 @ 0
+cars = [new Car at Range(-10, 10) @ Range(-10, 10) for _ in range(12)]
+"""
+
+
+class AcceptAllChecker(SampleChecker):
+    def checkRequirementsInner(self, sample):
+        return None
+
+
+def checkScene(scene):
+    objects = scene.objects
+    return [
+        objects[i].occupiedSpace.intersects(objects[j].occupiedSpace)
+        for i in range(len(objects))
+        for j in range(i + 1, len(objects))
+    ]
+
+
+def timeChecks(scenario):
+    random.seed(0)
+    numpy.random.seed(0)
+    scenes = [scenario.generate(maxIterations=1)[0] for _ in range(SAMPLES)]
+    start = time.perf_counter()
+    results = [checkScene(scene) for scene in scenes]
+    return time.perf_counter() - start, results
+
+
+def main():
+    path = Path(__file__).parent / "shared_geometry.scenic"
+    scenario = scenic.scenarioFromString(SCENARIO, filename=str(path))
+    scenario.setSampleChecker(AcceptAllChecker())
+    shared, results = timeChecks(scenario)
+
+    original = MeshVolumeRegion._scaledShapeGeometry
+    MeshVolumeRegion._scaledShapeGeometry = lambda self: None
+    try:
+        unshared, expected = timeChecks(scenario)
+    finally:
+        MeshVolumeRegion._scaledShapeGeometry = original
+    assert results == expected
+    print(
+        f"unshared {unshared:.3f}s, shared {shared:.3f}s "
+        f"({unshared / shared:.2f}x) for {SAMPLES} samples"
+    )
+
+
+if __name__ == "__main__":
+    main()
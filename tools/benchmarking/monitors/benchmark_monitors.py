@@ -0,0 +1,107 @@
+"""Time the monitoring of the assurance claims in ``tools/ansr``.
+
+Each claim's requirement is checked over a synthetic flight of a few thousand
+time steps in the dummy simulator, once with the incremental
+`PropositionMonitor` and once with the previous monitor, which evaluated every
+atomic proposition at every step and delegated everything to `rv_ltl`.
+"""
+
+from pathlib import Path
+import statistics
+import sys
+import time
+
+from scenic.core.errors import InvalidScenarioError
+from scenic.core.lazy_eval import needsLazyEvaluation
+from scenic.core.propositions import PropositionNode
+from scenic.core.simulators import DummySimulator
+import scenic.syntax.translator as translator
+
+CLAIMS_DIR = Path(__file__).resolve().parents[2] / "ansr" / "assurance_claims"
+STEPS = [500, 2_000, 5_000]
+TRIALS_PER = 3
+
+# Same world as the generated claims, with a UAV flying north at 1 m/step between
+# two keep-out zones and five cars, none of which is ever reported.
+WORLD = """
+from scenic.simulators.utils.scenic_ansr import Zone, ZoneSet, match_reported_targets
+
+behavior Fly():
+    while True:
+        self.T += 0.1
+        wait
+
+keep_out_zones = ZoneSet([
+    Zone(BoxRegion(position=Vector(75.0, 175.0), dimensions=(50.0, 50.0, 1000.0))),
+    Zone(BoxRegion(position=Vector(175.0, -175.0), dimensions=(150.0, 150.0, 1000.0)))
+])
+ego = new Object at (0, 0), with behavior Fly, with T 0.0, with targets_reported []
+targets_groundtruth = {{
+    f"car00{{i}}": new Object at (20 * i - 40, -20), with id f"car00{{i}}", with width 3
+    for i in range(5)
+}}
+targets_reported = ego.targets_reported
+
+{claim}
+"""
+
+
+class LegacyPropositionMonitor:
+    def __init__(self, proposition):
+        self._proposition = proposition
+        self._monitor = proposition.ltl_node.create_monitor()
+
+    def update(self):
+        atomic_propositions = self._proposition.atomics()
+        state = {}
+        for ap in atomic_propositions:
+            b = ap.closure()
+            if needsLazyEvaluation(b):
+                raise InvalidScenarioError(
+                    f"value undefined outside of object definition"
+                )
+            state[str(ap.syntax_id)] = b
+        self._monitor.update(state)
+        return self._monitor.evaluate()
+
+
+def loadClaims():
+    claims = {}
+    for path in sorted(CLAIMS_DIR.glob("*.scenic")):
+        claim = path.read_text()
+        claim = claim[claim.index("\nrequire") :]
+        try:
+            translator.scenarioFromString(WORLD.format(claim=claim))
+        except Exception as e:
+            print(f"skipping {path.name}: {e}")
+        else:
+            claims[path.stem] = claim
+    return claims
+
+
+def timeClaim(claim, steps):
+    scenario = translator.scenarioFromString(WORLD.format(claim=claim))
+    scene, _ = scenario.generate(maxIterations=1)
+    simulator = DummySimulator(drift=1)
+    times = []
+    for _ in range(TRIALS_PER):
+        start = time.time()
+        simulation = simulator.simulate(scene, maxSteps=steps)
+        times.append(time.time() - start)
+    return simulation is not None, statistics.mean(times)
+
+
+if __name__ == "__main__":
+    createMonitor = PropositionNode.create_monitor
+    for name, claim in loadClaims().items():
+        for steps in STEPS:
+            PropositionNode.create_monitor = createMonitor
+            passed, newTime = timeClaim(claim, steps)
+            PropositionNode.create_monitor = lambda self: LegacyPropositionMonitor(self)
+            legacyPassed, legacyTime = timeClaim(claim, steps)
+            assert passed == legacyPassed
+            print(
+                f"{name}, {steps} steps ({'pass' if passed else 'fail'}): "
+                f"legacy {legacyTime:.2f}s, incremental {newTime:.2f}s, "
+                f"speedup {legacyTime / newTime:.1f}x"
+            )
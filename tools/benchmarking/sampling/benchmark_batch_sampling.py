@@ -0,0 +1,71 @@
+"""Time rejection sampling with and without batches of primitive distributions.
+
+Each scenario places objects using random numbers constrained by requirements
+which reject most samples but only involve arithmetic on those numbers, so they
+can be checked on entire batches (see `Scenario.setSamplingBatchSize`).
+"""
+
+import inspect
+import random
+import statistics
+import time
+
+import numpy
+
+import scenic
+
+BATCH_SIZES = [None, 100, 1000]
+SCENES = 20
+TRIALS_PER = 3
+
+SCENARIOS = {
+    "corner": """
+        x = Range(0, 100)
+        y = Range(0, 100)
+        ego = new Object at x @ y
+        require x + y > 190
+    """,
+    "annulus": """
+        x = Range(-50, 50)
+        y = Range(-50, 50)
+        ego = new Object at x @ y
+        other = new Object at (x + Range(-5, 5)) @ (y + 10)
+        require x * x + y * y > 44 * 44
+        require x * x + y * y < 45 * 45
+    """,
+    "options": """
+        lane = Options([-3.5, 0, 3.5])
+        gap = Normal(10, 5)
+        ego = new Object at lane @ 0
+        car = new Object at (lane + DiscreteRange(-1, 1) * 3.5) @ gap
+        require gap > 18
+    """,
+}
+
+
+def timeScenario(scenario, batchSize):
+    scenario.setSamplingBatchSize(batchSize)
+    times, iterations = [], []
+    for trial in range(TRIALS_PER):
+        random.seed(trial)
+        numpy.random.seed(trial)
+        start = time.perf_counter()
+        _, its = scenario.generateBatch(SCENES)
+        times.append(time.perf_counter() - start)
+        iterations.append(its)
+    return statistics.median(times), statistics.median(iterations)
+
+
+def main():
+    for name, code in SCENARIOS.items():
+        scenario = scenic.scenarioFromString(inspect.cleandoc(code))
+        for batchSize in BATCH_SIZES:
+            seconds, iterations = timeScenario(scenario, batchSize)
+            print(
+                f"{name:8s} batch size {str(batchSize):>5s}: {seconds:.3f}s, "
+                f"{iterations / SCENES:.0f} iterations/scene"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time generating scenes with and without early rejection.
+
+The scenario has many objects and a cheap requirement on a random parameter which
+rejects most samples, so that with early rejection most iterations are rejected
+before any object is sampled.
+"""
+
+import random
+import statistics
+import time
+
+import numpy
+
+import scenic
+
+SIZES = [10, 50, 100]
+SCENES = 20
+TRIALS_PER = 3
+
+SCENARIO = """
+ego = new Object
+x = Range(0, 1)
+param x = x
+require x > 0.9
+{objects}
+"""
+OBJECT = "new Object at Range({i}, {i} + 5) @ Range(0, 5), facing Range(0, 360) deg"
+
+
+def timeGeneration(scenario):
+    times, iterations = [], 0
+    for _ in range(TRIALS_PER):
+        random.seed(0)
+        numpy.random.seed(0)
+        start = time.perf_counter()
+        _, its = scenario.generateBatch(SCENES)
+        times.append(time.perf_counter() - start)
+        iterations += its
+    return statistics.median(times), iterations / TRIALS_PER
+
+
+def main():
+    for size in SIZES:
+        objects = "\n".join(OBJECT.format(i=10 * i) for i in range(size))
+        scenario = scenic.scenarioFromString(SCENARIO.format(objects=objects))
+        old, oldIts = timeGeneration(scenario)
+        scenario.setEarlyRejection()
+        new, newIts = timeGeneration(scenario)
+        print(
+            f"{size:4d} objects: full {old:.3f}s ({oldIts:.0f} iterations), "
+            f"early {new:.3f}s ({newIts:.0f} iterations) "
+            f"({old / new:.2f}x) for {SCENES} scenes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Time visibility checks with and without culling occluders by their bounding boxes.
+
+Samples scenes with a field of occluding objects, then times checking whether the ego
+can see each object, with the other objects as occluders. The baseline casts every
+candidate ray against every occluder, as `canSee` did before using a `RayCaster`
+(but without its exact distance filter on occluders, so the speedup is understated).
+"""
+
+import random
+import time
+
+import numpy
+
+import scenic
+from scenic.core import visibility
+from scenic.core.sample_checking import SampleChecker
+
+SAMPLES = 10
+
+SCENARIO = """
+class Occluder:
+    shape: Uniform(BoxShape(), SpheroidShape(), ConeShape())
+    width: Range(0.5, 2)
+    length: Range(0.5, 2)
+    height: Range(0.5, 2)
+    yaw: Range(0, 360) deg
+    allowCollisions: True
+ego = new Object at (0, 0, 0), with visibleDistance 40
+field = BoxRegion(position=(0, 20, 0), dimensions=(30, 30, 6))
+for _ in range(50):
+    new Occluder in field
+"""
+
+
+class AcceptAllChecker(SampleChecker):
+    def checkRequirementsInner(self, sample):
+        return None
+
+
+class ExhaustiveRayCaster(visibility.RayCaster):
+    def _boxEntries(self, origins, directions):
+        return numpy.zeros((len(origins), len(self.objects)))
+
+
+def checkScene(scene):
+    ego, *objects = scene.objects
+    return [
+        ego.canSee(obj, occludingObjects=tuple(o for o in objects if o is not obj))
+        for obj in objects
+    ]
+
+
+def timeChecks(scenes):
+    start = time.perf_counter()
+    results = [checkScene(scene) for scene in scenes]
+    return time.perf_counter() - start, results
+
+
+def main():
+    scenario = scenic.scenarioFromString(SCENARIO)
+    scenario.setSampleChecker(AcceptAllChecker())
+    random.seed(0)
+    numpy.random.seed(0)
+    scenes = [scenario.generate(maxIterations=1)[0] for _ in range(SAMPLES)]
+
+    culled, results = timeChecks(scenes)
+    original = visibility.RayCaster
+    visibility.RayCaster = ExhaustiveRayCaster
+    try:
+        exhaustive, expected = timeChecks(scenes)
+    finally:
+        visibility.RayCaster = original
+    assert results == expected
+    visible = sum(map(sum, results))
+    print(
+        f"exhaustive {exhaustive:.3f}s, culled {culled:.3f}s "
+        f"({exhaustive / culled:.2f}x) for {SAMPLES} samples, "
+        f"{visible} of {len(results) * len(results[0])} objects visible"
+    )
+
+
+if __name__ == "__main__":
+    main()